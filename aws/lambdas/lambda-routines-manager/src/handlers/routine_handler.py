@@ -49,7 +49,9 @@ def lambda_handler(event, context):
                     }, cls=DecimalEncoder)
                 }
             else:
-                routines = service.list_routines()
+                # updated_since permite sincronização incremental (apenas rotinas alteradas depois da data)
+                query_parameters = event.get('queryStringParameters') or {}
+                routines = service.list_routines(updated_since=query_parameters.get('updated_since'))
                 return {
                     'statusCode': 200,
                     'body': json.dumps({
@@ -1,6 +1,7 @@
 import os
 import logging
 import boto3
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime
 from botocore.exceptions import ClientError
 from src.models.routine import Routine
@@ -22,10 +23,21 @@ class RoutineService:
             logger.error(f"Error getting routine: {e}")
             raise
 
-    def list_routines(self):
+    def list_routines(self, updated_since=None):
         try:
-            response = self.table.scan()
-            items = response.get('Items', [])
+            scan_kwargs = {}
+            if updated_since:
+                # gte: alterações com o mesmo timestamp do cursor não se perdem; o cliente descarta repetidas pelo id
+                scan_kwargs['FilterExpression'] = Attr('updated_at').gte(updated_since)
+            
+            # O scan devolve no máximo 1 MB por página: segue LastEvaluatedKey até o fim da tabela
+            items = []
+            while True:
+                response = self.table.scan(**scan_kwargs)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
             return [Routine.from_dict(item) for item in items]
         except ClientError as e:
             logger.error(f"Error listing routines: {e}")
@@ -3,6 +3,7 @@ import os
 import boto3
 from moto import mock_aws
 from src.handlers.routine_handler import lambda_handler
+from src.services.routine_service import RoutineService
 from botocore.exceptions import ClientError
 from datetime import datetime
 
@@ -101,6 +102,64 @@ def test_list_routines():
     assert body['message'] == "Successfully retrieved routines at GET /routines"
     assert isinstance(body['data'], list)
 
+@mock_aws
+def test_list_routines_updated_since():
+    # Configurar DynamoDB local
+    setup_dynamodb()
+    
+    created = json.loads(test_create_routine()['body'])['data']
+    
+    # O cursor é inclusivo: a rotina com o mesmo updated_at volta (o cliente descarta repetidas pelo id)
+    event = {
+        "httpMethod": "GET",
+        "queryStringParameters": {"updated_since": created['updated_at']}
+    }
+    
+    print("\nTestando listagem incremental de rotinas:")
+    print("Entrada:", json.dumps(event, indent=2))
+    response = lambda_handler(event, None)
+    print("Saída:", json.dumps(response, indent=2))
+    assert response['statusCode'] == 200
+    routines = json.loads(response['body'])['data']
+    assert created['id'] in [routine['id'] for routine in routines]
+    assert all(routine['updated_at'] >= created['updated_at'] for routine in routines)
+    
+    # Rotinas alteradas depois de uma data futura: nenhuma
+    event["queryStringParameters"] = {"updated_since": "2999-01-01T00:00:00"}
+    response = lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['data'] == []
+    
+    # Rotinas alteradas desde antes da criação: inclui a rotina criada
+    event["queryStringParameters"] = {"updated_since": "2000-01-01T00:00:00"}
+    response = lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    ids = [routine['id'] for routine in json.loads(response['body'])['data']]
+    assert created['id'] in ids
+
+@mock_aws
+def test_list_routines_paginated():
+    # Configurar DynamoDB local
+    setup_dynamodb()
+    
+    service = RoutineService()
+    created_ids = [
+        service.create_routine({"name": f"Rotina {index}", "description": "Paginação"}).id
+        for index in range(5)
+    ]
+    
+    # Páginas de 2 itens obrigam a seguir LastEvaluatedKey, como numa tabela acima de 1 MB
+    scan = service.table.scan
+    service.table.scan = lambda **kwargs: scan(Limit=2, **kwargs)
+    
+    print("\nTestando listagem paginada de rotinas:")
+    ids = [routine.id for routine in service.list_routines()]
+    assert set(created_ids) <= set(ids)
+    assert len(ids) == len(set(ids))
+    
+    ids = [routine.id for routine in service.list_routines(updated_since="2000-01-01T00:00:00")]
+    assert set(created_ids) <= set(ids)
+
 @mock_aws
 def test_get_routine():
     # Primeiro, criar uma rotina
@@ -238,6 +297,8 @@ def test_delete_routine():
 if __name__ == "__main__":
     test_create_routine()
     test_list_routines()
+    test_list_routines_updated_since()
+    test_list_routines_paginated()
     test_get_routine()
     test_update_routine()
     test_delete_routine() 
\ No newline at end of file
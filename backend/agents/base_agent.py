@@ -1,25 +1,65 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from config.settings import get_settings
+from utils.llm_transport import get_chat_model
+from .session import AgentSession, current_session
+from .history import ConversationHistory
 
 # Obter configurações
 settings = get_settings()
 
 class BaseAgent:
-    def __init__(self, system_prompt="Você é um assistente útil e amigável. Responda de forma clara e concisa.", client_id: int = None):
-        # Inicializar o modelo de linguagem
-        self.llm = ChatOpenAI(
-            temperature=0.7,
+    def __init__(self, system_prompt="Você é um assistente útil e amigável. Responda de forma clara e concisa.", client_id: int = None, streaming: bool = False):
+        # Obter o modelo de linguagem, que usa o pool de conexões compartilhado do processo.
+        # Com streaming, os tokens chegam aos callbacks à medida que são gerados; só o agente
+        # cuja saída é enviada ao cliente em frames message_delta precisa dele
+        self.llm = get_chat_model(
             model_name="gpt-4o-mini",
-            openai_api_key=settings.openai_api_key
+            temperature=0.7,
+            streaming=streaming
         )
         
-        # Inicializar o histórico de conversa
-        self.conversation_history = [
+        self.system_prompt = system_prompt
+        
+        # Histórico e cliente usados quando não há sessão ativa no contexto
+        self._conversation_history = ConversationHistory([
             SystemMessage(content=system_prompt)
-        ]
+        ])
 
-        self.client_id = client_id
+        self._client_id = client_id
+    
+    @property
+    def client_id(self):
+        """Cliente da sessão ativa; fora de uma sessão, o client_id da construção."""
+        session = current_session.get()
+        if session is not None:
+            return session.client_id
+        return self._client_id
+    
+    @client_id.setter
+    def client_id(self, value):
+        self._client_id = value
+    
+    @property
+    def conversation_history(self):
+        """Histórico da sessão ativa; fora de uma sessão, o histórico próprio do agente."""
+        session = current_session.get()
+        if session is not None:
+            return session.conversation_history
+        return self._conversation_history
+    
+    @conversation_history.setter
+    def conversation_history(self, value):
+        session = current_session.get()
+        if session is not None:
+            session.conversation_history = value
+        elif isinstance(value, ConversationHistory):
+            self._conversation_history = value
+        else:
+            self._conversation_history = ConversationHistory(value)
+    
+    def new_session(self, client_id: int) -> AgentSession:
+        """Cria o estado de sessão de um cliente para este agente."""
+        return AgentSession(client_id, self.system_prompt)
     
     def process_message(self, message):
         """
@@ -35,7 +75,7 @@ class BaseAgent:
         self.conversation_history.append(HumanMessage(content=message))
         
         # Obter resposta do modelo
-        response = self.llm.invoke(self.conversation_history)
+        response = self.llm.invoke(list(self.conversation_history))
         response_text = response.content
         
         # Adicionar a resposta ao histórico
@@ -0,0 +1,36 @@
+import logging
+import time
+from functools import lru_cache
+
+from .orchestrator_agent import OrchestratorAgent
+from .specialized.task_agent import TaskAgent
+from .specialized.routine_agent import RoutineAgent
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Os agentes abaixo guardam apenas partes imutáveis (prompts, ferramentas, runnables e
+# executores). São construídos uma única vez e compartilhados por todas as conexões;
+# o estado de cada cliente fica em uma AgentSession.
+
+@lru_cache(maxsize=None)
+def get_task_agent() -> TaskAgent:
+    """Retorna o agente de tarefas compartilhado."""
+    return TaskAgent()
+
+@lru_cache(maxsize=None)
+def get_routine_agent() -> RoutineAgent:
+    """Retorna o agente de rotinas compartilhado."""
+    return RoutineAgent()
+
+@lru_cache(maxsize=None)
+def get_orchestrator_agent() -> OrchestratorAgent:
+    """Retorna o agente orquestrador compartilhado, ligado aos agentes especializados compartilhados."""
+    return OrchestratorAgent(task_agent=get_task_agent(), routine_agent=get_routine_agent())
+
+def build_agent_blueprints() -> OrchestratorAgent:
+    """Constrói todos os agentes compartilhados (chamado na inicialização do servidor)."""
+    start_time = time.time()
+    orchestrator = get_orchestrator_agent()
+    logger.info(f"Agentes compartilhados construídos em {time.time() - start_time:.2f}s")
+    return orchestrator
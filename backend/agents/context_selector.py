@@ -0,0 +1,193 @@
+import logging
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .fast_path import normalize_command
+from .history import count_tokens
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Palavras que não ajudam a diferenciar itens ("atualize a minha rotina de ...")
+STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "de", "da", "do", "das", "dos", "em", "na", "no", "nas", "nos",
+    "e", "ou", "para", "pra", "por", "com", "sem", "que", "qual", "quais", "meu", "minha", "meus", "minhas",
+    "me", "eu", "se", "ao", "the", "an", "of", "to", "for", "my", "and", "or", "in", "on", "with", "is", "what",
+    "tarefa", "tarefas", "rotina", "rotinas", "task", "tasks", "routine", "routines",
+}
+
+DATE_PATTERN = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b|\b(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\b")
+
+RELATIVE_DAYS = {"hoje": 0, "today": 0, "amanha": 1, "tomorrow": 1, "ontem": -1, "yesterday": -1}
+
+
+def _words(text: str) -> Set[str]:
+    return {word for word in normalize_command(text).split() if word not in STOPWORDS}
+
+
+def _value(item: Dict[str, Any], keys: Sequence[str]) -> Any:
+    for key in keys:
+        if item.get(key) not in (None, ""):
+            return item[key]
+    return None
+
+
+def _cell(value: Any, max_length: int) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(part) for part in value)
+    text = re.sub(r"\s+", " ", str(value).replace("|", "/")).strip()
+    return text if len(text) <= max_length else text[:max_length - 1] + "…"
+
+
+def message_dates(message: str, today: Optional[date] = None) -> Set[str]:
+    """Datas (AAAA-MM-DD) citadas na mensagem, explícitas ("05/03", "2024-03-05") ou relativas ("amanhã")."""
+    today = today or date.today()
+    dates = set()
+    for match in DATE_PATTERN.finditer(message):
+        try:
+            if match.group(1):
+                dates.add(date(int(match.group(1)), int(match.group(2)), int(match.group(3))).isoformat())
+            else:
+                year = int(match.group(6)) if match.group(6) else today.year
+                dates.add(date(year, int(match.group(5)), int(match.group(4))).isoformat())
+        except ValueError:
+            continue
+    for word in normalize_command(message).split():
+        if word in RELATIVE_DAYS:
+            dates.add((today + timedelta(days=RELATIVE_DAYS[word])).isoformat())
+    return dates
+
+
+class ContextSelector:
+    """
+    Seleciona os itens (tarefas ou rotinas) mais relevantes para a mensagem do turno.
+    
+    Cada item recebe uma pontuação pelas palavras da mensagem encontradas nos campos de texto
+    (nome, descrição, categoria, tags), pelo status e pela prioridade citados e pelas datas
+    mencionadas. Os itens pontuados (até `top_k`, na ordem original em caso de empate; sem
+    nenhuma correspondência, os primeiros `top_k`) são injetados em uma tabela compacta
+    separada por "|" até esgotar `token_budget`. A economia em relação ao formato antigo
+    (todos os itens, todos os campos) é registrada a cada turno.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        header: str,
+        columns: Sequence[Tuple[str, Sequence[str]]],
+        text_fields: Sequence[Sequence[str]],
+        keyword_fields: Sequence[Sequence[str]] = (),
+        date_fields: Sequence[Sequence[str]] = (),
+        top_k: int = 15,
+        token_budget: int = 800,
+        max_cell_length: int = 60,
+    ):
+        self.name = name
+        self.header = header
+        self.columns = list(columns)
+        self.text_fields = list(text_fields)
+        self.keyword_fields = list(keyword_fields)
+        self.date_fields = list(date_fields)
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_cell_length = max_cell_length
+        
+        # Tokens do formato completo, memorizados por snapshot (mesmo objeto, mesma contagem)
+        self._baseline: Tuple[Any, int] = (None, 0)
+        
+        # Contadores expostos por stats()
+        self.turns = 0
+        self.items_total = 0
+        self.items_injected = 0
+        self.tokens_full = 0
+        self.tokens_injected = 0
+    
+    def score(self, item: Dict[str, Any], words: Set[str], normalized: str, dates: Set[str]) -> float:
+        """Pontua um item contra a mensagem já decomposta em palavras, texto normalizado e datas."""
+        score = 0.0
+        item_words = set()
+        for keys in self.text_fields:
+            value = _value(item, keys)
+            if value is not None:
+                item_words |= _words(" ".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value))
+        for word in words:
+            if word in item_words:
+                score += 1.0
+            elif len(word) >= 4 and any(other.startswith(word[:4]) for other in item_words if len(other) >= 4):
+                # Variações da mesma palavra ("exercicio" e "exercicios")
+                score += 0.5
+        for keys in self.keyword_fields:
+            value = _value(item, keys)
+            if value is not None and f" {normalize_command(str(value))} " in f" {normalized} ":
+                score += 0.5
+        for keys in self.date_fields:
+            value = _value(item, keys)
+            if value is not None and str(value)[:10] in dates:
+                score += 1.0
+        return score
+    
+    def select(self, message: str, items: List[Any], snapshot: Any = None, full_text: Optional[Callable[[], str]] = None) -> Optional[str]:
+        """
+        Retorna a tabela com os itens mais relevantes para a mensagem, ou None se não houver itens.
+        
+        Args:
+            message: Mensagem do usuário no turno
+            items: Itens disponíveis (dicionários da API)
+            snapshot: Objeto que identifica a versão dos itens, para memorizar a contagem do formato completo
+            full_text: Gera o texto no formato completo antigo, usado apenas para medir a economia
+        """
+        items = [item for item in items if isinstance(item, dict)]
+        if not items:
+            return None
+        
+        words = _words(message)
+        normalized = normalize_command(message)
+        dates = message_dates(message)
+        scores = [self.score(item, words, normalized, dates) for item in items]
+        ranked = sorted(range(len(items)), key=lambda position: scores[position], reverse=True)[:self.top_k]
+        if scores[ranked[0]] > 0:
+            ranked = [position for position in ranked if scores[position] > 0]
+        
+        columns = "|".join(label for label, _ in self.columns)
+        rows = []
+        tokens = count_tokens(self.header.format(shown=len(items), total=len(items)) + f"\n{columns}")
+        for position in ranked:
+            row = "|".join(_cell(_value(items[position], keys), self.max_cell_length) for _, keys in self.columns)
+            row_tokens = count_tokens(row) + 1
+            if rows and tokens + row_tokens > self.token_budget:
+                break
+            rows.append(row)
+            tokens += row_tokens
+        text = self.header.format(shown=len(rows), total=len(items)) + f"\n{columns}\n" + "\n".join(rows)
+        
+        full_tokens = self._full_tokens(snapshot, full_text) if full_text else tokens
+        saved = max(0, full_tokens - tokens)
+        self.turns += 1
+        self.items_total += len(items)
+        self.items_injected += len(rows)
+        self.tokens_full += full_tokens
+        self.tokens_injected += tokens
+        logger.info(
+            f"ContextSelector: {self.name}: {len(rows)} de {len(items)} itens, "
+            f"{tokens} tokens ({saved} economizados de {full_tokens})"
+        )
+        return text
+    
+    def _full_tokens(self, snapshot: Any, full_text: Callable[[], str]) -> int:
+        if snapshot is None or self._baseline[0] is not snapshot:
+            self._baseline = (snapshot, count_tokens(full_text()))
+        return self._baseline[1]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de seleção e a economia acumulada de tokens."""
+        return {
+            "turns": self.turns,
+            "items_total": self.items_total,
+            "items_injected": self.items_injected,
+            "tokens_full": self.tokens_full,
+            "tokens_injected": self.tokens_injected,
+            "tokens_saved": max(0, self.tokens_full - self.tokens_injected),
+        }
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun
+from langchain_core.pydantic_v1 import ValidationError
+from langchain_core.tools import BaseTool
+
+from config.settings import get_settings
+from utils.progress import current_tool
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Obter configurações
+settings = get_settings()
+
+# Contadores globais de chamadas de ferramentas e de argumentos recusados pelo esquema, expostos em /api/agents/stats
+TOOL_VALIDATION_STATS: Dict[str, Any] = {
+    "calls": 0,
+    "failures": 0,
+    "by_tool": {},
+}
+
+
+class ToolArgumentError(str):
+    """Observação de argumentos recusados pelo esquema; nunca encerra o turno, mesmo em ferramentas diretas."""
+
+
+class _BoundedTool:
+    """
+    Envolve uma ferramenta para que sua execução assíncrona ocupe uma vaga do semáforo do passo.
+    
+    Argumentos recusados pelo esquema da ferramenta voltam ao modelo como observação (para que ele
+    corrija a chamada no próximo passo) em vez de interromper o executor.
+    """
+    
+    def __init__(self, tool: BaseTool, semaphore: asyncio.Semaphore):
+        self.tool = tool
+        self.semaphore = semaphore
+    
+    @property
+    def return_direct(self) -> bool:
+        return self.tool.return_direct
+    
+    async def arun(self, *args: Any, **kwargs: Any) -> Any:
+        TOOL_VALIDATION_STATS["calls"] += 1
+        async with self.semaphore:
+            # Os eventos de progresso emitidos pela ferramenta levam o nome dela e o tempo desde o início
+            token = current_tool.set((self.tool.name, time.monotonic()))
+            try:
+                return await self.tool.arun(*args, **kwargs)
+            except ValidationError as e:
+                TOOL_VALIDATION_STATS["failures"] += 1
+                by_tool = TOOL_VALIDATION_STATS["by_tool"]
+                by_tool[self.tool.name] = by_tool.get(self.tool.name, 0) + 1
+                logger.warning(f"ParallelAgentExecutor: Argumentos inválidos para {self.tool.name}: {str(e)}")
+                return ToolArgumentError(f"Argumentos inválidos para a ferramenta {self.tool.name}: {str(e)}. Corrija os argumentos e tente novamente.")
+            finally:
+                current_tool.reset(token)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor que executa em paralelo as chamadas de ferramentas de um mesmo passo do modelo.
+    
+    Com o agente de ferramentas da OpenAI, o modelo pode pedir várias chamadas em uma única
+    resposta (ex.: "crie duas tarefas e liste minhas rotinas"). O AgentExecutor já as dispara com
+    asyncio.gather, que devolve as observações na ordem em que foram pedidas; aqui limitamos
+    quantas rodam ao mesmo tempo em cada turno com um semáforo de `max_parallel_tools` vagas.
+    
+    O AgentExecutor recusa ferramentas com return_direct=True em agentes com várias ações por
+    passo; essas ferramentas declaram metadata={"return_direct": True} e encerram o turno com a
+    própria saída quando são a única chamada do passo.
+    """
+    
+    max_parallel_tools: int = 4
+    
+    async def _aiter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> AsyncIterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        # Os passos de um turno são sequenciais, então o semáforo do passo limita o turno inteiro
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_tools))
+        bounded_tools = {name: _BoundedTool(tool, semaphore) for name, tool in name_to_tool_map.items()}
+        async for step in super()._aiter_next_step(
+            bounded_tools, color_mapping, inputs, intermediate_steps, run_manager
+        ):
+            yield step
+    
+    def _get_tool_return(self, next_step_output: Tuple[AgentAction, str]) -> Optional[AgentFinish]:
+        agent_action, observation = next_step_output
+        tool = next((tool for tool in self.tools if tool.name == agent_action.tool), None)
+        if isinstance(observation, ToolArgumentError):
+            return None
+        if tool is not None and (tool.metadata or {}).get("return_direct"):
+            return_value_key = self.agent.return_values[0] if self.agent.return_values else "output"
+            return AgentFinish({return_value_key: observation}, "")
+        return super()._get_tool_return(next_step_output)
@@ -0,0 +1,158 @@
+import logging
+import re
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Cortesias aceitas antes e depois de um comando ("por favor, liste minhas tarefas")
+POLITE_PREFIX = r"(?:(?:por favor|pfv|please|hey|oi|ola|hi)\s+)?"
+POLITE_SUFFIX = r"(?:\s+(?:por favor|pfv|please|agora|now))?"
+
+
+def normalize_command(text: str) -> str:
+    """Normaliza uma mensagem para comparação: minúsculas, sem acentos, sem pontuação e com espaços simples."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class Command:
+    """Comando reconhecido localmente: padrões (já normalizados) e a corrotina que produz a resposta."""
+    
+    def __init__(self, name: str, patterns: Iterable[str], handler: Callable[[re.Match], Awaitable[str]]):
+        self.name = name
+        self.patterns = [re.compile(POLITE_PREFIX + pattern + POLITE_SUFFIX) for pattern in patterns]
+        self.handler = handler
+    
+    def match(self, normalized: str) -> Optional[re.Match]:
+        for pattern in self.patterns:
+            match = pattern.fullmatch(normalized)
+            if match:
+                return match
+        return None
+
+
+class CommandMatcher:
+    """
+    Atalho determinístico para comandos comuns, consultado antes dos agentes.
+    
+    Uma mensagem só é atendida aqui quando corresponde por inteiro a um dos padrões registrados;
+    qualquer dúvida (texto extra, pedido composto, erro na ferramenta) devolve None e a mensagem
+    segue para o orquestrador normalmente.
+    """
+    
+    def __init__(self, commands: Iterable[Command] = ()):
+        self.commands: List[Command] = list(commands)
+        self._messages = 0
+        self._hits = 0
+        self._errors = 0
+        self._by_command: Dict[str, int] = {}
+    
+    def register(self, command: Command) -> None:
+        """Adiciona um comando ao atalho."""
+        self.commands.append(command)
+    
+    def match(self, text: str) -> Optional[tuple]:
+        """Retorna (comando, match) para a mensagem ou None se nenhum padrão a cobre por inteiro."""
+        normalized = normalize_command(text)
+        for command in self.commands:
+            match = command.match(normalized)
+            if match:
+                return command, match
+        return None
+    
+    async def dispatch(self, text: str) -> Optional[str]:
+        """Executa o comando correspondente à mensagem; None quando ela deve seguir para os agentes."""
+        self._messages += 1
+        matched = self.match(text)
+        if matched is None:
+            return None
+        
+        command, match = matched
+        start_time = time.time()
+        try:
+            response = await command.handler(match)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"CommandMatcher: Falha no comando {command.name}, seguindo para os agentes: {str(e)}")
+            return None
+        if not response:
+            return None
+        
+        self._hits += 1
+        self._by_command[command.name] = self._by_command.get(command.name, 0) + 1
+        logger.info(f"CommandMatcher: Comando {command.name} atendido em {(time.time() - start_time) * 1000:.1f}ms")
+        return response
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do atalho (mensagens, acertos e taxa de acerto)."""
+        return {
+            "messages": self._messages,
+            "hits": self._hits,
+            "errors": self._errors,
+            "hit_rate": self._hits / self._messages if self._messages else 0.0,
+            "by_command": dict(self._by_command),
+        }
+
+
+# Padrões normalizados (sem acentos e pontuação) em português e inglês
+LIST_VERBS = r"(?:(?:me\s+)?(?:liste|listar|lista|mostre|mostrar|mostra|exiba|exibir|ver|veja|quero ver|quais sao)\s+)"
+LIST_VERBS_EN = r"(?:(?:list|show|show me|display|get|see|what are)\s+)"
+
+TASK_PATTERNS = [
+    LIST_VERBS + r"?(?:todas\s+)?(?:as\s+)?(?:minhas\s+)?tarefas",
+    LIST_VERBS_EN + r"?(?:all\s+)?(?:of\s+)?(?:my\s+)?(?:tasks|to dos|todos)",
+]
+
+ROUTINE_PATTERNS = [
+    LIST_VERBS + r"?(?:todas\s+)?(?:as\s+)?(?:minhas\s+)?rotinas",
+    LIST_VERBS_EN + r"?(?:all\s+)?(?:of\s+)?(?:my\s+)?routines",
+]
+
+DATETIME_PATTERNS = [
+    r"que horas sao",
+    r"(?:qual\s+)?(?:e\s+)?(?:a\s+)?hora(?: atual)?",
+    r"(?:que|qual)\s+(?:e\s+)?(?:o\s+)?dia\s+(?:e\s+)?hoje",
+    r"(?:que|qual)\s+(?:e\s+)?(?:a\s+)?data\s+(?:de\s+)?hoje",
+    r"(?:que|qual)\s+(?:e\s+)?(?:a\s+)?data\s+(?:e\s+)?hoje",
+    r"what time is it",
+    r"what s the time|what is the time",
+    r"what s (?:the )?date(?: today)?|what is (?:the )?date(?: today)?|what s today s date|what is today s date",
+    r"what day is (?:it )?today",
+]
+
+
+def build_default_matcher() -> CommandMatcher:
+    """Atalho com os comandos de listagem de tarefas e rotinas e de data e hora."""
+    from agents.blueprints import get_orchestrator_agent
+    from agents.specialized.task_agent import format_task, task_snapshot
+    from agents.tools import aget_datetime_info
+    
+    # As ferramentas dos agentes devolvem as falhas como texto (para o LLM); aqui as listagens
+    # leem os caches diretamente, e uma falha vira exceção para a mensagem seguir aos agentes
+    async def list_tasks(match: re.Match) -> str:
+        tasks = await task_snapshot.get()
+        if not tasks:
+            return "Nenhuma tarefa encontrada."
+        return "\n".join(format_task(task) for task in tasks if isinstance(task, dict))
+    
+    async def list_routines(match: re.Match) -> str:
+        replica = get_orchestrator_agent().routine_agent.routine_replica
+        if not await replica.sync():
+            raise RuntimeError("falha ao sincronizar as rotinas")
+        return replica.render() or "Nenhuma rotina encontrada."
+    
+    async def datetime_info(match: re.Match) -> str:
+        # A ferramenta devolve o texto indentado (pensado para o LLM); aqui ele vai direto ao usuário
+        info = await aget_datetime_info("")
+        return "\n".join(line.strip() for line in info.splitlines())
+    
+    return CommandMatcher([
+        Command("list_tasks", TASK_PATTERNS, list_tasks),
+        Command("list_routines", ROUTINE_PATTERNS, list_routines),
+        Command("datetime_info", DATETIME_PATTERNS, datetime_info),
+    ])
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import time
+import traceback
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, messages_from_dict, messages_to_dict
+from config.settings import get_settings
+
+# Obter configurações
+settings = get_settings()
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Resumo da conversa até aqui:"
+
+# Enquanto o resumo não alcança as mensagens antigas, a janela pode passar do orçamento até este múltiplo
+MAX_OVERFLOW_FACTOR = 2
+
+SUMMARY_PROMPT = """Atualize o resumo de uma conversa entre um usuário e um assistente de tarefas e rotinas.
+Preserve fatos, nomes, IDs, datas e decisões que possam ser citados depois. Seja conciso (no máximo 200 palavras).
+
+Resumo atual:
+{summary}
+
+Novas mensagens:
+{messages}
+
+Resumo atualizado:"""
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Carrega o tokenizador do tiktoken uma única vez; None se não estiver disponível."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"ConversationHistory: tiktoken indisponível, usando estimativa de tokens: {str(e)}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Conta (ou estima, sem tiktoken) os tokens de um texto."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+def _message_tokens(message: BaseMessage) -> int:
+    # Cerca de 4 tokens de overhead por mensagem no formato de chat da OpenAI
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return count_tokens(content) + 4
+
+def _read_only(*args, **kwargs):
+    raise TypeError("HistoryView é somente leitura")
+
+class HistoryView(list):
+    """
+    Janela do histórico pronta para o LLM: já filtrada (sem mensagens do sistema, exceto o resumo)
+    e somente leitura.
+    
+    É uma lista porque o MessagesPlaceholder exige uma; a mesma instância é compartilhada pelo
+    orquestrador e pelos agentes especializados até que o histórico mude.
+    """
+    
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    
+    def __init__(self, messages: Iterable[BaseMessage] = ()):
+        super().__init__(messages)
+        self._contains: Dict[str, bool] = {}
+    
+    def __reduce__(self):
+        # Cópias (ex.: deepcopy feito por callbacks) viram listas comuns
+        return (list, (list(self),))
+    
+    def contains(self, text: str) -> bool:
+        """Indica se alguma resposta do assistente na janela contém o texto (resultado memorizado)."""
+        if text not in self._contains:
+            self._contains[text] = any(isinstance(message, AIMessage) and text in message.content for message in self)
+        return self._contains[text]
+
+def as_chat_history(chat_history: Optional[Iterable[Any]]) -> HistoryView:
+    """
+    Normaliza um histórico recebido por um agente especializado.
+    
+    Uma HistoryView é usada diretamente, sem cópia; listas de mensagens ou de dicionários
+    (role/content) são convertidas, ignorando as mensagens do sistema.
+    """
+    if isinstance(chat_history, HistoryView):
+        return chat_history
+    
+    messages = []
+    for msg in chat_history or []:
+        if isinstance(msg, (HumanMessage, AIMessage)):
+            messages.append(msg)
+        elif isinstance(msg, dict):
+            if msg.get("role") == "user":
+                messages.append(HumanMessage(content=msg.get("content", "")))
+            elif msg.get("role") == "assistant":
+                messages.append(AIMessage(content=msg.get("content", "")))
+    return HistoryView(messages)
+
+class ConversationHistory:
+    """
+    Histórico de conversa com janela limitada por tokens.
+    
+    Guarda todas as mensagens (com a contagem de tokens de cada uma calculada uma única vez),
+    mas entrega ao LLM apenas as mensagens mais recentes que cabem no orçamento, precedidas de
+    um resumo das mais antigas. O resumo é atualizado em segundo plano, fora do caminho crítico
+    da resposta; uma mensagem só sai da janela depois de entrar no resumo, então, enquanto ele
+    é gerado, a janela pode passar do orçamento (até MAX_OVERFLOW_FACTOR vezes).
+    
+    O armazenamento é apenas de inclusão: as mensagens visíveis (sem as do sistema) ficam em uma
+    lista à parte e o início da janela avança incrementalmente a cada append, de modo que a janela
+    nunca exige percorrer o histórico inteiro.
+    """
+    
+    def __init__(self, messages: Optional[Iterable[BaseMessage]] = None, token_budget: Optional[int] = None, keep_recent: Optional[int] = None):
+        self.token_budget = token_budget if token_budget is not None else settings.history_token_budget
+        self.keep_recent = keep_recent if keep_recent is not None else settings.history_keep_recent
+        
+        self._messages: List[BaseMessage] = []
+        self._tokens: List[int] = []
+        
+        # Mensagens visíveis ao LLM e, para cada mensagem, quantas visíveis a antecedem
+        self._visible: List[BaseMessage] = []
+        self._visible_tokens: List[int] = []
+        self._visible_before: List[int] = []
+        
+        # Janela atual: _visible[_start:], com _window_tokens tokens; nunca recua antes de _floor
+        self._start = 0
+        self._floor = 0
+        self._window_tokens = 0
+        
+        # A HistoryView é memorizada até a próxima alteração do histórico
+        self._version = 0
+        self._view: Optional[HistoryView] = None
+        self._view_version = -1
+        
+        # Mensagens com índice menor que _summarized_upto já estão no resumo
+        self.summary = ""
+        self._summary_tokens = 0
+        self._summarized_upto = 0
+        self._pending_tokens = 0
+        # Mensagens que saíram da janela antes de entrar no resumo, desde o último resumo concluído
+        self._dropped_unsummarized = 0
+        self._summary_task: Optional[asyncio.Task] = None
+        
+        for message in messages or []:
+            self.append(message)
+    
+    # Interface de lista, usada pelo restante do código
+    
+    def append(self, message: BaseMessage) -> None:
+        tokens = 0 if isinstance(message, SystemMessage) else _message_tokens(message)
+        self._visible_before.append(len(self._visible))
+        self._messages.append(message)
+        self._tokens.append(tokens)
+        self._pending_tokens += tokens
+        
+        if not isinstance(message, SystemMessage):
+            self._visible.append(message)
+            self._visible_tokens.append(tokens)
+            self._window_tokens += tokens
+            self._shrink_window()
+            self._version += 1
+    
+    def extend(self, messages: Iterable[BaseMessage]) -> None:
+        for message in messages:
+            self.append(message)
+    
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return iter(self._messages)
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+    
+    def __getitem__(self, index):
+        return self._messages[index]
+    
+    # Janela e resumo
+    
+    def _visible_upto(self, index: int) -> int:
+        # Quantas mensagens visíveis existem antes da mensagem de índice `index`
+        if index < len(self._visible_before):
+            return self._visible_before[index]
+        return len(self._visible)
+    
+    def _budget(self) -> int:
+        return self.token_budget - self._summary_tokens
+    
+    def _shrink_window(self) -> None:
+        # A mensagem mais recente sempre entra, mesmo que sozinha estoure o orçamento
+        budget = self._budget()
+        while self._start < len(self._visible) - 1 and self._window_tokens > budget:
+            if self._start >= self._floor and self._window_tokens <= budget * MAX_OVERFLOW_FACTOR:
+                # A próxima mensagem ainda não está no resumo: espera o resumo alcançá-la
+                break
+            if self._start >= self._floor:
+                # Avisa uma vez por atraso; o total descartado é registrado quando o resumo alcançar a janela
+                if not self._dropped_unsummarized:
+                    logger.warning("ConversationHistory: Resumo atrasado, descartando da janela mensagens ainda não resumidas")
+                self._dropped_unsummarized += 1
+            self._window_tokens -= self._visible_tokens[self._start]
+            self._start += 1
+    
+    def _refit_window(self) -> None:
+        # Chamado quando o resumo (e portanto o orçamento) muda; raro, então pode recalcular
+        self._start = max(self._start, self._floor)
+        self._window_tokens = sum(self._visible_tokens[self._start:])
+        budget = self._budget()
+        while self._start > self._floor and self._window_tokens + self._visible_tokens[self._start - 1] <= budget:
+            self._start -= 1
+            self._window_tokens += self._visible_tokens[self._start]
+        self._shrink_window()
+        self._version += 1
+    
+    def window(self) -> HistoryView:
+        """
+        Retorna as mensagens a enviar ao LLM: o resumo (se houver) e as mensagens recentes,
+        sem mensagens do sistema, dentro do orçamento de tokens.
+        
+        A view é somente leitura e reaproveitada enquanto o histórico não mudar, então pode ser
+        repassada aos agentes especializados sem cópia.
+        """
+        if self._view_version != self._version:
+            messages = self._visible[self._start:]
+            if self.summary:
+                messages.insert(0, SystemMessage(content=f"{SUMMARY_PREFIX}\n{self.summary}"))
+            self._view = HistoryView(messages)
+            self._view_version = self._version
+        return self._view
+    
+    def needs_summary(self) -> bool:
+        """Indica se as mensagens ainda não resumidas já excedem o orçamento."""
+        return self._pending_tokens + self._summary_tokens > self.token_budget and len(self._messages) - self._summarized_upto > self.keep_recent
+    
+    def schedule_summary(self, llm) -> None:
+        """Dispara, em segundo plano, a incorporação das mensagens antigas ao resumo."""
+        if not self.needs_summary():
+            return
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        self._summary_task = asyncio.create_task(self._summarize(llm))
+    
+    async def _summarize(self, llm) -> None:
+        start_time = time.time()
+        cut = len(self._messages) - self.keep_recent
+        start = self._summarized_upto
+        to_fold = [message for message in self._messages[start:cut] if not isinstance(message, SystemMessage)]
+        if not to_fold:
+            return
+        
+        lines = []
+        for message in to_fold:
+            role = "Usuário" if isinstance(message, HumanMessage) else "Assistente"
+            lines.append(f"{role}: {message.content}")
+        
+        try:
+            response = await llm.ainvoke(SUMMARY_PROMPT.format(summary=self.summary or "(vazio)", messages="\n".join(lines)))
+        except Exception as e:
+            logger.error(f"ConversationHistory: Erro ao resumir histórico: {str(e)}")
+            logger.error(f"ConversationHistory: Traceback: {traceback.format_exc()}")
+            return
+        
+        # O histórico só cresce enquanto o resumo é gerado, então os índices continuam válidos
+        self.summary = response.content.strip()
+        self._summary_tokens = count_tokens(self.summary)
+        self._pending_tokens -= sum(self._tokens[start:cut])
+        self._summarized_upto = cut
+        self._floor = self._visible_upto(cut)
+        self._refit_window()
+        logger.info(f"ConversationHistory: {len(to_fold)} mensagens resumidas em {time.time() - start_time:.2f}s")
+        if self._dropped_unsummarized:
+            logger.warning(f"ConversationHistory: {self._dropped_unsummarized} mensagens saíram da janela antes de entrar no resumo")
+            self._dropped_unsummarized = 0
+    
+    # Serialização (hibernação de sessões)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "messages": messages_to_dict(self._messages),
+            "summary": self.summary,
+            "summarized_upto": self._summarized_upto,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationHistory":
+        history = cls(messages_from_dict(data.get("messages", [])))
+        history.summary = data.get("summary", "")
+        history._summary_tokens = count_tokens(history.summary) if history.summary else 0
+        history._summarized_upto = data.get("summarized_upto", 0)
+        history._pending_tokens = sum(history._tokens[history._summarized_upto:])
+        history._floor = history._visible_upto(history._summarized_upto)
+        history._refit_window()
+        return history
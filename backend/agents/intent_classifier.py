@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import get_settings
+from .fast_path import normalize_command
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Obter configurações
+settings = get_settings()
+
+# Conjunto rotulado (português e inglês) usado no treino e na avaliação
+INTENTS_PATH = os.path.join(os.path.dirname(__file__), "data", "intents.json")
+
+# Intenções atendidas diretamente pelos agentes especializados; "general" (ferramentas gerais e conversa)
+# e "mixed" (pedidos que envolvem tarefas e rotinas) sempre seguem para o roteamento pelo LLM
+ROUTED_INTENTS = {"task": "route_to_task_agent", "routine": "route_to_routine_agent"}
+
+
+def load_intents(path: str = INTENTS_PATH) -> Dict[str, Any]:
+    """Lê o conjunto rotulado: {"labels": [...], "train": [[texto, rótulo]], "eval": [[texto, rótulo]]}."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class IntentClassifier:
+    """
+    Classificador de intenção local: n-gramas com hashing e regressão logística multinomial em NumPy.
+    
+    Cada mensagem normalizada vira um vetor esparso com n-gramas de caracteres (3 a 5, com
+    fronteiras de palavra) e de palavras (1 e 2), mapeados por CRC32 em `n_features` posições.
+    A predição soma as colunas ativas da matriz de pesos e aplica softmax, o que leva dezenas de
+    microssegundos e dispensa a chamada de roteamento ao LLM quando a confiança é alta.
+    """
+    
+    def __init__(self, labels: Sequence[str], n_features: int = 2 ** 14, char_ngrams: Tuple[int, int] = (3, 5)):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.char_ngrams = char_ngrams
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+    
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices e valores (TF logarítmico normalizado por L2) dos n-gramas da mensagem."""
+        normalized = normalize_command(text)
+        words = normalized.split()
+        grams = [f"w:{word}" for word in words]
+        grams += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        padded = f" {normalized} "
+        low, high = self.char_ngrams
+        for size in range(low, high + 1):
+            grams += [padded[i:i + size] for i in range(len(padded) - size + 1)]
+        
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            index = zlib.crc32(gram.encode("utf-8")) % self.n_features
+            counts[index] = counts.get(index, 0) + 1
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        return indices, values / np.linalg.norm(values)
+    
+    def _matrix(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, values = self._features(text)
+            matrix[row, indices] = values
+        return matrix
+    
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 300, learning_rate: float = 2.0, l2: float = 1e-4) -> "IntentClassifier":
+        """Treina por gradiente descendente em lote completo (o conjunto é pequeno)."""
+        features = self._matrix(texts)
+        targets = np.zeros((len(labels), len(self.labels)), dtype=np.float32)
+        targets[np.arange(len(labels)), [self.labels.index(label) for label in labels]] = 1.0
+        
+        # Partindo de zero, os pesos são sempre uma combinação das linhas de treino (weights = features.T @ alpha);
+        # o gradiente é então aplicado a alpha com a matriz de Gram, de ordem n x n em vez de n x n_features
+        gram = features @ features.T
+        alpha = np.zeros_like(targets)
+        bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = self._softmax(gram @ alpha + bias)
+            error = (probabilities - targets) / len(texts)
+            alpha -= learning_rate * (error + l2 * alpha)
+            bias -= learning_rate * error.sum(axis=0)
+        
+        self.weights = features.T @ alpha
+        self.bias = bias
+        return self
+    
+    @staticmethod
+    def _softmax(scores: np.ndarray) -> np.ndarray:
+        scores = scores - scores.max(axis=-1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=-1, keepdims=True)
+    
+    def predict_proba(self, text: str) -> np.ndarray:
+        """Probabilidade de cada rótulo para a mensagem."""
+        indices, values = self._features(text)
+        return self._softmax(values @ self.weights[indices] + self.bias)
+    
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Rótulo mais provável e a sua probabilidade."""
+        probabilities = self.predict_proba(text)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+
+class IntentRouter:
+    """Aplica o limiar de confiança ao classificador e contabiliza as decisões."""
+    
+    def __init__(self, classifier: IntentClassifier, threshold: float):
+        self.classifier = classifier
+        self.threshold = threshold
+        self._predictions = 0
+        self._routed = 0
+        self._by_intent: Dict[str, int] = {}
+        self._total_time = 0.0
+    
+    def route(self, message: str) -> Optional[str]:
+        """Nome da ferramenta de roteamento para a mensagem ou None quando o LLM deve decidir."""
+        start_time = time.perf_counter()
+        label, confidence = self.classifier.predict(message)
+        self._total_time += time.perf_counter() - start_time
+        self._predictions += 1
+        
+        if label not in ROUTED_INTENTS or confidence < self.threshold:
+            logger.info(f"IntentRouter: Intenção {label} ({confidence:.2f}) segue para o roteamento pelo LLM")
+            return None
+        
+        self._routed += 1
+        self._by_intent[label] = self._by_intent.get(label, 0) + 1
+        logger.info(f"IntentRouter: Intenção {label} ({confidence:.2f}) roteada localmente")
+        return ROUTED_INTENTS[label]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do roteamento local."""
+        return {
+            "predictions": self._predictions,
+            "routed": self._routed,
+            "routed_rate": self._routed / self._predictions if self._predictions else 0.0,
+            "by_intent": dict(self._by_intent),
+            "avg_latency_ms": self._total_time / self._predictions * 1000 if self._predictions else 0.0,
+        }
+
+
+def train_intent_classifier(examples: List[List[str]], labels: Sequence[str]) -> IntentClassifier:
+    """Treina um classificador com pares [texto, rótulo]."""
+    texts = [text for text, _ in examples]
+    targets = [label for _, label in examples]
+    return IntentClassifier(labels).fit(texts, targets)
+
+
+@lru_cache(maxsize=None)
+def get_intent_router() -> IntentRouter:
+    """Retorna o roteador de intenções compartilhado, treinado com o conjunto embarcado."""
+    start_time = time.time()
+    data = load_intents()
+    classifier = train_intent_classifier(data["train"], data["labels"])
+    logger.info(f"IntentRouter: Classificador treinado com {len(data['train'])} exemplos em {time.time() - start_time:.2f}s")
+    return IntentRouter(classifier, settings.intent_confidence_threshold)
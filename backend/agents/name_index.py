@@ -0,0 +1,98 @@
+import difflib
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .fast_path import normalize_command
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de caracteres do texto normalizado, com fronteiras de palavra."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Índice de nomes para IDs com busca aproximada.
+    
+    Um índice invertido de trigramas seleciona os candidatos que compartilham trigramas com a
+    consulta; os melhores são reordenados combinando a cobertura de trigramas (do nome pela
+    consulta ou da consulta pelo nome, a maior) com a razão de similaridade do difflib. Assim
+    "atualiza a rotina de exercícios" encontra "Exercícios matinais" sem que o modelo precise ver a lista inteira.
+    """
+    
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._normalized: List[str] = []
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for entry_id, name in entries:
+            if not entry_id or not name:
+                continue
+            normalized = normalize_command(str(name))
+            position = len(self._ids)
+            self._ids.append(str(entry_id))
+            self._names.append(str(name))
+            self._normalized.append(normalized)
+            self._grams.append(trigrams(normalized))
+            for gram in self._grams[position]:
+                self._postings.setdefault(gram, []).append(position)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def search(self, query: str, limit: int = 5, min_score: float = 0.4) -> List[Tuple[str, str, float]]:
+        """Retorna até `limit` candidatos (id, nome, pontuação de 0 a 1), do mais ao menos provável."""
+        normalized = normalize_command(query)
+        query_grams = trigrams(normalized)
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        
+        # Pré-seleção barata pelos trigramas antes do difflib
+        def coverage(position: int) -> float:
+            return max(shared[position] / len(self._grams[position]), shared[position] / len(query_grams))
+        
+        shortlist = sorted(shared, key=coverage, reverse=True)[:limit * 4]
+        results = []
+        for position in shortlist:
+            ratio = difflib.SequenceMatcher(None, normalized, self._normalized[position]).ratio()
+            score = 0.7 * coverage(position) + 0.3 * ratio
+            if normalized == self._normalized[position]:
+                score = 1.0
+            if score >= min_score:
+                results.append((self._ids[position], self._names[position], round(score, 2)))
+        results.sort(key=lambda result: result[2], reverse=True)
+        return results[:limit]
+
+
+class SnapshotNameIndex:
+    """Mantém um NameIndex do snapshot atual, reconstruído apenas quando o snapshot muda."""
+    
+    def __init__(self, entries: Callable[[Any], Iterable[Tuple[str, str]]]):
+        self.entries = entries
+        self._snapshot: Any = None
+        self._index: Optional[NameIndex] = None
+        self.builds = 0
+    
+    def for_snapshot(self, snapshot: Any) -> NameIndex:
+        """Índice do snapshot; o SnapshotCache devolve o mesmo objeto enquanto o valor não muda."""
+        if self._index is None or snapshot is not self._snapshot:
+            self._index = NameIndex(self.entries(snapshot))
+            self._snapshot = snapshot
+            self.builds += 1
+        return self._index
+
+
+def format_candidates(query: str, candidates: List[Tuple[str, str, float]], kind: str) -> str:
+    """Formata os candidatos de uma busca por nome para a resposta da ferramenta."""
+    if not candidates:
+        return f"Nenhuma {kind} encontrada com nome parecido com '{query}'."
+    lines = [f"Candidatos para '{query}' (ID | nome | similaridade):"]
+    lines += [f"- {entry_id} | {name} | {score:.2f}" for entry_id, name, score in candidates]
+    return "\n".join(lines)
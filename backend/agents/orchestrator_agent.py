@@ -1,84 +1,112 @@
 from .base_agent import BaseAgent
-from .specialized.task_agent import TaskAgent
+from .specialized.task_agent import TaskAgent, task_snapshot
 from .specialized.routine_agent import RoutineAgent
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain.tools import Tool
 from typing import Dict, List, Any, Optional
+from contextvars import ContextVar
 import logging
 import traceback
 import time
 from datetime import datetime
 from .tools import get_available_tools
+from .intent_classifier import get_intent_router
+from .session import AgentSession
+from .passthrough import PassthroughAgentExecutor
+from .prefetch import TurnContext, current_turn
+from .streaming import WebSocketStreamHandler
+from config.settings import get_settings
 from utils.websocket_utils import send_websocket_message as send_ws_message
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class OrchestratorAgent(BaseAgent):
-    def __init__(self, client_id: int):
-        # Obter data atual
-        today = datetime.now()
-        date_str = today.strftime("%d/%m/%Y")
-        
-        # Mapeamento de dias da semana em português
-        weekdays = {
-            0: "Segunda-feira",
-            1: "Terça-feira",
-            2: "Quarta-feira",
-            3: "Quinta-feira",
-            4: "Sexta-feira",
-            5: "Sábado",
-            6: "Domingo"
-        }
-        weekday = weekdays[today.weekday()]
-        
-        system_prompt = f"""Você é um agente orquestrador que coordena outros agentes especializados.
-        Data atual: {date_str} ({weekday})
+settings = get_settings()
+
+# Janela do histórico anterior à mensagem do turno atual, repassada aos agentes especializados
+turn_history: ContextVar[Optional[List]] = ContextVar("turn_history", default=None)
+
+# Mapeamento de dias da semana em português
+WEEKDAYS = {
+    0: "Segunda-feira",
+    1: "Terça-feira",
+    2: "Quarta-feira",
+    3: "Quinta-feira",
+    4: "Sexta-feira",
+    5: "Sábado",
+    6: "Domingo"
+}
+
+SYSTEM_PROMPT_TEMPLATE = """Você é um agente orquestrador que coordena outros agentes especializados.
+        Data atual: {current_date}
         Sua função é analisar as mensagens dos usuários e direcioná-las para o agente apropriado.
         Você tem acesso a ferramentas para rotear mensagens para diferentes agentes especializados.
         Sempre forneça respostas claras e organizadas."""
+
+# Modo plano: um único executor com as ferramentas de tarefas e rotinas, sem roteamento
+FLAT_SYSTEM_PROMPT_TEMPLATE = """Você é um assistente que gerencia as tarefas e as rotinas do usuário.
+        Data atual: {current_date}
+        Você tem acesso direto às ferramentas das APIs de tarefas e de rotinas, além de ferramentas gerais.
+        Use as ferramentas de tarefas para criar, listar, atualizar ou remover tarefas, e as de rotinas para rotinas.
+        Ao criar ou atualizar rotinas, apenas o campo 'name' é obrigatório; os demais são opcionais e têm
+        os valores padrão status 'pending', schedule '09:00', frequency 'daily' e priority 'low'.
+        Sempre forneça respostas claras e organizadas."""
+
+AGENT_MODES = ("nested", "flat")
+
+def current_date_label() -> str:
+    """Retorna a data atual no formato usado pelo prompt do orquestrador."""
+    today = datetime.now()
+    return f"{today.strftime('%d/%m/%Y')} ({WEEKDAYS[today.weekday()]})"
+
+class OrchestratorAgent(BaseAgent):
+    def __init__(self, client_id: int = None, task_agent: TaskAgent = None, routine_agent: RoutineAgent = None, mode: str = None):
+        # nested: roteia para os agentes especializados; flat: expõe as ferramentas deles diretamente
+        self.mode = mode or settings.agent_mode
+        if self.mode not in AGENT_MODES:
+            raise ValueError(f"Modo de agente inválido: {self.mode}. Use um de {AGENT_MODES}")
+        self.system_prompt_template = FLAT_SYSTEM_PROMPT_TEMPLATE if self.mode == "flat" else SYSTEM_PROMPT_TEMPLATE
+        system_prompt = self.system_prompt_template.format(current_date=current_date_label())
         
-        super().__init__(system_prompt, client_id=client_id)
+        # Só a saída do orquestrador é transmitida ao cliente token a token
+        super().__init__(system_prompt, client_id=client_id, streaming=True)
         
-        # Inicializar agentes especializados
+        # Inicializar agentes especializados (reaproveitando os compartilhados, se fornecidos)
         logger.info(f"OrchestratorAgent: Inicializando agentes especializados, client_id: {client_id}")
-        self.task_agent = TaskAgent(client_id=client_id)
-        self.routine_agent = RoutineAgent(client_id=client_id)
+        self.task_agent = task_agent or TaskAgent(client_id=client_id)
+        self.routine_agent = routine_agent or RoutineAgent(client_id=client_id)
         orchestrator_agent_tools = get_available_tools(client_id)
 
-        # Definir as ferramentas de roteamento
-        logger.info("OrchestratorAgent: Configurando ferramentas de roteamento")
-        self.tools = [
-            *orchestrator_agent_tools,
-            Tool(
-                name="route_to_task_agent",
-                func=self.route_to_task_agent,
-                coroutine=self.route_to_task_agent,
-                description="Roteia uma mensagem para o agente de tarefas. Use esta ferramenta quando a mensagem estiver relacionada a tarefas, como criar, listar, atualizar ou remover tarefas.",
-            ),
-            Tool(
-                name="route_to_routine_agent",
-                func=self.route_to_routine_agent,
-                coroutine=self.route_to_routine_agent,
-                description="Roteia uma mensagem para o agente de rotinas. Use esta ferramenta quando a mensagem estiver relacionada a rotinas, como criar, listar, atualizar ou remover rotinas.",
-            )
-        ]
+        if self.mode == "flat":
+            # Um único laço do executor atende o pedido inteiro
+            logger.info("OrchestratorAgent: Modo plano, usando as ferramentas dos agentes especializados")
+            self.tools = [
+                *orchestrator_agent_tools,
+                *self.task_agent.tools,
+                *self.routine_agent.tools,
+            ]
+        else:
+            self.tools = self._routing_tools(orchestrator_agent_tools)
+            if settings.intent_router_enabled:
+                # Treina o classificador de intenção na inicialização, fora do caminho da primeira mensagem
+                get_intent_router()
         
         # Criar o prompt para o agente
         logger.info("OrchestratorAgent: Configurando prompt do agente")
+        # A data é resolvida a cada invocação, já que o agente vive enquanto o servidor estiver no ar
         self.prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
+            ("system", self.system_prompt_template),
             MessagesPlaceholder(variable_name="chat_history"),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
+        ]).partial(current_date=current_date_label)
         
         # Criar o agente
         logger.info("OrchestratorAgent: Criando agente com OpenAI Functions")
-        self.agent = create_openai_functions_agent(
+        self.agent = create_openai_tools_agent(
             llm=self.llm,
             tools=self.tools,
             prompt=self.prompt
@@ -86,12 +114,38 @@ class OrchestratorAgent(BaseAgent):
         
         # Criar o executor do agente
         logger.info("OrchestratorAgent: Configurando executor do agente")
-        self.agent_executor = AgentExecutor(
+        # Respostas finais dos agentes especializados vão direto ao cliente, sem reescrita pelo LLM
+        self.agent_executor = PassthroughAgentExecutor(
             agent=self.agent,
             tools=self.tools,
+            passthrough=settings.subagent_passthrough,
+            max_parallel_tools=settings.max_parallel_tools,
             verbose=True
         )
 
+    def _routing_tools(self, orchestrator_agent_tools: List[Tool]) -> List[Tool]:
+        # Definir as ferramentas de roteamento
+        logger.info("OrchestratorAgent: Configurando ferramentas de roteamento")
+        return [
+            *orchestrator_agent_tools,
+            Tool(
+                name="route_to_task_agent",
+                func=self.route_to_task_agent,
+                coroutine=self.route_to_task_agent,
+                description="Roteia uma mensagem para o agente de tarefas. Use esta ferramenta quando a mensagem estiver relacionada a tarefas, como criar, listar, atualizar ou remover tarefas.",
+            ),
+            Tool(
+                name="route_to_routine_agent",
+                func=self.route_to_routine_agent,
+                coroutine=self.route_to_routine_agent,
+                description="Roteia uma mensagem para o agente de rotinas. Use esta ferramenta quando a mensagem estiver relacionada a rotinas, como criar, listar, atualizar ou remover rotinas.",
+            )
+        ]
+
+    def new_session(self, client_id: int) -> AgentSession:
+        """Cria a sessão de um cliente com o prompt do sistema na data atual."""
+        return AgentSession(client_id, self.system_prompt_template.format(current_date=current_date_label()))
+
     async def send_websocket_message(self, message: str, client_id: str, type: str):
         # Envia uma mensagem para o cliente, via websocket
         await send_ws_message(message, client_id, type, "text")
@@ -102,8 +156,8 @@ class OrchestratorAgent(BaseAgent):
             start_time = time.time()
             logger.info(f"OrchestratorAgent: Iniciando route_to_task_agent com mensagem: {message}")
             
-            # Filtrar mensagens do sistema do histórico de conversa
-            filtered_history = [msg for msg in self.conversation_history if not isinstance(msg, SystemMessage)]
+            # Janela recente do histórico, sem a mensagem atual (enviada ao agente como input)
+            filtered_history = self._history_for_subagent()
             
             # Chamar o método assíncrono do TaskAgent
             logger.info("OrchestratorAgent: Chamando process_message do TaskAgent")
@@ -126,8 +180,8 @@ class OrchestratorAgent(BaseAgent):
             start_time = time.time()
             logger.info(f"OrchestratorAgent: Iniciando route_to_routine_agent com mensagem: {message}")
             
-            # Filtrar mensagens do sistema do histórico de conversa
-            filtered_history = [msg for msg in self.conversation_history if not isinstance(msg, SystemMessage)]
+            # Janela recente do histórico, sem a mensagem atual (enviada ao agente como input)
+            filtered_history = self._history_for_subagent()
             
             # Chamar diretamente o método assíncrono do RoutineAgent
             logger.info("OrchestratorAgent: Chamando process_message do RoutineAgent")
@@ -144,27 +198,73 @@ class OrchestratorAgent(BaseAgent):
             logger.error(f"OrchestratorAgent: Traceback: {traceback.format_exc()}")
             return error_msg
     
-    async def process_message(self, message: str, response_format: str = "markdown", websocket=None):
-        """Processa uma mensagem de forma síncrona."""
+    def _history_for_subagent(self) -> List:
+        """Janela do histórico capturada antes da mensagem do turno; fora de um turno, a janela atual."""
+        history = turn_history.get()
+        if history is None:
+            history = self.conversation_history.window()
+        return history
+    
+    def _local_route(self, message: str) -> Optional[str]:
+        """Ferramenta de roteamento escolhida pelo classificador local, ou None para o LLM decidir."""
+        # Sem passthrough, o LLM do orquestrador reescreve a resposta: ele mesmo roteia
+        if self.mode != "nested" or not settings.intent_router_enabled or not settings.subagent_passthrough:
+            return None
+        return get_intent_router().route(message)
+    
+    def _start_prefetch(self, route: Optional[str]) -> Optional[TurnContext]:
+        """
+        Inicia, em paralelo com o roteamento, a busca do contexto de tarefas e de rotinas.
+        
+        Só no modo nested, onde os agentes especializados consomem esse contexto; se o classificador
+        local já escolheu o agente, busca apenas o contexto dele.
+        """
+        if not settings.speculative_prefetch or self.mode != "nested":
+            return None
+        turn = TurnContext()
+        if route in (None, "route_to_task_agent"):
+            turn.start("tasks", task_snapshot.get())
+        if route in (None, "route_to_routine_agent"):
+            turn.start("routines", self.routine_agent.routine_replica.sync())
+        return turn
+    
+    async def process_message(self, message: str, response_format: str = "markdown", websocket=None, stream: bool = False):
+        """Processa uma mensagem; com stream=True, os tokens e eventos de ferramentas são enviados ao cliente à medida que surgem."""
+        # Intenções claras de tarefas ou rotinas vão direto ao agente especializado, sem a chamada de roteamento
+        route = self._local_route(message)
+        # O agente escolhido consome o contexto já resolvido; o restante é cancelado ao fim do turno
+        turn = self._start_prefetch(route)
+        turn_token = current_turn.set(turn)
+        # Janela do histórico anterior à mensagem atual, também usada pelos agentes especializados
+        chat_history = self.conversation_history.window()
+        history_token = turn_history.set(chat_history)
         try:
             start_time = time.time()
             logger.info(f"OrchestratorAgent: Processando mensagem: {message}")
+            
             # Adicionar a mensagem do usuário ao histórico
             self.conversation_history.append(HumanMessage(content=message))
             
-            # Obter resposta do agente
-            logger.info("OrchestratorAgent: Invocando agent_executor")
-            response = await self.agent_executor.ainvoke({
-                "input": message,
-                "chat_history": self.conversation_history[:-1]
-            })
-            
-            response_text = response["output"]
+            if route is not None:
+                logger.info(f"OrchestratorAgent: Roteamento local para {route}")
+                # O resultado é a resposta do turno, mesmo um erro: rotear de novo pelo LLM repetiria as ações do agente
+                response_text = str(await getattr(self, route)(message))
+            else:
+                # Obter resposta do agente
+                logger.info("OrchestratorAgent: Invocando agent_executor")
+                config = {"callbacks": [WebSocketStreamHandler(self.client_id, response_format)]} if stream else None
+                response = await self.agent_executor.ainvoke({
+                    "input": message,
+                    "chat_history": chat_history
+                }, config=config)
+                
+                response_text = response["output"]
             elapsed_time = time.time() - start_time
             logger.info(f"OrchestratorAgent: Resposta obtida em {elapsed_time:.2f}s: {response_text}")
             
-            # Adicionar a resposta ao histórico
+            # Adicionar a resposta ao histórico e, se preciso, resumir as mensagens antigas em segundo plano
             self.conversation_history.append(AIMessage(content=response_text))
+            self.conversation_history.schedule_summary(self.llm)
             await self.send_websocket_message("Finalizando processamento da mensagem", self.client_id, "agent_response_end")
             
             return response_text
@@ -174,4 +274,9 @@ class OrchestratorAgent(BaseAgent):
             error_message = f"Erro ao processar mensagem após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"OrchestratorAgent: {error_message}")
             logger.error(f"OrchestratorAgent: Traceback: {traceback.format_exc()}")
-            raise Exception(error_message) 
\ No newline at end of file
+            raise Exception(error_message)
+        finally:
+            if turn is not None:
+                turn.close()
+            current_turn.reset(turn_token)
+            turn_history.reset(history_token) 
\ No newline at end of file
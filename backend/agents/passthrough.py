@@ -0,0 +1,59 @@
+import logging
+from typing import Optional, Tuple
+
+from langchain_core.agents import AgentAction, AgentFinish
+
+from .executor import ParallelAgentExecutor
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Contadores globais do repasse de respostas dos agentes especializados, expostos em /api/agents/stats
+PASSTHROUGH_STATS = {
+    "passthrough": 0,
+    "rewritten": 0,
+}
+
+# Saídas do AgentExecutor quando o limite de iterações ou de tempo é atingido; não estão prontas para o usuário
+STOPPED_OUTPUT_PREFIX = "Agent stopped due to"
+
+
+class FinalAnswer(str):
+    """Resposta de um agente especializado já pronta para o usuário, repassada sem reescrita pelo orquestrador."""
+
+
+def final_answer(output: str) -> str:
+    """Marca a saída de um agente especializado como resposta final, exceto quando o executor parou por limite."""
+    if not isinstance(output, str) or output.startswith(STOPPED_OUTPUT_PREFIX):
+        return output
+    return FinalAnswer(output)
+
+
+class PassthroughAgentExecutor(ParallelAgentExecutor):
+    """
+    AgentExecutor do orquestrador que encerra o turno quando uma ferramenta de roteamento devolve
+    uma FinalAnswer.
+    
+    Sem isso, a resposta já formatada do agente especializado volta ao LLM do orquestrador, que
+    gasta mais uma geração completa apenas para reescrevê-la. Respostas de erro (strings comuns)
+    continuam voltando ao LLM, que decide como explicá-las ao usuário.
+    """
+    
+    passthrough: bool = True
+    
+    def _get_tool_return(self, next_step_output: Tuple[AgentAction, str]) -> Optional[AgentFinish]:
+        tool_return = super()._get_tool_return(next_step_output)
+        if tool_return is not None:
+            return tool_return
+        
+        agent_action, observation = next_step_output
+        if not isinstance(observation, FinalAnswer):
+            return None
+        if not self.passthrough:
+            PASSTHROUGH_STATS["rewritten"] += 1
+            return None
+        
+        logger.info(f"PassthroughAgentExecutor: Repassando a resposta de {agent_action.tool} sem reescrita")
+        PASSTHROUGH_STATS["passthrough"] += 1
+        return_value_key = self.agent.return_values[0] if self.agent.return_values else "output"
+        return AgentFinish({return_value_key: str(observation)}, "")
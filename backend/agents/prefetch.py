@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Contadores globais de aproveitamento do prefetch, expostos em /api/agents/stats
+PREFETCH_STATS = {
+    "started": 0,
+    "used": 0,
+    "discarded": 0,
+    "cancelled": 0,
+    "failed": 0,
+}
+
+
+class TurnContext:
+    """
+    Contexto de um turno do orquestrador.
+    
+    Guarda as buscas de contexto (tarefas e rotinas) iniciadas especulativamente em paralelo
+    com a chamada de roteamento do LLM. O agente especializado escolhido consome o resultado
+    já resolvido com take(); as buscas não consumidas são canceladas (se ainda pendentes) ou
+    descartadas ao fim do turno.
+    """
+    
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._consumed: set = set()
+    
+    def start(self, name: str, awaitable: Awaitable[Any]) -> None:
+        """Inicia uma busca em segundo plano."""
+        self._tasks[name] = asyncio.ensure_future(awaitable)
+        PREFETCH_STATS["started"] += 1
+    
+    async def take(self, name: str, default: Any = None) -> Any:
+        """Aguarda e retorna o resultado de uma busca; `default` se não houver ou se ela falhou."""
+        task = self._tasks.get(name)
+        if task is None:
+            return default
+        self._consumed.add(name)
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            PREFETCH_STATS["failed"] += 1
+            logger.warning(f"TurnContext: Prefetch de {name} falhou: {str(e)}")
+            return default
+        PREFETCH_STATS["used"] += 1
+        return result
+    
+    def close(self) -> None:
+        """Cancela ou descarta as buscas que nenhum agente consumiu."""
+        for name, task in self._tasks.items():
+            if name in self._consumed:
+                continue
+            if not task.done():
+                task.cancel()
+                PREFETCH_STATS["cancelled"] += 1
+            else:
+                # Recupera a exceção, se houver, para não gerar avisos de exceção não tratada
+                if not task.cancelled() and task.exception() is not None:
+                    PREFETCH_STATS["failed"] += 1
+                PREFETCH_STATS["discarded"] += 1
+        self._tasks.clear()
+
+
+# Turno ativo no contexto assíncrono atual (definido pelo orquestrador a cada mensagem)
+current_turn: ContextVar[Optional[TurnContext]] = ContextVar("current_turn", default=None)
+
+
+async def take_prefetched(name: str, default: Any = None) -> Any:
+    """Consome uma busca antecipada do turno atual, se houver."""
+    turn = current_turn.get()
+    if turn is None:
+        return default
+    return await turn.take(name, default)
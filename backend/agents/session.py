@@ -0,0 +1,76 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from .history import ConversationHistory
+
+
+class AgentSession:
+    """Estado leve de uma conexão: apenas o cliente e o histórico da conversa.
+    
+    Os agentes (prompts, ferramentas e executores) são compartilhados entre
+    todas as conexões; tudo que é específico do cliente fica aqui.
+    """
+    
+    def __init__(self, client_id: int, system_prompt: Optional[str] = None):
+        self.client_id = client_id
+        self.conversation_history = ConversationHistory()
+        if system_prompt:
+            self.conversation_history.append(SystemMessage(content=system_prompt))
+        self.last_text = ""
+        self.created_at = time.time()
+        self.last_active = self.created_at
+    
+    @property
+    def conversation_history(self) -> ConversationHistory:
+        return self._conversation_history
+    
+    @conversation_history.setter
+    def conversation_history(self, value: Iterable[BaseMessage]) -> None:
+        # Listas simples (ex.: reset_conversation) são convertidas para o histórico com janela
+        if not isinstance(value, ConversationHistory):
+            value = ConversationHistory(value)
+        self._conversation_history = value
+    
+    def touch(self) -> None:
+        """Atualiza o instante da última atividade da sessão."""
+        self.last_active = time.time()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa a sessão (histórico e metadados) para hibernação."""
+        return {
+            "client_id": self.client_id,
+            "last_text": self.last_text,
+            "created_at": self.created_at,
+            "last_active": self.last_active,
+            "history": self.conversation_history.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentSession":
+        """Reconstrói uma sessão serializada por to_dict."""
+        session = cls(data["client_id"])
+        session.conversation_history = ConversationHistory.from_dict(data.get("history", {}))
+        session.last_text = data.get("last_text", "")
+        session.created_at = data.get("created_at", session.created_at)
+        session.last_active = data.get("last_active", session.last_active)
+        return session
+
+
+# Sessão ativa no contexto assíncrono atual (definida pelo AgentsManager a cada mensagem)
+current_session: ContextVar[Optional[AgentSession]] = ContextVar("current_session", default=None)
+
+
+def get_current_session() -> Optional[AgentSession]:
+    """Retorna a sessão ativa no contexto atual, se houver."""
+    return current_session.get()
+
+
+def get_current_client_id(default: Optional[int] = None) -> Optional[int]:
+    """Retorna o client_id da sessão ativa ou o valor padrão."""
+    session = current_session.get()
+    if session is not None:
+        return session.client_id
+    return default
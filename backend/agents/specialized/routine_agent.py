@@ -6,15 +6,23 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-import requests
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 from langchain_openai import ChatOpenAI
 
 from ..base_agent import BaseAgent
+from ..context_selector import ContextSelector
+from ..executor import ParallelAgentExecutor
+from ..history import as_chat_history
+from ..name_index import format_candidates
+from ..passthrough import final_answer
+from ..prefetch import take_prefetched
+from .routine_replica import RoutineReplica
+from .tool_schemas import CreateRoutineInput, UpdateRoutineInput
 from config.settings import get_settings
+from utils.http_client import LatencyMetrics, request_with_retry
 from utils.logger import get_logger
 from utils.websocket_utils import send_websocket_message as send_ws_message
 from functools import partial
@@ -26,12 +34,14 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 class RoutineAPIClient:
-    """Cliente para interagir com a API de rotinas."""
+    """Cliente assíncrono para interagir com a API de rotinas (pool HTTP compartilhado)."""
     
-    def __init__(self, client_id: int):
-        self.base_url = "https://api.itenorio.com/lambda/routines"
+    def __init__(self, client_id: int, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.routine_api_url).rstrip("/")
         self.client_id = client_id
-    def _make_request(self, operation: str, method: str, url: str, **kwargs) -> tuple[bool, str, dict]:
+        self.metrics = LatencyMetrics()
+    
+    async def _make_request(self, operation: str, method: str, url: str, **kwargs) -> tuple[bool, str, dict]:
         """
         Faz uma requisição para a API.
         
@@ -39,14 +49,16 @@ class RoutineAPIClient:
             operation: Nome da operação sendo realizada
             method: Método HTTP (GET, POST, PUT, DELETE)
             url: URL da API
-            **kwargs: Argumentos adicionais para requests
+            **kwargs: Argumentos adicionais para httpx
             
         Returns:
             tuple[bool, str, dict]: (sucesso, mensagem, dados)
         """
         try:
             logger.info(f"RoutineAgent: Fazendo requisição {method} para {url}")
-            response = getattr(requests, method.lower())(url, **kwargs)
+            # Métricas agrupadas por rota, sem o ID da rotina
+            endpoint = f"{method} /routines" + ("/{id}" if url != self.base_url else "")
+            response = await request_with_retry(method, url, metrics=self.metrics, endpoint=endpoint, **kwargs)
             
             # Verificar status code
             if not 200 <= response.status_code < 300:
@@ -93,25 +105,27 @@ class RoutineAPIClient:
             logger.error(f"RoutineAgent: Traceback: {traceback.format_exc()}")
             return False, error_msg, {}
     
-    def get_routines(self) -> tuple[bool, str, dict]:
-        """Lista todas as rotinas."""
-        return self._make_request("listagem de rotinas", "GET", self.base_url)
+    async def get_routines(self, updated_since: Optional[str] = None) -> tuple[bool, str, dict]:
+        """Lista todas as rotinas ou, com updated_since, apenas as alteradas depois dessa data."""
+        if updated_since:
+            return await self._make_request("listagem incremental de rotinas", "GET", self.base_url, params={"updated_since": updated_since})
+        return await self._make_request("listagem de rotinas", "GET", self.base_url)
     
-    def get_routine(self, routine_id: str) -> tuple[bool, str, dict]:
+    async def get_routine(self, routine_id: str) -> tuple[bool, str, dict]:
         """Obtém uma rotina específica."""
-        return self._make_request(f"obtenção da rotina {routine_id}", "GET", f"{self.base_url}/{routine_id}")
+        return await self._make_request(f"obtenção da rotina {routine_id}", "GET", f"{self.base_url}/{routine_id}")
     
-    def create_routine(self, data: str, headers: dict) -> tuple[bool, str, dict]:
+    async def create_routine(self, data: str, headers: dict) -> tuple[bool, str, dict]:
         """Cria uma nova rotina."""
-        return self._make_request("criação de rotina", "POST", self.base_url, data=data, headers=headers)
+        return await self._make_request("criação de rotina", "POST", self.base_url, content=data, headers=headers)
     
-    def update_routine(self, routine_id: str, data: dict) -> tuple[bool, str, dict]:
+    async def update_routine(self, routine_id: str, data: dict) -> tuple[bool, str, dict]:
         """Atualiza uma rotina existente."""
-        return self._make_request(f"atualização da rotina {routine_id}", "PUT", f"{self.base_url}/{routine_id}", json=data)
+        return await self._make_request(f"atualização da rotina {routine_id}", "PUT", f"{self.base_url}/{routine_id}", json=data)
     
-    def delete_routine(self, routine_id: str) -> tuple[bool, str, dict]:
+    async def delete_routine(self, routine_id: str) -> tuple[bool, str, dict]:
         """Deleta uma rotina existente."""
-        return self._make_request(f"remoção da rotina {routine_id}", "DELETE", f"{self.base_url}/{routine_id}")
+        return await self._make_request(f"remoção da rotina {routine_id}", "DELETE", f"{self.base_url}/{routine_id}")
 
 class RoutineAgent(BaseAgent):
     """Agente especializado em gerenciar rotinas."""
@@ -133,6 +147,9 @@ class RoutineAgent(BaseAgent):
         - priority: 'low'
         
         Para ocultar os campos opcionais é só não enviar o campo, não é necessário enviar o campo com valor None.
+        
+        Quando o usuário citar uma rotina pelo nome, use find_routine_id para obter o ID.
+        O contexto traz apenas as rotinas mais relevantes para a mensagem; use get_routines para ver todas.
         """
         
         super().__init__(system_prompt, client_id=client_id)
@@ -140,6 +157,31 @@ class RoutineAgent(BaseAgent):
         # Inicializar o cliente da API
         self.api_client = RoutineAPIClient(client_id)
         
+        # Réplica local das rotinas, sincronizada de forma incremental
+        self.routine_replica = RoutineReplica(self.api_client, full_sync_interval=settings.routine_full_sync_interval)
+        # Rotinas injetadas no contexto de cada turno, ordenadas pela relevância para a mensagem
+        self.context_selector = ContextSelector(
+            "rotinas",
+            "Rotinas mais relevantes para a mensagem ({shown} de {total})",
+            columns=[
+                ("id", ('id',)),
+                ("nome", ('name',)),
+                ("status", ('status',)),
+                ("horario", ('schedule',)),
+                ("frequencia", ('frequency',)),
+                ("prioridade", ('priority',)),
+                ("tags", ('tags',)),
+                ("inicio", ('start_date',)),
+                ("fim", ('end_date',)),
+                ("descricao", ('description',)),
+            ],
+            text_fields=[('name',), ('description',), ('tags',)],
+            keyword_fields=[('status',), ('priority',), ('frequency',)],
+            date_fields=[('start_date',), ('end_date',)],
+            top_k=settings.context_top_k,
+            token_budget=settings.context_token_budget
+        )
+        
         # Definir campos obrigatórios e seus tipos
         self.required_fields = {
             'name': str
@@ -162,42 +204,51 @@ class RoutineAgent(BaseAgent):
         }
 
         
-        # Definir as ferramentas específicas para rotinas
+        # Definir as ferramentas específicas para rotinas; a saída delas já está pronta para o usuário
+        # e encerra o turno quando são a única chamada do passo (ver ParallelAgentExecutor)
         self.tools = [
             Tool(
                 name="get_routines",
                 func=self.get_routines,
                 coroutine=self.get_routines,
                 description="Lista todas as rotinas disponíveis. Use esta ferramenta quando o usuário quiser ver todas as rotinas.",
-                return_direct=True
+                metadata={"return_direct": True}
+            ),
+            Tool(
+                name="find_routine_id",
+                func=self.find_routine_id,
+                coroutine=self.find_routine_id,
+                description="Encontra o ID de uma rotina pelo nome (busca aproximada). Parâmetro: nome ou parte do nome da rotina. Use antes de get_routine, update_routine ou delete_routine quando o usuário citar a rotina pelo nome."
             ),
             Tool(
                 name="get_routine",
                 func=self.get_routine,
                 coroutine=self.get_routine,
                 description="Obtém detalhes de uma rotina específica pelo ID. Use esta ferramenta quando o usuário quiser ver detalhes de uma rotina específica.",
-                return_direct=True
+                metadata={"return_direct": True}
             ),
-            Tool(
+            StructuredTool(
                 name="create_routine",
                 func=self.create_routine,
                 coroutine=self.create_routine,
+                args_schema=CreateRoutineInput,
                 description="Cria uma nova rotina. Use esta ferramenta quando o usuário quiser criar uma nova rotina.",
-                return_direct=True
+                metadata={"return_direct": True}
             ),
-            Tool(
+            StructuredTool(
                 name="update_routine",
                 func=self.update_routine,
                 coroutine=self.update_routine,
-                description="Atualiza uma rotina existente. Use esta ferramenta quando o usuário quiser modificar uma rotina existente.",
-                return_direct=True
+                args_schema=UpdateRoutineInput,
+                description="Atualiza uma rotina existente. Envie apenas os campos que devem mudar. Use esta ferramenta quando o usuário quiser modificar uma rotina existente.",
+                metadata={"return_direct": True}
             ),
             Tool(
                 name="delete_routine",
                 func=self.delete_routine,
                 coroutine=self.delete_routine,
                 description="Remove uma rotina pelo ID. Use esta ferramenta quando o usuário quiser excluir uma rotina.",
-                return_direct=True
+                metadata={"return_direct": True}
             )
         ]
         
@@ -205,13 +256,15 @@ class RoutineAgent(BaseAgent):
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", system_prompt),
             MessagesPlaceholder(variable_name="chat_history"),
+            # Contexto do turno (ex.: lista carregada da API), separado do histórico compartilhado
+            MessagesPlaceholder(variable_name="context", optional=True),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
         # Criar o agente
         logger.info("RoutineAgent: Criando agente com OpenAI Functions")
-        self.agent = create_openai_functions_agent(
+        self.agent = create_openai_tools_agent(
             llm=self.llm,
             tools=self.tools,
             prompt=self.prompt
@@ -219,9 +272,10 @@ class RoutineAgent(BaseAgent):
         
         # Criar o executor do agente
         logger.info("RoutineAgent: Configurando executor do agente")
-        self.agent_executor = AgentExecutor(
+        self.agent_executor = ParallelAgentExecutor(
             agent=self.agent,
             tools=self.tools,
+            max_parallel_tools=settings.max_parallel_tools,
             verbose=True
         )
         
@@ -323,50 +377,30 @@ class RoutineAgent(BaseAgent):
             start_time = time.time()
             logger.info(f"RoutineAgent: Processing message: {message}, client_id: {self.client_id}")
             
-            # Converter o histórico de chat para o formato do LangChain
-            langchain_history = []
-            if chat_history:
-                for msg in chat_history:
-                    # Verificar o tipo de mensagem
-                    if isinstance(msg, HumanMessage):
-                        langchain_history.append(msg)
-                    elif isinstance(msg, AIMessage):
-                        langchain_history.append(msg)
-                    elif isinstance(msg, SystemMessage):
-                        # Ignorar mensagens do sistema, pois já estão no prompt
-                        continue
-                    elif isinstance(msg, dict):
-                        # Se for um dicionário, converter para o formato apropriado
-                        if msg.get("role") == "user":
-                            langchain_history.append(HumanMessage(content=msg.get("content", "")))
-                        elif msg.get("role") == "assistant":
-                            langchain_history.append(AIMessage(content=msg.get("content", "")))
-            
-            # Verificar se já carregamos as rotinas no histórico
-            routines_loaded = False
-            for msg in langchain_history:
-                if isinstance(msg, AIMessage) and "Here are all your routines:" in msg.content:
-                    routines_loaded = True
-                    break
-            
-            # Se não carregamos as rotinas ainda, carregar agora
-            if not routines_loaded:
-                logger.info("RoutineAgent: Loading routines into chat history")
-                routines_message = self._load_routines_into_history()
-                if routines_message:
-                    langchain_history.append(AIMessage(content=routines_message))
+            # A janela compartilhada pelo orquestrador já vem filtrada e é usada sem cópia;
+            # outros formatos de histórico são convertidos
+            langchain_history = as_chat_history(chat_history)
+            context = []
+            
+            # Rotinas mais relevantes para esta mensagem, recalculadas a cada turno
+            logger.info("RoutineAgent: Loading routines into chat history")
+            routines_message = await self._load_routines_into_history(message)
+            if routines_message:
+                context.append(AIMessage(content=routines_message))
             
             # Processar a mensagem usando o executor do agente
             response = await self.agent_executor.ainvoke({
                 "input": message,
-                "chat_history": langchain_history
+                "chat_history": langchain_history,
+                "context": context
             })
             
             elapsed_time = time.time() - start_time
             result = response.get("output", "Sorry, I couldn't process your request.")
             
             logger.info(f"RoutineAgent: Response obtained in {elapsed_time:.2f}s: {result}")
-            return result
+            # Resposta pronta para o usuário: o orquestrador a repassa sem reescrever
+            return final_answer(result)
             
         except Exception as e:
             elapsed_time = time.time() - start_time
@@ -375,63 +409,39 @@ class RoutineAgent(BaseAgent):
             logger.error(f"RoutineAgent: Traceback: {traceback.format_exc()}")
             return error_msg
 
-    def _load_routines_into_history(self) -> str:
+    async def _load_routines_into_history(self, message: str) -> str:
         """
-        Carrega todas as rotinas no histórico de chat.
+        Carrega no histórico de chat as rotinas mais relevantes para a mensagem.
         
+        Args:
+            message: Mensagem do usuário, usada para ordenar as rotinas por relevância
+            
         Returns:
-            str: Mensagem formatada com todas as rotinas ou None se não houver rotinas
+            str: Tabela compacta com as rotinas selecionadas ou None se não houver rotinas
         """
         try:
-            logger.info("RoutineAgent: Loading all routines into chat history")
-            
-            # Buscar todas as rotinas
-            success, error_msg, data = self.api_client.get_routines()
-            if not success:
-                logger.error(f"RoutineAgent: Error loading routines: {error_msg}")
+            logger.info("RoutineAgent: Selecting relevant routines for chat history")
+            
+            # Buscar apenas as rotinas alteradas desde a última sincronização, reaproveitando
+            # a sincronização iniciada pelo orquestrador durante o roteamento
+            synced = await take_prefetched("routines")
+            if synced is None:
+                synced = await self.routine_replica.sync()
+            if not synced and not len(self.routine_replica):
                 return None
             
-            # Obter os dados das rotinas
-            routines = data.get('data', [])
-            if not routines:
+            # O texto completo da réplica é memorizado e só identifica a versão para medir a economia
+            result = self.context_selector.select(
+                message,
+                self.routine_replica.routines(),
+                snapshot=self.routine_replica.render(),
+                full_text=self.routine_replica.render
+            )
+            if not result:
                 logger.info("RoutineAgent: No routines found to load into history")
                 return None
             
-            # Formatar a mensagem
-            result = "Here are all your routines:\n\n"
-            
-            field_labels = {
-                'name': 'Name',
-                'description': 'Description',
-                'status': 'Status',
-                'schedule': 'Schedule',
-                'frequency': 'Frequency',
-                'priority': 'Priority',
-                'tags': 'Tags',
-                'estimated_duration': 'Duration',
-                'start_date': 'Start Date',
-                'end_date': 'End Date',
-                'id': 'ID'
-            }
-            
-            for routine in routines:
-                if isinstance(routine, dict):
-                    result += f"**{routine.get('name', 'No name')}**\n"
-                    for field, label in field_labels.items():
-                        if field in routine:
-                            value = routine[field]
-                            if field == 'tags' and isinstance(value, list):
-                                value = ', '.join(value)
-                            elif field == 'estimated_duration':
-                                value = f"{value} minutes"
-                            if field != 'name':  # Name already added as title
-                                result += f"- **{label}:** {value}\n"
-                    result += "\n"
-                else:
-                    # If routine is a string or other type, just display the value
-                    result += f"**Routine:** {routine}\n\n"
-            
-            logger.info(f"RoutineAgent: Loaded {len(routines)} routines into chat history")
+            logger.info(f"RoutineAgent: Loaded relevant routines out of {len(self.routine_replica)} into chat history")
             return result
             
         except Exception as e:
@@ -446,7 +456,7 @@ class RoutineAgent(BaseAgent):
             logger.info("RoutineAgent: Listing all routines")
             await self.send_websocket_message("Iniciando listagem de rotinas...", self.client_id, "function_call_start")
             
-            success, error_msg, result = self.api_client.get_routines()
+            success, error_msg, result = await self.api_client.get_routines()
             await self.send_websocket_message("Consultando API para obter rotinas...", self.client_id, "function_call_info")
             
             # Log detalhado da resposta da API
@@ -516,7 +526,25 @@ class RoutineAgent(BaseAgent):
             logger.error(f"RoutineAgent: Traceback: {traceback.format_exc()}")
             await self.send_websocket_message(f"Erro ao listar rotinas: {str(e)}", self.client_id, "function_call_error")
             return error_msg
-    def get_routine(self, routine_id: str = "", _=None) -> str:
+    
+    async def find_routine_id(self, name: str = "", _=None) -> str:
+        """Resolve o nome de uma rotina para os IDs candidatos, pelo índice da réplica local."""
+        if not name:
+            return "Please provide the name of the routine."
+        try:
+            if not self.routine_replica.synced and not await self.routine_replica.sync():
+                # Sem a primeira sincronização, um índice vazio diria que a rotina não existe
+                return f"Error finding routine ID for '{name}': could not load routines."
+            candidates = self.routine_replica.index().search(name)
+            logger.info(f"RoutineAgent: {len(candidates)} candidates for routine name '{name}'")
+            return format_candidates(name, candidates, "rotina")
+        except Exception as e:
+            error_msg = f"Error finding routine ID for '{name}': {str(e)}"
+            logger.error(f"RoutineAgent: {error_msg}")
+            logger.error(f"RoutineAgent: Traceback: {traceback.format_exc()}")
+            return error_msg
+    
+    async def get_routine(self, routine_id: str = "", _=None) -> str:
         """Obtém uma rotina específica pelo ID."""
         try:
             start_time = time.time()
@@ -528,7 +556,7 @@ class RoutineAgent(BaseAgent):
                 
             logger.info(f"RoutineAgent: Getting routine {routine_id}")
             
-            success, error_msg, result = self.api_client.get_routine(routine_id)
+            success, error_msg, result = await self.api_client.get_routine(routine_id)
             
             # Log detalhado da resposta da API
             logger.info(f"RoutineAgent: API get response - Success: {success}, Error: {error_msg}, Result: {json.dumps(result, indent=2)}")
@@ -584,76 +612,36 @@ class RoutineAgent(BaseAgent):
             logger.error(f"RoutineAgent: Traceback: {traceback.format_exc()}")
             return error_msg
     
-    async def create_routine(self, input_str: str = "", _=None) -> str:
-        """Cria uma nova rotina."""
+    async def create_routine(self, name: str, description: str = "", status: str = "pending", schedule: str = "09:00",
+                             frequency: str = "daily", priority: str = "low", tags: Optional[List[str]] = None,
+                             estimated_duration: int = 0, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
+        """Cria uma nova rotina (argumentos validados por CreateRoutineInput)."""
         func_name = "Create Routine"
         try:
             start_time = time.time()
-            logger.info(f"RoutineAgent: Creating routine with input: {input_str}")
+            logger.info(f"RoutineAgent: Creating routine: {name}")
             
             if self.client_id:
                 await self.send_websocket_message(f"A função {func_name} foi iniciada.", self.client_id, "function_call_start")
             
-            # Verificar se input_str está vazio
-            if not input_str:
-                logger.warning("RoutineAgent: Attempt to create routine without data")
-                if self.client_id:
-                    await self.send_websocket_message("Dados da rotina não fornecidos", self.client_id, "function_call_error")
-                return "Please provide the routine data you want to create."
-            
-            # Parse input string
-            parts = input_str.split('|')
-            if len(parts) < 1:
-                if self.client_id:
-                    await self.send_websocket_message("Formato inválido dos dados", self.client_id, "function_call_error")
-                return "Invalid format. At least the name field is required."
-            
-            # Extrair o nome (campo obrigatório)
-            name = parts[0].strip()
-            if not name:
-                if self.client_id:
-                    await self.send_websocket_message("Nome da rotina não fornecido", self.client_id, "function_call_error")
-                return "The name field is required and cannot be empty."
-            
             if self.client_id:
                 await self.send_websocket_message("Processando dados da rotina...", self.client_id, "function_call_info")
             
-            # Inicializar dados com valores padrão
+            # Os campos omitidos pelo modelo chegam com os valores padrão da assinatura
             data = {
-                "name": name,
-                "status": "pending",
-                "schedule": "09:00",
-                "frequency": "daily",
-                "priority": "low",
-                "tags": [],
-                "estimated_duration": 0,
-                "description": ""  # Adicionar descrição vazia por padrão
+                "name": name.strip(),
+                "status": status,
+                "schedule": schedule,
+                "frequency": frequency,
+                "priority": priority,
+                "tags": tags or [],
+                "estimated_duration": estimated_duration,
+                "description": description.strip()
             }
-            
-            # Adicionar campos opcionais se fornecidos
-            if len(parts) > 1 and parts[1].strip():
-                data["description"] = parts[1].strip()
-            if len(parts) > 2 and parts[2].strip():
-                data["status"] = parts[2].strip()
-            if len(parts) > 3 and parts[3].strip():
-                data["schedule"] = parts[3].strip()
-            if len(parts) > 4 and parts[4].strip():
-                data["frequency"] = parts[4].strip()
-            if len(parts) > 5 and parts[5].strip():
-                data["priority"] = parts[5].strip()
-            if len(parts) > 6 and parts[6].strip():
-                data["tags"] = [tag.strip() for tag in parts[6].split(',')]
-            if len(parts) > 7 and parts[7].strip():
-                try:
-                    data["estimated_duration"] = int(parts[7].strip())
-                except ValueError:
-                    if self.client_id:
-                        await self.send_websocket_message("Duração inválida fornecida", self.client_id, "function_call_error")
-                    return "Duration must be an integer"
-            if len(parts) > 8 and parts[8].strip():
-                data["start_date"] = parts[8].strip()
-            if len(parts) > 9 and parts[9].strip():
-                data["end_date"] = parts[9].strip()
+            if start_date:
+                data["start_date"] = start_date
+            if end_date:
+                data["end_date"] = end_date
             
             # Validate data
             validation_result = self._validate_routine_data(data)
@@ -669,7 +657,7 @@ class RoutineAgent(BaseAgent):
             logger.info(f"RoutineAgent: Sending data to API: {json.dumps(data, ensure_ascii=False)}")
             
             # Make request
-            success, error_msg, result = self.api_client.create_routine(
+            success, error_msg, result = await self.api_client.create_routine(
                 json.dumps(data),
                 {'Content-Type': 'application/json'}
             )
@@ -734,37 +722,24 @@ class RoutineAgent(BaseAgent):
                 await self.send_websocket_message(error_msg, self.client_id, "function_call_error")
             return error_msg
         
-    async def update_routine(self, input_str: str = "", _=None) -> str:
-        """Atualiza uma rotina existente."""
+    async def update_routine(self, routine_id: str, name: Optional[str] = None, description: Optional[str] = None,
+                             status: Optional[str] = None, schedule: Optional[str] = None, frequency: Optional[str] = None,
+                             priority: Optional[str] = None, tags: Optional[List[str]] = None, estimated_duration: Optional[int] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
+        """Atualiza uma rotina existente (argumentos validados por UpdateRoutineInput)."""
         func_name = "Update Routine"
         try:
             start_time = time.time()
-            logger.info(f"RoutineAgent: Updating routine with input: {input_str}")
+            logger.info(f"RoutineAgent: Updating routine {routine_id}")
             
             if self.client_id:
                 await self.send_websocket_message(f"A função {func_name} foi iniciada.", self.client_id, "function_call_start")
             
-            # Verificar se input_str está vazio
-            if not input_str:
-                logger.warning("RoutineAgent: Attempt to update routine without data")
-                if self.client_id:
-                    await self.send_websocket_message("Dados da rotina não fornecidos", self.client_id, "function_call_error")
-                return "Please provide the routine data you want to update."
-            
-            # Parse input string
-            parts = input_str.split('|')
-            if len(parts) < 2:
-                if self.client_id:
-                    await self.send_websocket_message("Formato inválido dos dados", self.client_id, "function_call_error")
-                return "Invalid format. Use: 'routine_id|field1=value1|field2=value2|...'"
-            
-            routine_id = parts[0]
-            
             if self.client_id:
                 await self.send_websocket_message("Buscando dados da rotina existente...", self.client_id, "function_call_info")
             
             # Primeiro, buscar a rotina existente
-            success, error_msg, existing_data = self.api_client.get_routine(routine_id)
+            success, error_msg, existing_data = await self.api_client.get_routine(routine_id)
             if not success:
                 if self.client_id:
                     await self.send_websocket_message(f"Erro ao buscar rotina: {error_msg}", self.client_id, "function_call_error")
@@ -783,68 +758,20 @@ class RoutineAgent(BaseAgent):
             # Log dos dados existentes
             logger.info(f"RoutineAgent: Existing routine data: {json.dumps(existing_routine, indent=2)}")
             
-            # Preparar os dados de atualização
-            updates = {}
-            
-            # Mapeamento de nomes de campos alternativos para nomes padrão
-            field_mapping = {
-                'description': 'description',
-                'desc': 'description',
-                'name': 'name',
-                'title': 'name',
-                'status': 'status',
-                'schedule': 'schedule',
-                'time': 'schedule',
-                'frequency': 'frequency',
-                'freq': 'frequency',
-                'priority': 'priority',
-                'pri': 'priority',
-                'tags': 'tags',
-                'tag': 'tags',
-                'estimated_duration': 'estimated_duration',
-                'duration': 'estimated_duration',
-                'estimatedduration': 'estimated_duration',
-                'start_date': 'start_date',
-                'startdate': 'start_date',
-                'start': 'start_date',
-                'end_date': 'end_date',
-                'enddate': 'end_date',
-                'end': 'end_date'
+            # Apenas os campos enviados pelo modelo
+            fields = {
+                'name': name,
+                'description': description,
+                'status': status,
+                'schedule': schedule,
+                'frequency': frequency,
+                'priority': priority,
+                'tags': tags,
+                'estimated_duration': estimated_duration,
+                'start_date': start_date,
+                'end_date': end_date
             }
-            
-            # Parse update fields
-            for part in parts[1:]:
-                if '=' not in part:
-                    continue
-                field, value = part.split('=', 1)
-                field = field.strip().lower()
-                value = value.strip()
-                
-                # Mapear o nome do campo para o nome padrão
-                if field in field_mapping:
-                    field = field_mapping[field]
-                
-                # Handle special fields with proper type conversion
-                if field == 'tags':
-                    updates[field] = [tag.strip() for tag in value.split(',')] if value else []
-                elif field == 'estimated_duration':
-                    try:
-                        updates[field] = int(value) if value else 0
-                    except (ValueError, TypeError):
-                        if self.client_id:
-                            await self.send_websocket_message(f"Valor inválido para duração: {value}", self.client_id, "function_call_error")
-                        logger.warning(f"RoutineAgent: Invalid value for estimated_duration: {value}")
-                        return f"Invalid value for estimated_duration: {value}. Must be an integer."
-                elif field == 'status' and not value:
-                    updates[field] = self.default_values['status']
-                elif field == 'frequency' and not value:
-                    updates[field] = self.default_values['frequency']
-                elif field == 'priority' and not value:
-                    updates[field] = self.default_values['priority']
-                elif field in ['schedule', 'start_date', 'end_date'] and not value:
-                    updates[field] = None
-                else:
-                    updates[field] = value
+            updates = {field: value for field, value in fields.items() if value is not None}
             
             if not updates:
                 if self.client_id:
@@ -891,7 +818,7 @@ class RoutineAgent(BaseAgent):
                 await self.send_websocket_message("Enviando dados para API...", self.client_id, "function_call_info")
             
             # Fazer a requisição de atualização com os dados mesclados
-            success, error_msg, result = self.api_client.update_routine(routine_id, merged_data)
+            success, error_msg, result = await self.api_client.update_routine(routine_id, merged_data)
             
             # Log detalhado da resposta da API
             logger.info(f"RoutineAgent: API update response - Success: {success}, Error: {error_msg}, Result: {json.dumps(result, indent=2)}")
@@ -967,7 +894,7 @@ class RoutineAgent(BaseAgent):
                 
             logger.info(f"RoutineAgent: Deleting routine {routine_id}")
             
-            success, error_msg, result = self.api_client.delete_routine(routine_id)
+            success, error_msg, result = await self.api_client.delete_routine(routine_id)
             
             # Log detalhado da resposta da API
             logger.info(f"RoutineAgent: API delete response - Success: {success}, Error: {error_msg}, Result: {json.dumps(result, indent=2)}")
@@ -997,6 +924,9 @@ class RoutineAgent(BaseAgent):
                 await self.send_websocket_message(f"Erro ao deletar rotina: {error_msg}", self.client_id, "function_call_error")
                 return error_msg
             
+            # A sincronização incremental não enxerga remoções
+            self.routine_replica.discard(routine_id)
+            
             elapsed_time = time.time() - start_time
             success_msg = f"Routine {routine_id} deleted successfully!"
             
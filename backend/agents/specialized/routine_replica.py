@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from ..name_index import NameIndex
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+ROUTINES_HEADER = "Aqui estão todas as suas rotinas:\n\n"
+
+FIELD_LABELS = {
+    'name': 'Nome',
+    'description': 'Descrição',
+    'status': 'Status',
+    'schedule': 'Horário',
+    'frequency': 'Frequência',
+    'priority': 'Prioridade',
+    'tags': 'Tags',
+    'estimated_duration': 'Duração',
+    'start_date': 'Data de início',
+    'end_date': 'Data de término',
+    'id': 'ID'
+}
+
+def render_routine(routine: Any) -> str:
+    """Formata uma rotina em markdown para o histórico do agente."""
+    if not isinstance(routine, dict):
+        # Rotina em formato inesperado: mostra o valor como veio
+        return f"**Rotina:** {routine}\n\n"
+    
+    result = f"**{routine.get('name', 'Sem nome')}**\n"
+    for field, label in FIELD_LABELS.items():
+        if field in routine:
+            value = routine[field]
+            if field == 'tags' and isinstance(value, list):
+                value = ', '.join(value)
+            elif field == 'estimated_duration':
+                value = f"{value} minutos"
+            if field != 'name':  # O nome já é o título
+                result += f"- **{label}:** {value}\n"
+    return result + "\n"
+
+class RoutineReplica:
+    """
+    Réplica local das rotinas, sincronizada de forma incremental.
+    
+    Guarda o maior `updated_at` já visto como cursor e, a cada sincronização, pede à API
+    apenas as rotinas alteradas depois dele. As rotinas recebidas são mescladas no lugar e
+    somente as que mudaram são formatadas de novo. Como a API não informa remoções, uma
+    sincronização completa é feita a cada `full_sync_interval` segundos; remoções feitas
+    pelo próprio agente são aplicadas com discard().
+    """
+    
+    def __init__(self, api_client, full_sync_interval: float = 300.0):
+        self.api_client = api_client
+        self.full_sync_interval = full_sync_interval
+        
+        self._routines: Dict[str, Any] = {}
+        self._rendered: Dict[str, str] = {}
+        self.cursor: Optional[str] = None
+        self._last_full_sync = 0.0
+        self._synced = False
+        
+        # Texto completo e índice de nomes memorizados até a próxima alteração
+        self._text: Optional[str] = None
+        self._index: Optional[NameIndex] = None
+        
+        # Sincronização em andamento, compartilhada por quem pedir outra ao mesmo tempo
+        self._inflight: Optional[asyncio.Future] = None
+        
+        # Contadores expostos por stats()
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.fetched = 0
+        self.rerendered = 0
+    
+    def __len__(self) -> int:
+        return len(self._routines)
+    
+    async def sync(self) -> bool:
+        """Atualiza a réplica com as rotinas alteradas desde o último cursor."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._sync())
+        # shield: cancelar quem aguarda (ex.: prefetch não usado) não interrompe a sincronização
+        return await asyncio.shield(self._inflight)
+    
+    async def _sync(self) -> bool:
+        start_time = time.time()
+        full = not self._synced or time.monotonic() - self._last_full_sync >= self.full_sync_interval
+        
+        success, error_msg, data = await self.api_client.get_routines(updated_since=None if full else self.cursor)
+        if not success:
+            logger.error(f"RoutineReplica: Erro ao sincronizar rotinas: {error_msg}")
+            return False
+        
+        routines = data.get('data', []) if isinstance(data, dict) else []
+        routines = routines or []
+        self.fetched += len(routines)
+        
+        changed = 0
+        seen = set()
+        for index, routine in enumerate(routines):
+            key = self._key(routine, index)
+            seen.add(key)
+            if self._routines.get(key) != routine:
+                self._routines[key] = routine
+                self._rendered[key] = render_routine(routine)
+                changed += 1
+            if isinstance(routine, dict) and routine.get('updated_at'):
+                if self.cursor is None or routine['updated_at'] > self.cursor:
+                    self.cursor = routine['updated_at']
+        
+        if full:
+            # Na sincronização completa, o que não veio da API foi removido
+            for key in [key for key in self._routines if key not in seen]:
+                self.discard(key)
+            self._last_full_sync = time.monotonic()
+            self._synced = True
+            self.full_syncs += 1
+        else:
+            self.delta_syncs += 1
+        
+        if changed:
+            self._text = None
+            self._index = None
+            self.rerendered += changed
+        
+        logger.info(
+            f"RoutineReplica: Sincronização {'completa' if full else 'incremental'} em {time.time() - start_time:.2f}s "
+            f"({len(routines)} recebidas, {changed} alteradas, {len(self._routines)} no total)"
+        )
+        return True
+    
+    def discard(self, routine_id: str) -> None:
+        """Remove uma rotina da réplica (ex.: após delete_routine)."""
+        if self._routines.pop(routine_id, None) is not None:
+            self._rendered.pop(routine_id, None)
+            self._text = None
+            self._index = None
+    
+    def routines(self) -> List[Any]:
+        """Retorna as rotinas atuais da réplica."""
+        return list(self._routines.values())
+    
+    def render(self) -> Optional[str]:
+        """Retorna todas as rotinas formatadas, ou None se não houver rotinas."""
+        if not self._routines:
+            return None
+        if self._text is None:
+            self._text = ROUTINES_HEADER + "".join(self._rendered.values())
+        return self._text
+    
+    @property
+    def synced(self) -> bool:
+        """Indica se a réplica já fez a primeira sincronização completa."""
+        return self._synced
+    
+    def index(self) -> NameIndex:
+        """Índice de nomes para IDs das rotinas atuais, reconstruído apenas após alterações."""
+        if self._index is None:
+            self._index = NameIndex(
+                (key, routine.get('name')) for key, routine in self._routines.items() if isinstance(routine, dict)
+            )
+        return self._index
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores da réplica."""
+        return {
+            "routines": len(self._routines),
+            "cursor": self.cursor,
+            "full_syncs": self.full_syncs,
+            "delta_syncs": self.delta_syncs,
+            "fetched": self.fetched,
+            "rerendered": self.rerendered,
+        }
+    
+    @staticmethod
+    def _key(routine: Any, index: int) -> str:
+        if isinstance(routine, dict) and routine.get('id'):
+            return routine['id']
+        return f"_{index}"
@@ -1,28 +1,144 @@
 from ..base_agent import BaseAgent
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from ..context_selector import ContextSelector
+from ..executor import ParallelAgentExecutor
+from ..history import as_chat_history
+from ..name_index import SnapshotNameIndex, format_candidates
+from ..passthrough import final_answer
+from .tool_schemas import CreateTaskInput, UpdateTaskInput
+from ..prefetch import take_prefetched
+from langchain.agents import create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain.tools import Tool
-import requests
+from langchain.tools import StructuredTool, Tool
+import httpx
 import json
 import logging
 import traceback
 import time
+from typing import Any, Dict, List, Optional
+from config.settings import get_settings
+from utils.http_client import LatencyMetrics, request_with_retry
+from utils.snapshot_cache import SnapshotCache
 from utils.websocket_utils import send_websocket_message as send_ws_message
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+class TaskAPIClient:
+    """Cliente assíncrono para interagir com a API de tarefas (pool HTTP compartilhado)."""
+    
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.task_api_url).rstrip("/")
+        self.metrics = LatencyMetrics()
+    
+    @staticmethod
+    def normalize(data: Any) -> Any:
+        """
+        Extrai o conteúdo das respostas da Lambda, que podem vir como:
+        o próprio dado, {"body": dado}, {"body": "<json>"} ou {"Items": [...]} dentro do body.
+        """
+        if isinstance(data, dict) and 'body' in data:
+            data = data['body']
+            if isinstance(data, str):
+                # If body is a string, it might be JSON encoded
+                try:
+                    data = json.loads(data)
+                except json.JSONDecodeError:
+                    raise ValueError("Erro ao decodificar resposta da API")
+        if isinstance(data, dict) and 'Items' in data:
+            data = data['Items']
+        return data
+    
+    async def _request(self, method: str, path: str = "", **kwargs) -> Any:
+        # Métricas agrupadas por rota, sem o ID da tarefa
+        endpoint = f"{method} /tasks" + ("/{id}" if path else "")
+        response = await request_with_retry(method, f"{self.base_url}{path}", metrics=self.metrics, endpoint=endpoint, **kwargs)
+        response.raise_for_status()
+        if not response.content:
+            return None
+        return self.normalize(response.json())
+    
+    async def list_tasks(self) -> List[Dict[str, Any]]:
+        """Lista todas as tarefas."""
+        tasks = await self._request("GET")
+        if not isinstance(tasks, list):
+            # Unknown format, log and return empty
+            logger.warning(f"TaskAgent: Formato de resposta desconhecido: {tasks}")
+            return []
+        return tasks
+    
+    async def get_task(self, task_id: str) -> Any:
+        """Obtém uma tarefa específica."""
+        return await self._request("GET", f"/{task_id}")
+    
+    async def create_task(self, data: Dict[str, Any]) -> Any:
+        """Cria uma nova tarefa."""
+        return await self._request("POST", json=data)
+    
+    async def update_task(self, task_id: str, updates: Dict[str, Any]) -> Any:
+        """Atualiza campos de uma tarefa existente."""
+        return await self._request("PATCH", f"/{task_id}", json=updates)
+    
+    async def delete_task(self, task_id: str) -> None:
+        """Remove uma tarefa."""
+        await self._request("DELETE", f"/{task_id}")
+
+# Cliente e lista de tarefas compartilhados por todas as sessões do processo
+task_api_client = TaskAPIClient()
+task_snapshot = SnapshotCache(task_api_client.list_tasks, ttl=settings.task_cache_ttl, name="tarefas")
+# Índice de descrições para IDs, refeito apenas quando a lista em cache muda
+task_name_index = SnapshotNameIndex(lambda tasks: (
+    (task.get('id', task.get('ID')), task.get('description', task.get('Descrição')))
+    for task in tasks if isinstance(task, dict)
+))
+# Tarefas injetadas no contexto de cada turno, ordenadas pela relevância para a mensagem
+task_context = ContextSelector(
+    "tarefas",
+    "Tarefas mais relevantes para a mensagem ({shown} de {total})",
+    columns=[
+        ("id", ('id', 'ID')),
+        ("descricao", ('description', 'Descrição')),
+        ("prioridade", ('priority', 'Prioridade')),
+        ("categoria", ('category', 'Categoria')),
+        ("status", ('status', 'Status')),
+        ("criada_em", ('created_at', 'Data de Criação')),
+    ],
+    text_fields=[('description', 'Descrição'), ('category', 'Categoria')],
+    keyword_fields=[('status', 'Status'), ('priority', 'Prioridade')],
+    date_fields=[('created_at', 'Data de Criação')],
+    top_k=settings.context_top_k,
+    token_budget=settings.context_token_budget
+)
+
+def format_task(task: Dict[str, Any]) -> str:
+    """Formata uma tarefa no texto completo usado por get_tasks."""
+    return (
+        f"ID: {task.get('id', task.get('ID', 'N/A'))}\n"
+        f"Descrição: {task.get('description', task.get('Descrição', 'N/A'))}\n"
+        f"Prioridade: {task.get('priority', task.get('Prioridade', 'N/A'))}\n"
+        f"Categoria: {task.get('category', task.get('Categoria', 'N/A'))}\n"
+        f"Status: {task.get('status', task.get('Status', 'N/A'))}\n"
+        f"Data de Criação: {task.get('created_at', task.get('Data de Criação', 'N/A'))}\n"
+        "---"
+    )
+
 class TaskAgent(BaseAgent):
     def __init__(self, client_id: int = None):
         system_prompt = """Você é um agente especializado em gerenciamento de tarefas.
         Sua função é ajudar a criar, listar, atualizar e remover tarefas.
         Você tem acesso a uma API de tarefas e deve usar as ferramentas disponíveis para realizar essas operações.
+        Quando o usuário citar uma tarefa pelo nome, use find_task_id para obter o ID.
+        O contexto traz apenas as tarefas mais relevantes para a mensagem; use get_tasks para ver todas.
         Sempre forneça respostas claras e organizadas."""
         
         super().__init__(system_prompt, client_id=client_id)
         
+        # Cliente da API de tarefas
+        self.api_client = task_api_client
+        
         # Definir as ferramentas específicas para tarefas
         self.tools = [
             Tool(
@@ -31,23 +147,31 @@ class TaskAgent(BaseAgent):
                 coroutine=self.get_tasks,
                 description="Lista todas as tarefas disponíveis. Use esta ferramenta quando o usuário quiser ver todas as tarefas."
             ),
+            Tool(
+                name="find_task_id",
+                func=self.find_task_id,
+                coroutine=self.find_task_id,
+                description="Encontra o ID de uma tarefa pela descrição (busca aproximada). Parâmetro: descrição ou parte dela. Use antes de get_task, update_task ou delete_task quando o usuário citar a tarefa pelo nome."
+            ),
             Tool(
                 name="get_task",
                 func=self.get_task,
                 coroutine=self.get_task,
                 description="Obtém detalhes de uma tarefa específica pelo ID. Use esta ferramenta quando o usuário quiser ver detalhes de uma tarefa específica."
             ),
-            Tool(
+            StructuredTool(
                 name="create_task",
                 func=self.create_task,
                 coroutine=self.create_task,
+                args_schema=CreateTaskInput,
                 description="Cria uma nova tarefa. Use esta ferramenta quando o usuário quiser criar uma nova tarefa."
             ),
-            Tool(
+            StructuredTool(
                 name="update_task",
                 func=self.update_task,
                 coroutine=self.update_task,
-                description="Atualiza uma tarefa existente. Use esta ferramenta quando o usuário quiser modificar uma tarefa existente."
+                args_schema=UpdateTaskInput,
+                description="Atualiza uma tarefa existente. Envie apenas os campos que devem mudar. Use esta ferramenta quando o usuário quiser modificar uma tarefa existente."
             ),
             Tool(
                 name="delete_task",
@@ -61,21 +185,24 @@ class TaskAgent(BaseAgent):
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", system_prompt),
             MessagesPlaceholder(variable_name="chat_history"),
+            # Contexto do turno (ex.: lista carregada da API), separado do histórico compartilhado
+            MessagesPlaceholder(variable_name="context", optional=True),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
         # Criar o agente
-        self.agent = create_openai_functions_agent(
+        self.agent = create_openai_tools_agent(
             llm=self.llm,
             tools=self.tools,
             prompt=self.prompt
         )
         
         # Criar o executor do agente
-        self.agent_executor = AgentExecutor(
+        self.agent_executor = ParallelAgentExecutor(
             agent=self.agent,
             tools=self.tools,
+            max_parallel_tools=settings.max_parallel_tools,
             verbose=True
         )
 
@@ -89,43 +216,12 @@ class TaskAgent(BaseAgent):
         try:
             start_time = time.time()
             await self.send_websocket_message("Obtendo tarefas...", self.client_id, "function_call_start")
-            logger.info(f"TaskAgent: Fazendo requisição GET para /lambda/tasks")
-            
-            response = requests.get("https://api.itenorio.com/lambda/tasks")
-            response.raise_for_status()
+            logger.info(f"TaskAgent: Obtendo lista de tarefas (cache compartilhado)")
             
-            # Parse the response and handle different formats
-            data = response.json()
+            # Uma única requisição GET /tasks atende todas as sessões dentro do TTL
+            tasks = await task_snapshot.get()
 
             await self.send_websocket_message(f"Tarefas obtidas em {time.time() - start_time:.2f}s", self.client_id, "function_call_info")
-            # Check if the response has a specific structure
-            if isinstance(data, dict) and 'body' in data:
-                # Handle AWS Lambda response format
-                if isinstance(data['body'], str):
-                    # If body is a string, it might be JSON encoded
-                    try:
-                        body_data = json.loads(data['body'])
-                        if isinstance(body_data, dict) and 'Items' in body_data:
-                            tasks = body_data['Items']
-                        else:
-                            tasks = body_data
-                    except json.JSONDecodeError:
-                        await self.send_websocket_message(f"Erro ao decodificar resposta da API", self.client_id, "function_call_error")
-                        tasks = []
-                elif isinstance(data['body'], dict) and 'Items' in data['body']:
-                    # Direct access to Items in body
-                    tasks = data['body']['Items']
-                else:
-                    tasks = data['body']
-            elif isinstance(data, list):
-                # Direct list of tasks
-                tasks = data
-            else:
-                # Unknown format, log and return empty
-                await self.send_websocket_message(f"Formato de resposta desconhecido: {data}", self.client_id, "function_call_error")
-                logger.warning(f"TaskAgent: Formato de resposta desconhecido: {data}")
-                tasks = []
-            
             
             elapsed_time = time.time() - start_time
             
@@ -139,30 +235,13 @@ class TaskAgent(BaseAgent):
             await self.send_websocket_message(f"Encontradas ({len(tasks)}) tarefas", self.client_id, "function_call_info")
             for task in tasks:
                 # Handle different task formats
-                if isinstance(task, dict):
-                    # Standard format
-                    task_id = task.get('id', task.get('ID', 'N/A'))
-                    description = task.get('description', task.get('Descrição', 'N/A'))
-                    priority = task.get('priority', task.get('Prioridade', 'N/A'))
-                    category = task.get('category', task.get('Categoria', 'N/A'))
-                    status = task.get('status', task.get('Status', 'N/A'))
-                    created_at = task.get('created_at', task.get('Data de Criação', 'N/A'))
-                else:
+                if not isinstance(task, dict):
                     await self.send_websocket_message(f"Formato de tarefa inesperado: {task.keys()}", self.client_id, "function_call_error")
                     # Fallback for unexpected format
                     logger.warning(f"TaskAgent: Formato de tarefa inesperado: {task}")
                     continue
                 
-                formatted_task = (
-                    f"ID: {task_id}\n"
-                    f"Descrição: {description}\n"
-                    f"Prioridade: {priority}\n"
-                    f"Categoria: {category}\n"
-                    f"Status: {status}\n"
-                    f"Data de Criação: {created_at}\n"
-                    "---"
-                )
-                formatted_tasks.append(formatted_task)
+                formatted_tasks.append(format_task(task))
             
             if not formatted_tasks:
                 await self.send_websocket_message(f"Nenhuma tarefa encontrada ou formato de tarefa não reconhecido.", self.client_id, "function_call_error")
@@ -173,46 +252,43 @@ class TaskAgent(BaseAgent):
             logger.info(f"TaskAgent: Tarefas obtidas em {elapsed_time:.2f}s: {result}")
             return result
             
-        except requests.exceptions.RequestException as e:
-            await self.send_websocket_message(f"TaskAgent: Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
+        except httpx.HTTPError as e:
             elapsed_time = time.time() - start_time
+            await self.send_websocket_message(f"TaskAgent: Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
             error_msg = f"Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
             logger.error(f"TaskAgent: Traceback: {traceback.format_exc()}")
             return error_msg
         except Exception as e:
-            await self.send_websocket_message(f"TaskAgent: Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
             elapsed_time = time.time() - start_time
+            await self.send_websocket_message(f"TaskAgent: Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
             error_msg = f"Erro ao obter tarefas após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
             logger.error(f"TaskAgent: Traceback: {traceback.format_exc()}")
             return error_msg
     
-    def get_task(self, task_id: str) -> str:
+    async def find_task_id(self, name: str) -> str:
+        """Resolve a descrição de uma tarefa para os IDs candidatos, pelo índice da lista em cache."""
+        if not name:
+            return "Informe a descrição da tarefa."
+        try:
+            tasks = await task_snapshot.get()
+            candidates = task_name_index.for_snapshot(tasks).search(name)
+            logger.info(f"TaskAgent: {len(candidates)} candidatos para a tarefa '{name}'")
+            return format_candidates(name, candidates, "tarefa")
+        except Exception as e:
+            error_msg = f"Erro ao buscar o ID da tarefa '{name}': {str(e)}"
+            logger.error(f"TaskAgent: {error_msg}")
+            logger.error(f"TaskAgent: Traceback: {traceback.format_exc()}")
+            return error_msg
+    
+    async def get_task(self, task_id: str) -> str:
         """Obtém detalhes de uma tarefa específica pelo ID."""
         try:
             start_time = time.time()
             logger.info(f"TaskAgent: Obtendo detalhes da tarefa {task_id}")
             
-            response = requests.get(f"https://api.itenorio.com/lambda/tasks/{task_id}")
-            response.raise_for_status()
-            
-            # Parse the response and handle different formats
-            data = response.json()
-            
-            # Check if the response has a specific structure
-            if isinstance(data, dict) and 'body' in data:
-                # Handle AWS Lambda response format
-                if isinstance(data['body'], str):
-                    # If body is a string, it might be JSON encoded
-                    try:
-                        task = json.loads(data['body'])
-                    except json.JSONDecodeError:
-                        task = {}
-                else:
-                    task = data['body']
-            else:
-                task = data
+            task = await self.api_client.get_task(task_id)
                 
             elapsed_time = time.time() - start_time
             
@@ -247,7 +323,7 @@ class TaskAgent(BaseAgent):
             logger.info(f"TaskAgent: Detalhes da tarefa obtidos em {elapsed_time:.2f}s")
             return result
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             elapsed_time = time.time() - start_time
             error_msg = f"Erro ao obter detalhes da tarefa após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
@@ -260,20 +336,12 @@ class TaskAgent(BaseAgent):
             logger.error(f"TaskAgent: Traceback: {traceback.format_exc()}")
             return error_msg
     
-    async def create_task(self, input_str: str) -> str:
-        """Cria uma nova tarefa."""
+    async def create_task(self, description: str, priority: str = "Média", category: str = "Trabalho", status: str = "Pendente") -> str:
+        """Cria uma nova tarefa (argumentos validados por CreateTaskInput)."""
         try:
             start_time = time.time()
             await self.send_websocket_message("Criando nova tarefa...", self.client_id, "function_call_start")
-            logger.info(f"TaskAgent: Criando nova tarefa com input: {input_str}")
-            
-            # Parse input string
-            parts = input_str.split('|')
-            if len(parts) != 4:
-                await self.send_websocket_message("Formato inválido.", self.client_id, "function_call_error")
-                return "Formato inválido. Use: 'description|priority|category|status'"
-            
-            description, priority, category, status = parts
+            logger.info(f"TaskAgent: Criando nova tarefa: {description}")
             
             # Prepare request data
             data = {
@@ -286,32 +354,10 @@ class TaskAgent(BaseAgent):
             logger.info(f"TaskAgent: Dados da tarefa: {data}")
 
             # Make request
-            response = requests.post(
-                "https://api.itenorio.com/lambda/tasks",
-                json=data
-            )
-
-            response.raise_for_status()
-            
-            # Parse the response and handle different formats
-            data = response.json()
+            result = await self.api_client.create_task(data)
+            task_snapshot.invalidate()
             
             await self.send_websocket_message("Tarefa criada com sucesso!", self.client_id, "function_call_info")
-            
-            # Check if the response has a specific structure
-            if isinstance(data, dict) and 'body' in data:
-                # Handle AWS Lambda response format
-                if isinstance(data['body'], str):
-                    # If body is a string, it might be JSON encoded
-                    try:
-                        result = json.loads(data['body'])
-                    except json.JSONDecodeError:
-                        await self.send_websocket_message("Erro ao decodificar resposta da API", self.client_id, "function_call_error")
-                        result = {}
-                else:
-                    result = data['body']
-            else:
-                result = data
                 
             elapsed_time = time.time() - start_time
             
@@ -348,10 +394,10 @@ class TaskAgent(BaseAgent):
                 success_msg += f"Resposta: {result}"
             
             logger.info(f"TaskAgent: Tarefa criada em {elapsed_time:.2f}s: {success_msg}")
-            await self.send_websocket_message(f"Tarefa criada em {elapsed_time:.2f}s: {result['Descrição']}", self.client_id, "function_call_end")
+            await self.send_websocket_message(f"Tarefa criada em {elapsed_time:.2f}s: {result.get('Descrição', '')}", self.client_id, "function_call_end")
             return success_msg
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             elapsed_time = time.time() - start_time
             error_msg = f"Erro ao criar tarefa após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
@@ -366,58 +412,32 @@ class TaskAgent(BaseAgent):
             await self.send_websocket_message(f"Erro ao criar tarefa após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
             return error_msg
     
-    async def update_task(self, input_str: str) -> str:
-        """Atualiza uma tarefa existente."""
+    async def update_task(self, task_id: str, description: Optional[str] = None, priority: Optional[str] = None,
+                          category: Optional[str] = None, status: Optional[str] = None) -> str:
+        """Atualiza uma tarefa existente (argumentos validados por UpdateTaskInput)."""
         try:
             start_time = time.time()
-            logger.info(f"TaskAgent: Atualizando tarefa com input: {input_str}")
+            logger.info(f"TaskAgent: Atualizando tarefa {task_id}")
             await self.send_websocket_message("Atualizando tarefa...", self.client_id, "function_call_start")
             
-            # Parse input string
-            parts = input_str.split('|')
-            if len(parts) < 2:
-                await self.send_websocket_message("Formato inválido.", self.client_id, "function_call_error")
-                return "Formato inválido. Use: 'task_id|campo1=valor1|campo2=valor2|...'"
-            
-            task_id = parts[0]
-            updates = {}
-            
-            # Parse update fields
-            for part in parts[1:]:
-                if '=' not in part:
-                    continue
-                field, value = part.split('=', 1)
-                updates[field.strip()] = value.strip()
+            # Apenas os campos enviados, com os nomes usados pela API
+            fields = {
+                "descricao": description,
+                "prioridade": priority,
+                "categoria": category,
+                "status": status
+            }
+            updates = {field: value.strip() for field, value in fields.items() if value is not None}
             
             if not updates:
                 await self.send_websocket_message("Nenhum campo para atualizar foi fornecido.", self.client_id, "function_call_error")
                 return "Nenhum campo para atualizar foi fornecido."
             
             # Make request
-            response = requests.patch(
-                f"https://api.itenorio.com/lambda/tasks/{task_id}",
-                json=updates
-            )
-            response.raise_for_status()
-            
-            # Parse the response and handle different formats
-            data = response.json()
+            result = await self.api_client.update_task(task_id, updates)
+            task_snapshot.invalidate()
             
             await self.send_websocket_message("Tarefa atualizada com sucesso!", self.client_id, "function_call_info")
-            
-            # Check if the response has a specific structure
-            if isinstance(data, dict) and 'body' in data:
-                # Handle AWS Lambda response format
-                if isinstance(data['body'], str):
-                    # If body is a string, it might be JSON encoded
-                    try:
-                        result = json.loads(data['body'])
-                    except json.JSONDecodeError:
-                        result = {}
-                else:
-                    result = data['body']
-            else:
-                result = data
                 
             elapsed_time = time.time() - start_time
             
@@ -454,10 +474,10 @@ class TaskAgent(BaseAgent):
                 success_msg += f"Resposta: {result}"
             
             logger.info(f"TaskAgent: Tarefa atualizada em {elapsed_time:.2f}s: {success_msg}")
-            await self.send_websocket_message(f"Tarefa atualizada em {elapsed_time:.2f}s: {result['Descrição']}", self.client_id, "function_call_end")
+            await self.send_websocket_message(f"Tarefa atualizada em {elapsed_time:.2f}s: {result.get('Descrição', '')}", self.client_id, "function_call_end")
             return success_msg
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             elapsed_time = time.time() - start_time
             error_msg = f"Erro ao atualizar tarefa após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
@@ -478,8 +498,8 @@ class TaskAgent(BaseAgent):
             logger.info(f"TaskAgent: Removendo tarefa com ID: {task_id}")
             
             # Make request
-            response = requests.delete(f"https://api.itenorio.com/lambda/tasks/{task_id}")
-            response.raise_for_status()
+            await self.api_client.delete_task(task_id)
+            task_snapshot.invalidate()
             
             elapsed_time = time.time() - start_time
             success_msg = f"Tarefa {task_id} removida com sucesso!"
@@ -488,7 +508,7 @@ class TaskAgent(BaseAgent):
             await self.send_websocket_message(f"Tarefa removida em {elapsed_time:.2f}s: {success_msg}", self.client_id, "function_call_end")
             return success_msg
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             elapsed_time = time.time() - start_time
             error_msg = f"Erro ao remover tarefa após {elapsed_time:.2f}s: {str(e)}"
             logger.error(f"TaskAgent: {error_msg}")
@@ -503,26 +523,33 @@ class TaskAgent(BaseAgent):
             await self.send_websocket_message(f"Erro ao remover tarefa após {elapsed_time:.2f}s: {str(e)}", self.client_id, "function_call_error")
             return error_msg
     
-    async def _load_tasks_into_history(self) -> str:
+    async def _load_tasks_into_history(self, message: str) -> str:
         """
-        Carrega todas as tarefas no histórico de chat.
+        Carrega no histórico de chat as tarefas mais relevantes para a mensagem.
         
+        Args:
+            message: Mensagem do usuário, usada para ordenar as tarefas por relevância
+            
         Returns:
-            str: Mensagem formatada com todas as tarefas ou None se não houver tarefas
+            str: Tabela compacta com as tarefas selecionadas ou None se não houver tarefas
         """
         try:
-            logger.info("TaskAgent: Carregando todas as tarefas no histórico")
+            logger.info("TaskAgent: Selecionando tarefas relevantes para o histórico")
             
-            # Buscar todas as tarefas
-            tasks = await self.get_tasks("")
-            if tasks == "Nenhuma tarefa encontrada.":
+            # Aguardar a busca antecipada pelo orquestrador, se houver (lê do mesmo cache)
+            await take_prefetched("tasks")
+            
+            tasks = await task_snapshot.get()
+            result = task_context.select(
+                message,
+                tasks or [],
+                snapshot=tasks,
+                full_text=lambda: "Aqui estão todas as suas tarefas:\n\n" + "\n".join(format_task(task) for task in tasks if isinstance(task, dict))
+            )
+            if not result:
                 logger.info("TaskAgent: Nenhuma tarefa encontrada para carregar no histórico")
                 return None
             
-            # Formatar a mensagem
-            result = "Aqui estão todas as suas tarefas:\n\n"
-            result += tasks
-            
             logger.info("TaskAgent: Tarefas carregadas no histórico com sucesso")
             return result
             
@@ -537,51 +564,31 @@ class TaskAgent(BaseAgent):
             start_time = time.time()
             logger.info(f"TaskAgent: Processando mensagem: {message}")
             
-            # Converter o histórico de chat para o formato do LangChain
-            langchain_history = []
-            if chat_history:
-                for msg in chat_history:
-                    # Verificar o tipo de mensagem
-                    if isinstance(msg, HumanMessage):
-                        langchain_history.append(msg)
-                    elif isinstance(msg, AIMessage):
-                        langchain_history.append(msg)
-                    elif isinstance(msg, SystemMessage):
-                        # Ignorar mensagens do sistema, pois já estão no prompt
-                        continue
-                    elif isinstance(msg, dict):
-                        # Se for um dicionário, converter para o formato apropriado
-                        if msg.get("role") == "user":
-                            langchain_history.append(HumanMessage(content=msg.get("content", "")))
-                        elif msg.get("role") == "assistant":
-                            langchain_history.append(AIMessage(content=msg.get("content", "")))
-            
-            # Verificar se já carregamos as tarefas no histórico
-            tasks_loaded = False
-            for msg in langchain_history:
-                if isinstance(msg, AIMessage) and "Aqui estão todas as suas tarefas:" in msg.content:
-                    tasks_loaded = True
-                    break
-            
-            # Se não carregamos as tarefas ainda, carregar agora
-            if not tasks_loaded:
-                logger.info("TaskAgent: Carregando tarefas no histórico")
-                tasks_message = await self._load_tasks_into_history()
-                if tasks_message:
-                    logger.info(f"TaskAgent: Tarefas carregadas no histórico: {tasks_message}")
-                    langchain_history.append(AIMessage(content=tasks_message))
+            # A janela compartilhada pelo orquestrador já vem filtrada e é usada sem cópia;
+            # outros formatos de histórico são convertidos
+            langchain_history = as_chat_history(chat_history)
+            context = []
+            
+            # Tarefas mais relevantes para esta mensagem, recalculadas a cada turno
+            logger.info("TaskAgent: Carregando tarefas no histórico")
+            tasks_message = await self._load_tasks_into_history(message)
+            if tasks_message:
+                logger.info(f"TaskAgent: Tarefas carregadas no histórico: {tasks_message}")
+                context.append(AIMessage(content=tasks_message))
             
             # Processar a mensagem usando o executor do agente
             response = await self.agent_executor.ainvoke({
                 "input": message,
-                "chat_history": langchain_history
+                "chat_history": langchain_history,
+                "context": context
             })
             
             elapsed_time = time.time() - start_time
             result = response.get("output", "Desculpe, não consegui processar sua solicitação.")
             
             logger.info(f"TaskAgent: Resposta obtida em {elapsed_time:.2f}s: {result}")
-            return result
+            # Resposta pronta para o usuário: o orquestrador a repassa sem reescrever
+            return final_answer(result)
             
         except Exception as e:
             elapsed_time = time.time() - start_time
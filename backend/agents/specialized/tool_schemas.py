@@ -0,0 +1,64 @@
+"""
+Esquemas dos argumentos das ferramentas de tarefas e rotinas.
+
+O modelo recebe estes esquemas como JSON Schema (campos tipados, enums e valores padrão) e
+envia os argumentos já estruturados, sem o antigo formato posicional separado por '|'.
+Os valores padrão dos esquemas são os mesmos das assinaturas das ferramentas, já que o
+StructuredTool repassa apenas os campos enviados pelo modelo.
+"""
+from typing import List, Literal, Optional
+
+from langchain_core.pydantic_v1 import BaseModel, Field
+
+TaskPriority = Literal["Alta", "Média", "Baixa"]
+TaskStatus = Literal["Pendente", "Concluído"]
+
+RoutineStatus = Literal["pending", "in_progress", "completed", "cancelled"]
+RoutineFrequency = Literal["daily", "weekly", "monthly", "weekdays", "weekends", "custom"]
+RoutinePriority = Literal["low", "medium", "high"]
+
+SCHEDULE_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+# Data ISO, com horário opcional (a API de rotinas armazena e devolve datetimes ISO)
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}(T([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?)?$"
+
+
+class CreateTaskInput(BaseModel):
+    description: str = Field(..., min_length=1, description="Descrição da tarefa")
+    priority: TaskPriority = Field("Média", description="Prioridade da tarefa")
+    category: str = Field("Trabalho", description="Categoria da tarefa (ex.: Trabalho, Casa, Estudos)")
+    status: TaskStatus = Field("Pendente", description="Status da tarefa")
+
+
+class UpdateTaskInput(BaseModel):
+    task_id: str = Field(..., min_length=1, description="ID da tarefa a ser atualizada")
+    description: Optional[str] = Field(None, description="Nova descrição")
+    priority: Optional[TaskPriority] = Field(None, description="Nova prioridade")
+    category: Optional[str] = Field(None, description="Nova categoria")
+    status: Optional[TaskStatus] = Field(None, description="Novo status")
+
+
+class CreateRoutineInput(BaseModel):
+    name: str = Field(..., min_length=1, description="Nome da rotina")
+    description: str = Field("", description="Descrição da rotina")
+    status: RoutineStatus = Field("pending", description="Status da rotina")
+    schedule: str = Field("09:00", regex=SCHEDULE_PATTERN, description="Horário no formato HH:MM")
+    frequency: RoutineFrequency = Field("daily", description="Frequência da rotina")
+    priority: RoutinePriority = Field("low", description="Prioridade da rotina")
+    tags: List[str] = Field(default_factory=list, description="Tags da rotina")
+    estimated_duration: int = Field(0, ge=0, description="Duração estimada em minutos")
+    start_date: Optional[str] = Field(None, regex=DATE_PATTERN, description="Data de início (YYYY-MM-DD ou YYYY-MM-DDTHH:MM[:SS])")
+    end_date: Optional[str] = Field(None, regex=DATE_PATTERN, description="Data de término (YYYY-MM-DD ou YYYY-MM-DDTHH:MM[:SS])")
+
+
+class UpdateRoutineInput(BaseModel):
+    routine_id: str = Field(..., min_length=1, description="ID da rotina a ser atualizada")
+    name: Optional[str] = Field(None, min_length=1, description="Novo nome")
+    description: Optional[str] = Field(None, description="Nova descrição")
+    status: Optional[RoutineStatus] = Field(None, description="Novo status")
+    schedule: Optional[str] = Field(None, regex=SCHEDULE_PATTERN, description="Novo horário no formato HH:MM")
+    frequency: Optional[RoutineFrequency] = Field(None, description="Nova frequência")
+    priority: Optional[RoutinePriority] = Field(None, description="Nova prioridade")
+    tags: Optional[List[str]] = Field(None, description="Novas tags (substituem as atuais)")
+    estimated_duration: Optional[int] = Field(None, ge=0, description="Nova duração estimada em minutos")
+    start_date: Optional[str] = Field(None, regex=DATE_PATTERN, description="Nova data de início (YYYY-MM-DD ou YYYY-MM-DDTHH:MM[:SS])")
+    end_date: Optional[str] = Field(None, regex=DATE_PATTERN, description="Nova data de término (YYYY-MM-DD ou YYYY-MM-DDTHH:MM[:SS])")
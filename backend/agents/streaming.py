@@ -0,0 +1,59 @@
+import logging
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+from utils.response_formatter import StreamFormatter
+from utils.websocket_utils import send_websocket_message
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class WebSocketStreamHandler(AsyncCallbackHandler):
+    """
+    Encaminha ao cliente, em frames `message_delta`, os tokens gerados pelo LLM do orquestrador
+    e os eventos das ferramentas que ele executa, à medida que são produzidos.
+    
+    Cada frame tem o campo `event`: "token" (com o trecho em `content`), "tool_start" ou
+    "tool_end" (com o nome da ferramenta em `tool`). O turno é encerrado pelo frame `message`
+    com a resposta completa.
+    
+    Os tokens passam pelo StreamFormatter do formato pedido: em texto e HTML, os deltas saem
+    por linha ou por bloco já formatados, e o restante é enviado ao fim de cada geração.
+    """
+    
+    def __init__(self, client_id: int, response_format: str = "markdown"):
+        self.client_id = client_id
+        self.response_format = response_format
+        self.tokens = 0
+        self.formatter = StreamFormatter(response_format)
+        self._tool_names: Dict[UUID, str] = {}
+    
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # Chamadas de função geram tokens vazios: não há texto para mostrar
+        if not token:
+            return
+        self.tokens += 1
+        chunk = self.formatter.feed(token)
+        if chunk:
+            await send_websocket_message(chunk, self.client_id, "message_delta", self.response_format, extra={"event": "token"})
+    
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        chunk = self.formatter.flush()
+        if chunk:
+            await send_websocket_message(chunk, self.client_id, "message_delta", self.response_format, extra={"event": "token"})
+    
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = serialized.get("name", "tool")
+        self._tool_names[run_id] = name
+        await send_websocket_message("", self.client_id, "message_delta", self.response_format, extra={"event": "tool_start", "tool": name})
+    
+    async def on_tool_end(self, output: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tool_names.pop(run_id, "tool")
+        await send_websocket_message("", self.client_id, "message_delta", self.response_format, extra={"event": "tool_end", "tool": name})
+    
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tool_names.pop(run_id, "tool")
+        await send_websocket_message(str(error), self.client_id, "message_delta", self.response_format, extra={"event": "tool_error", "tool": name})
@@ -1,15 +1,12 @@
 from langchain.tools import Tool
-import difflib
 import requests
 import json
 from typing import Optional, Dict, List, Any
 import time
 from datetime import datetime
 import locale
-import re
-from bs4 import BeautifulSoup
-import markdown
 from utils.websocket_utils import send_websocket_message as send_ws_message
+from .session import get_current_client_id
 import logging
 from functools import partial
 import asyncio
@@ -95,6 +92,9 @@ async def safe_web_search(query: str, client_id: int = None) -> str:
 
 async def send_websocket_message(message: str, id_client_ws: str, type: str):
     # Envia uma mensagem para o cliente, via websocket
+    # Ferramentas compartilhadas não têm client_id fixo: usa o da sessão ativa
+    if id_client_ws is None:
+        id_client_ws = get_current_client_id()
     await send_ws_message(message, id_client_ws, type, "text")
 
 async def aget_datetime_info(query: str = "", client_id: int = None) -> str:
@@ -134,61 +134,16 @@ async def aget_datetime_info(query: str = "", client_id: int = None) -> str:
         await send_websocket_message(error_msg, client_id, "function_call_error")
         return f"Erro ao obter informações de data e hora: {str(e)}"
 
-async def format_response(text: str, format_type: str = "markdown", client_id: int = None) -> str:
-    """
-    Formata a resposta de acordo com o tipo especificado.
-    
-    Args:
-        text (str): Texto a ser formatado
-        format_type (str): Tipo de formatação ('markdown', 'text', 'html')
-        
-    Returns:
-        str: Texto formatado
-    """
-    await send_websocket_message("Formatando resposta...", client_id, "function_call_start")
-    if format_type == "text":
-        await send_websocket_message("Removendo formatação markdown...", client_id, "function_call_info")
-        # Remove formatação markdown
-        text = re.sub(r'#+\s+', '', text)  # Remove headers
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Remove bold
-        text = re.sub(r'\*(.*?)\*', r'\1', text)  # Remove italic
-        text = re.sub(r'`(.*?)`', r'\1', text)  # Remove code
-        text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)  # Remove links
-        text = re.sub(r'\n\s*[-*]\s+', '\n• ', text)  # Padroniza listas
-        text = re.sub(r'\n\s*\d+\.\s+', '\n', text)  # Remove numeração
-        return text.strip()
-    
-    elif format_type == "html":
-        await send_websocket_message("Convertendo markdown para HTML...", client_id, "function_call_info")
-        # Converte markdown para HTML
-        html = markdown.markdown(text, extensions=['fenced_code', 'tables'])
-        # Adiciona classes CSS para estilização
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Adiciona classes para diferentes elementos
-        for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            tag['class'] = tag.get('class', []) + ['heading']
-        
-        for tag in soup.find_all('code'):
-            tag['class'] = tag.get('class', []) + ['code-block']
-        
-        for tag in soup.find_all('pre'):
-            tag['class'] = tag.get('class', []) + ['pre-block']
-        
-        return str(soup)
-    
-    # Se for markdown ou qualquer outro formato, retorna o texto original
-    await send_websocket_message("Resposta formatada com sucesso!", client_id, "function_call_end")
-    return text
-
-def get_available_tools(client_id: int):
+def get_available_tools(client_id: int = None):
     """
     Retorna a lista de ferramentas disponíveis.
+    
+    Com client_id None, as ferramentas enviam mensagens para o cliente da sessão ativa,
+    o que permite compartilhá-las entre todas as conexões.
     """
     # Faz um bind do client id para a get_datetime_info
     aget_datetime_info_partial = partial(aget_datetime_info, client_id=client_id)
     asafe_web_search_partial = partial(safe_web_search, client_id=client_id)
-    aformat_response_partial = partial(format_response, client_id=client_id)
 
     return [
         Tool(
@@ -202,11 +157,5 @@ def get_available_tools(client_id: int):
             func=aget_datetime_info_partial,
             coroutine=aget_datetime_info_partial,
             description="Função Assíncrona: Obtém informações sobre a data e hora atual. Parâmetro: query (string)"
-        ),
-        Tool(
-            name="format_response",
-            func=aformat_response_partial,
-            coroutine=aformat_response_partial,
-            description="Formata o texto de acordo com o tipo especificado (markdown, text, html)"
         )
     ] 
\ No newline at end of file
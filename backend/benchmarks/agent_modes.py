@@ -0,0 +1,188 @@
+"""
+Benchmark dos modos do orquestrador: aninhado (nested) versus plano (flat).
+
+Um LLM falso com roteiro fixo (e latência simulada) substitui o ChatOpenAI, e as APIs de
+tarefas e rotinas são substituídas por respostas com latência simulada. Para cada pedido,
+o benchmark informa quantas chamadas ao LLM foram feitas e o tempo total.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.agent_modes [--llm-latency 0.4] [--api-latency 0.1] [--runs 3] [--max-parallel-tools 4]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas o benchmark não acessa nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "benchmark")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+REQUESTS = [
+    "liste minhas tarefas",
+    "crie uma tarefa para comprar pão",
+    "liste minhas rotinas",
+    "crie uma rotina de academia",
+    "crie uma tarefa para comprar pão e liste minhas rotinas",
+]
+
+# Ferramenta e argumentos escolhidos pelo roteiro para cada (entidade, ação)
+TOOL_CALLS = {
+    ("tarefa", "listar"): ("get_tasks", {"__arg1": ""}),
+    ("tarefa", "criar"): ("create_task", {"description": "Comprar pão", "priority": "Alta", "category": "Casa"}),
+    ("rotina", "listar"): ("get_routines", {"__arg1": ""}),
+    ("rotina", "criar"): ("create_routine", {"name": "Academia", "schedule": "07:00", "frequency": "weekdays"}),
+}
+
+ROUTES = {"tarefa": "route_to_task_agent", "rotina": "route_to_routine_agent"}
+
+class ScriptedChatModel(BaseChatModel):
+    """LLM falso: decide as próximas ações pelo último pedido do usuário e pelas ferramentas disponíveis."""
+    
+    latency: float = 0.4
+    calls: List[int] = []
+    
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+    
+    def _respond(self, messages: List[BaseMessage], tools: List[dict]) -> AIMessage:
+        self.calls.append(1)
+        names = {tool["function"]["name"] for tool in tools}
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=f"Pronto! {messages[-1].content[:80]}")
+        
+        # Pedidos compostos ("... e ...") viram várias chamadas de ferramenta no mesmo passo
+        text = next(message.content for message in reversed(messages) if isinstance(message, HumanMessage)).lower()
+        calls = []
+        for part in text.split(" e "):
+            entity = "rotina" if "rotina" in part else "tarefa"
+            if ROUTES[entity] in names:
+                calls.append((ROUTES[entity], {"__arg1": part}))
+            else:
+                calls.append(TOOL_CALLS[(entity, "listar" if "liste" in part else "criar")])
+        return self._tool_calls(calls)
+    
+    @staticmethod
+    def _tool_calls(calls: List[tuple]) -> AIMessage:
+        return AIMessage(content="", additional_kwargs={"tool_calls": [
+            {"id": f"call_{index}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+            for index, (name, arguments) in enumerate(calls)
+        ]})
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get("tools", [])))])
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get("tools", [])))])
+
+def install_fakes(llm: ScriptedChatModel, api_latency: float) -> None:
+    """Liga os agentes ao LLM falso e substitui as APIs por respostas com latência simulada."""
+    import utils.llm_transport as llm_transport
+    llm_transport.LLMTransport.chat_model = lambda self, *args, **kwargs: llm
+    
+    import utils.websocket_utils as websocket_utils
+    async def send_websocket_message(*args, **kwargs) -> bool:
+        return True
+    websocket_utils.send_websocket_message = send_websocket_message
+    
+    from agents.specialized import task_agent, routine_agent
+    task_agent.send_ws_message = send_websocket_message
+    routine_agent.send_ws_message = send_websocket_message
+    
+    tasks = [{"id": str(i), "description": f"Tarefa {i}", "priority": "media", "category": "casa", "status": "pendente"} for i in range(20)]
+    routines = [{"id": str(i), "name": f"Rotina {i}", "updated_at": f"2024-01-01T00:00:{i:02d}"} for i in range(20)]
+    
+    async def list_tasks():
+        await asyncio.sleep(api_latency)
+        return tasks
+    async def create_task(data):
+        await asyncio.sleep(api_latency)
+        return {"id": "99", "Descrição": data.get("descricao", "")}
+    task_agent.task_api_client.list_tasks = list_tasks
+    task_agent.task_api_client.create_task = create_task
+    task_agent.task_snapshot.loader = list_tasks
+    
+    async def get_routines(self, updated_since=None):
+        await asyncio.sleep(api_latency)
+        return True, "", {"data": routines}
+    async def create_routine(self, data, headers):
+        await asyncio.sleep(api_latency)
+        return True, "", {"id": "99", "name": json.loads(data)["name"]}
+    routine_agent.RoutineAPIClient.get_routines = get_routines
+    routine_agent.RoutineAPIClient.create_routine = create_routine
+
+async def run_request(orchestrator, llm: ScriptedChatModel, text: str, client_id: int) -> tuple:
+    from agents.session import current_session
+    from agents.specialized.task_agent import task_snapshot
+    
+    # Cada pedido começa sem cache, para que os dois modos paguem as mesmas buscas
+    task_snapshot.invalidate()
+    session = orchestrator.new_session(client_id)
+    token = current_session.set(session)
+    try:
+        llm.calls.clear()
+        start_time = time.perf_counter()
+        await orchestrator.process_message(text)
+        return len(llm.calls), time.perf_counter() - start_time
+    finally:
+        current_session.reset(token)
+
+async def main(llm_latency: float, api_latency: float, runs: int, max_parallel_tools: Optional[int] = None) -> None:
+    logging.disable(logging.WARNING)
+    llm = ScriptedChatModel(latency=llm_latency)
+    install_fakes(llm, api_latency)
+    
+    from agents.orchestrator_agent import OrchestratorAgent
+    from agents.specialized.task_agent import TaskAgent
+    from agents.specialized.routine_agent import RoutineAgent
+    
+    task_agent = TaskAgent()
+    routine_agent = RoutineAgent()
+    orchestrators = {
+        mode: OrchestratorAgent(task_agent=task_agent, routine_agent=routine_agent, mode=mode)
+        for mode in ("nested", "flat")
+    }
+    for agent in (task_agent, routine_agent, *orchestrators.values()):
+        agent.agent_executor.verbose = False
+        if max_parallel_tools is not None:
+            agent.agent_executor.max_parallel_tools = max_parallel_tools
+    
+    print(f"Latência simulada: LLM {llm_latency * 1000:.0f}ms, API {api_latency * 1000:.0f}ms; média de {runs} execuções\n")
+    print(f"{'pedido':<56} {'nested':>20} {'flat':>20}")
+    totals = {mode: [0, 0.0] for mode in orchestrators}
+    for text in REQUESTS:
+        row = []
+        for mode, orchestrator in orchestrators.items():
+            calls, elapsed = 0, 0.0
+            for run in range(runs):
+                run_calls, run_elapsed = await run_request(orchestrator, llm, text, client_id=run)
+                calls += run_calls
+                elapsed += run_elapsed
+            totals[mode][0] += calls / runs
+            totals[mode][1] += elapsed / runs
+            row.append(f"{calls / runs:.0f} chamadas {elapsed / runs * 1000:>6.0f}ms")
+        print(f"{text:<56} {row[0]:>20} {row[1]:>20}")
+    
+    print(f"{'total':<56} " + " ".join(f"{f'{calls:.0f} chamadas {elapsed * 1000:>6.0f}ms':>20}" for calls, elapsed in totals.values()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="latência simulada de cada chamada ao LLM (s)")
+    parser.add_argument("--api-latency", type=float, default=0.1, help="latência simulada de cada chamada às APIs (s)")
+    parser.add_argument("--runs", type=int, default=3, help="execuções por pedido e modo")
+    parser.add_argument("--max-parallel-tools", type=int, default=None, help="ferramentas simultâneas por turno (padrão: configurações)")
+    args = parser.parse_args()
+    asyncio.run(main(args.llm_latency, args.api_latency, args.runs, args.max_parallel_tools))
@@ -0,0 +1,103 @@
+"""
+Microbenchmark do histórico compartilhado com os agentes especializados.
+
+Compara, para históricos de 1000 mensagens, o custo de um turno roteado:
+
+- legado: o orquestrador monta uma cópia filtrada do histórico, o agente especializado
+  reconstrói essa lista verificando o tipo de cada mensagem e depois a percorre de novo
+  procurando a lista de tarefas/rotinas já carregada;
+- view: o orquestrador entrega a HistoryView memorizada do ConversationHistory e o agente
+  especializado a usa diretamente.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.history_view
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas o benchmark não acessa nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "benchmark")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from agents.history import ConversationHistory, as_chat_history
+
+MARKER = "Aqui estão todas as suas tarefas:"
+HISTORY_SIZE = 1000
+ITERATIONS = 200
+
+def build_history(size: int, token_budget: int) -> ConversationHistory:
+    history = ConversationHistory([SystemMessage(content="Você é um agente orquestrador.")], token_budget=token_budget)
+    for index in range(size // 2):
+        history.append(HumanMessage(content=f"Crie a tarefa número {index} para amanhã às 9h"))
+        history.append(AIMessage(content=f"Tarefa {index} criada com sucesso para amanhã às 09:00."))
+    return history
+
+def legacy_routed_turn(messages):
+    # Cópia filtrada feita por route_to_*_agent antes do histórico compartilhado
+    filtered_history = [msg for msg in messages if not isinstance(msg, SystemMessage)]
+    
+    # Reconstrução feita por TaskAgent/RoutineAgent.process_message
+    langchain_history = []
+    for msg in filtered_history:
+        if isinstance(msg, HumanMessage):
+            langchain_history.append(msg)
+        elif isinstance(msg, AIMessage):
+            langchain_history.append(msg)
+        elif isinstance(msg, SystemMessage):
+            continue
+    
+    # Procura pela lista já carregada
+    for msg in langchain_history:
+        if isinstance(msg, AIMessage) and MARKER in msg.content:
+            break
+    return langchain_history
+
+def view_routed_turn(history: ConversationHistory):
+    langchain_history = as_chat_history(history.window())
+    langchain_history.contains(MARKER)
+    return langchain_history
+
+def measure(label: str, fn) -> None:
+    fn()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    elapsed_us = (time.perf_counter() - start) / ITERATIONS * 1_000_000
+    
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed_us:>10.1f} µs/turno {peak / 1024:>10.1f} KiB alocados")
+
+def main() -> None:
+    print(f"Histórico de {HISTORY_SIZE} mensagens, média de {ITERATIONS} turnos\n")
+    
+    # Sem limite efetivo de tokens: a janela cobre o histórico inteiro (pior caso)
+    full = build_history(HISTORY_SIZE, token_budget=10**9)
+    messages = list(full)
+    measure("legado (histórico completo)", lambda: legacy_routed_turn(messages))
+    measure("view (histórico completo)", lambda: view_routed_turn(full))
+    
+    # Com o orçamento padrão, só a janela recente é visível
+    windowed = build_history(HISTORY_SIZE, token_budget=3000)
+    print(f"\nJanela com orçamento de 3000 tokens: {len(windowed.window())} mensagens")
+    measure("legado (cópia da janela)", lambda: legacy_routed_turn(windowed.window()[:]))
+    measure("view (janela compartilhada)", lambda: view_routed_turn(windowed))
+    
+    # Primeiro acesso após uma nova mensagem: a view é reconstruída uma única vez por turno
+    def append_and_route():
+        windowed.append(HumanMessage(content="nova mensagem"))
+        view_routed_turn(windowed)
+        view_routed_turn(windowed)
+    measure("view (append + 2 roteamentos)", append_and_route)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Avaliação do classificador de intenção local usado no lugar da chamada de roteamento ao LLM.
+
+Treina com a parte "train" de agents/data/intents.json e avalia na parte "eval": acurácia
+geral e por rótulo, cobertura (mensagens roteadas localmente acima do limiar), precisão dessas
+decisões, latência de cada predição e o tempo de LLM economizado.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.intent_eval [--threshold 0.7] [--llm-latency 0.8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas a avaliação não acessa nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "benchmark")
+
+import numpy as np
+
+from agents.intent_classifier import ROUTED_INTENTS, load_intents, train_intent_classifier
+from config.settings import get_settings
+
+def main(threshold: float, llm_latency: float) -> None:
+    data = load_intents()
+    start_time = time.perf_counter()
+    classifier = train_intent_classifier(data["train"], data["labels"])
+    train_time = time.perf_counter() - start_time
+    
+    latencies = []
+    correct = 0
+    per_label = {label: [0, 0] for label in data["labels"]}
+    routed = routed_correct = 0
+    errors = []
+    for text, label in data["eval"]:
+        start_time = time.perf_counter()
+        predicted, confidence = classifier.predict(text)
+        latencies.append(time.perf_counter() - start_time)
+        
+        per_label[label][1] += 1
+        if predicted == label:
+            correct += 1
+            per_label[label][0] += 1
+        else:
+            errors.append((text, label, predicted, confidence))
+        if predicted in ROUTED_INTENTS and confidence >= threshold:
+            routed += 1
+            routed_correct += predicted == label
+    
+    total = len(data["eval"])
+    routable = sum(1 for _, label in data["eval"] if label in ROUTED_INTENTS)
+    latencies_ms = np.array(latencies) * 1000
+    print(f"Treino: {len(data['train'])} exemplos em {train_time * 1000:.0f}ms; avaliação: {total} exemplos\n")
+    print(f"Acurácia: {correct / total:.1%}")
+    for label, (hits, count) in per_label.items():
+        print(f"  {label:<8} {hits}/{count} ({hits / count:.1%})")
+    print(f"\nLimiar de confiança: {threshold}")
+    print(f"Roteadas localmente: {routed}/{routable} mensagens de tarefas/rotinas ({routed / routable:.1%})")
+    print(f"Precisão do roteamento local: {routed_correct / routed:.1%}" if routed else "Precisão do roteamento local: -")
+    print(f"\nLatência por predição: p50 {np.percentile(latencies_ms, 50):.3f}ms, p95 {np.percentile(latencies_ms, 95):.3f}ms, máx {latencies_ms.max():.3f}ms")
+    print(f"Chamadas de roteamento ao LLM evitadas: {routed}/{total} ({routed / total:.1%} das mensagens)")
+    print(f"Tempo economizado: {routed * llm_latency:.1f}s no total, {routed * llm_latency / total * 1000:.0f}ms por mensagem (LLM a {llm_latency * 1000:.0f}ms)")
+    
+    if errors:
+        print("\nErros:")
+        for text, label, predicted, confidence in errors:
+            print(f"  {text!r}: esperado {label}, previsto {predicted} ({confidence:.2f})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threshold", type=float, default=get_settings().intent_confidence_threshold, help="confiança mínima para rotear sem o LLM")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="latência de uma chamada de roteamento ao LLM (s)")
+    args = parser.parse_args()
+    main(args.threshold, args.llm_latency)
@@ -0,0 +1,128 @@
+"""
+Benchmark das codificações de frames do WebSocket: bytes enviados e custo de codificação.
+
+Compara, para frames representativos das respostas dos agentes, o JSON atual (com e sem
+permessage-deflate), o MessagePack e o MessagePack com zlib acima do limite (msgpack.deflate).
+O permessage-deflate é aproximado por deflate bruto de cada mensagem isolada (sem reaproveitar
+o contexto entre mensagens), o pior caso da extensão.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.ws_encoding [--items 30] [--repeat 2000] [--threshold 1024]
+"""
+import argparse
+import os
+import sys
+import timeit
+import zlib
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas o benchmark não acessa nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "benchmark")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "benchmark")
+
+
+def sample_frames(items: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """Frames típicos de um turno: listagens finais, HTML, progresso em lote e deltas."""
+    from agents.specialized.routine_replica import ROUTINES_HEADER, render_routine
+    from agents.specialized.task_agent import format_task
+    from utils.response_formatter import format_response
+    
+    routines = [{
+        "id": f"5f1c2a7e-{index:04d}-4b8e-9d3a-1c2b3d4e5f60",
+        "name": f"Rotina {index}: exercícios matinais",
+        "description": "Alongamento, corrida leve e respiração antes do trabalho",
+        "status": "pending",
+        "schedule": "07:00",
+        "frequency": "weekdays",
+        "priority": "medium",
+        "tags": ["saúde", "manhã"],
+        "estimated_duration": 45,
+        "start_date": "2024-03-01",
+        "end_date": "2024-12-31",
+    } for index in range(items)]
+    tasks = [{
+        "id": str(1000 + index),
+        "description": f"Revisar o relatório mensal {index} e enviar para a equipe",
+        "priority": "Alta" if index % 3 == 0 else "Média",
+        "category": "Trabalho",
+        "status": "Pendente",
+        "created_at": "2024-03-05T10:15:00",
+    } for index in range(items)]
+    routines_markdown = ROUTINES_HEADER + "".join(render_routine(routine) for routine in routines)
+    progress = [
+        {"seq": seq, "kind": kind, "tool": tool, "message": message, "elapsed_ms": 12.5 * seq}
+        for seq, (kind, tool, message) in enumerate([
+            ("start", "get_tasks", "Obtendo tarefas..."),
+            ("info", "get_tasks", "Tarefas obtidas em 0.21s"),
+            ("end", "get_tasks", "Tarefas obtidas em 0.22s"),
+            ("start", "update_routine", "Iniciando atualização de rotina..."),
+            ("info", "update_routine", "Validando dados..."),
+            ("end", "update_routine", "Rotina atualizada com sucesso"),
+        ], start=1)
+    ]
+    
+    return [
+        ("rotinas (markdown)", {"type": "message", "content": routines_markdown, "format": "markdown"}),
+        ("rotinas (html)", {"type": "message", "content": format_response(routines_markdown, "html"), "format": "html"}),
+        ("tarefas (texto)", {"type": "message", "content": "\n".join(format_task(task) for task in tasks), "format": "text"}),
+        ("progresso em lote", {"type": "progress", "content": "", "format": "text", "events": progress}),
+        ("delta de token", {"type": "message_delta", "content": " rotina", "format": "markdown", "event": "token"}),
+        ("resposta curta", {"type": "message", "content": "Tarefa criada com sucesso!", "format": "markdown"}),
+    ]
+
+
+def encoders(threshold: int) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    from utils.ws_codec import JsonCodec, MsgpackCodec, msgpack
+    
+    json_codec = JsonCodec()
+    
+    def json_deflate(frame: Dict[str, Any]) -> bytes:
+        # Deflate bruto por mensagem, como o permessage-deflate sem reaproveitar contexto
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15, 5)
+        return compressor.compress(json_codec.encode(frame).encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)[:-4]
+    
+    result = {"json": json_codec.encode, "json+permessage-deflate": json_deflate}
+    if msgpack is None:
+        print("msgpack não instalado: comparando apenas JSON\n")
+        return result
+    result["msgpack"] = MsgpackCodec().encode
+    result["msgpack.deflate"] = MsgpackCodec(compress_threshold=threshold).encode
+    return result
+
+
+def main(items: int, repeat: int, threshold: int) -> None:
+    frames = sample_frames(items)
+    codecs = encoders(threshold)
+    
+    sizes: Dict[str, List[int]] = {name: [] for name in codecs}
+    costs: Dict[str, List[float]] = {name: [] for name in codecs}
+    for _, frame in frames:
+        for name, encode in codecs.items():
+            payload = encode(frame)
+            sizes[name].append(len(payload.encode() if isinstance(payload, str) else payload))
+            costs[name].append(timeit.timeit(lambda: encode(frame), number=repeat) / repeat * 1e6)
+    
+    header = f"{'frame':<22}" + "".join(f"{name:>26}" for name in codecs)
+    print(f"{items} itens por listagem; limite do msgpack.deflate: {threshold} bytes\n")
+    print("Bytes enviados")
+    print(header)
+    for index, (label, _) in enumerate(frames):
+        print(f"{label:<22}" + "".join(f"{sizes[name][index]:>26}" for name in codecs))
+    print(f"{'total':<22}" + "".join(f"{sum(sizes[name]):>26}" for name in codecs))
+    
+    print(f"\nCusto de codificação (µs por frame, média de {repeat})")
+    print(header)
+    for index, (label, _) in enumerate(frames):
+        print(f"{label:<22}" + "".join(f"{costs[name][index]:>26.1f}" for name in codecs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=30, help="rotinas e tarefas em cada listagem")
+    parser.add_argument("--repeat", type=int, default=2000, help="repetições na medição do custo de codificação")
+    parser.add_argument("--threshold", type=int, default=1024, help="tamanho (bytes) a partir do qual o msgpack.deflate comprime")
+    args = parser.parse_args()
+    main(args.items, args.repeat, args.threshold)
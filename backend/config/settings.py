@@ -18,9 +18,89 @@ class _Settings(BaseSettings):
     openai_api_key: str
     openai_model: str = "gpt-3.5-turbo"
 
+    # LLM transport (pool HTTP compartilhado com o provedor)
+    llm_request_timeout: float = 60.0
+    llm_connect_timeout: float = 10.0
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+    llm_max_retries: int = 2
+    llm_prewarm: bool = False
+
+    # Enviar a resposta em streaming (frames message_delta) quando o cliente não especificar
+    stream_responses: bool = False
+
+    # Mensagens aguardando processamento por conexão; acima disso, novas mensagens são recusadas
+    ws_inbound_queue_size: int = 8
+
+    # Frames aguardando envio por conexão; acima disso, o progresso intermediário é descartado
+    ws_outbound_queue_size: int = 64
+
+    # Janela (segundos) em que os eventos de progresso das ferramentas são agrupados em um único frame
+    ws_progress_window: float = 0.05
+
+    # Compressão dos frames: permessage-deflate do servidor e, no subprotocolo msgpack.deflate,
+    # zlib nos frames acima do limite (bytes)
+    ws_per_message_deflate: bool = True
+    ws_compress_threshold: int = 1024
+    ws_compress_level: int = 6
+
+    # Workers do uvicorn iniciados pelo main.py. Com mais de um, o main.py inicia também o hub de
+    # eventos em socket Unix (event_bus_socket, ou um arquivo no diretório temporário), pelo qual
+    # uma conexão recebe mensagens produzidas em outro worker; sem socket, o barramento é local
+    workers: int = 1
+    event_bus_socket: str = ""
+
+    # Janela do histórico de conversa enviado ao LLM
+    history_token_budget: int = 3000
+    history_keep_recent: int = 6
+
+    # Pool de sessões dos agentes
+    session_pool_capacity: int = 500
+    session_storage_dir: str = ""
+
+    # Cache da lista de tarefas compartilhado entre sessões (segundos)
+    task_cache_ttl: float = 30.0
+
+    # Modo do orquestrador: "nested" (roteia para os agentes especializados) ou "flat"
+    # (as ferramentas de tarefas e rotinas ficam direto no orquestrador, em um único laço)
+    agent_mode: str = "nested"
+
+    # Atender comandos comuns (listar tarefas/rotinas, data e hora) sem chamar o LLM
+    fast_path_enabled: bool = True
+
+    # Classificador de intenção local: mensagens claras de tarefas ou rotinas dispensam a chamada
+    # de roteamento ao LLM; abaixo do limiar de confiança, o LLM continua decidindo
+    intent_router_enabled: bool = True
+    intent_confidence_threshold: float = 0.7
+
+    # Repassar ao cliente, sem nova geração do orquestrador, as respostas finais dos agentes especializados
+    subagent_passthrough: bool = True
+
+    # Máximo de ferramentas executadas ao mesmo tempo quando o modelo pede várias em um único passo
+    max_parallel_tools: int = 4
+
+    # Buscar o contexto de tarefas e rotinas em paralelo com o roteamento do orquestrador
+    speculative_prefetch: bool = True
+
+    # Contexto de tarefas e rotinas injetado a cada turno: itens mais relevantes, limitados em quantidade e tokens
+    context_top_k: int = 15
+    context_token_budget: int = 800
+
+    # Intervalo entre sincronizações completas da réplica de rotinas (segundos)
+    routine_full_sync_interval: float = 300.0
+
+    # Pool HTTP das APIs de tarefas e rotinas
+    api_connect_timeout: float = 5.0
+    api_read_timeout: float = 15.0
+    api_max_connections: int = 50
+    api_max_keepalive_connections: int = 10
+    api_max_retries: int = 2
+    api_retry_backoff: float = 0.2
+
     # API URLs
-    task_api_url: str = "https://api.example.com/tasks"
-    routine_api_url: str = "https://api.example.com/routines"
+    task_api_url: str = "https://api.itenorio.com/lambda/tasks"
+    routine_api_url: str = "https://api.itenorio.com/lambda/routines"
 
     # Logging
     log_level: str = "INFO"
@@ -4,41 +4,56 @@ import traceback
 from typing import Dict, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from agents.orchestrator_agent import OrchestratorAgent
-from agents.specialized.task_agent import TaskAgent
-from agents.specialized.routine_agent import RoutineAgent
+from agents.blueprints import build_agent_blueprints, get_task_agent, get_routine_agent
 from utils.connection_manager import connection_manager
+from utils.agents_manager import agents_manager
+from utils.event_bus import client_id_for, event_bus
+from config.settings import get_settings
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 # Criar router para as rotas da aplicação
 router = APIRouter(tags=["app"])
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    client_id = id(websocket)
-    await connection_manager.connect(websocket)
+    client_id = client_id_for(websocket)
+    codec = await connection_manager.connect(websocket)
     
     try:
         while True:
             try:
-                data = await websocket.receive_text()
-                logger.info(f"Recebido do WebSocket: {data}")
-                data_json = json.loads(data)
-                logger.info(f"Dados JSON: {data_json}")
+                # Frames de texto (JSON) ou binários (MessagePack), conforme o codec negociado
+                data = await websocket.receive()
+                if data["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(data.get("code", 1000))
+                data_json = codec.decode(data["text"] if data.get("text") is not None else data["bytes"])
+                logger.info(f"Dados recebidos: {data_json}")
                 
                 if "text" in data_json:
                     # Extrair o formato da resposta, padrão é markdown
                     response_format = data_json.get("format", "markdown")
-                    logger.info(f"Processando mensagem: {data_json['text']} com formato: {response_format}")
-                    await connection_manager.process_message(client_id, data_json["text"], response_format)
+                    # Streaming de tokens (frames message_delta), se o cliente pedir ou por padrão
+                    stream = bool(data_json.get("stream", settings.stream_responses))
+                    logger.info(f"Enfileirando mensagem: {data_json['text']} com formato: {response_format}")
+                    await connection_manager.submit(client_id, data_json["text"], response_format, stream)
                 elif "content" in data_json:
                     # Compatibilidade com o formato anterior
                     response_format = data_json.get("format", "markdown")
                     logger.info(f"Processando mensagem (formato antigo): {data_json['content']} com formato: {response_format}")
-                    await connection_manager.process_message(client_id, data_json["content"], response_format)
+                    # O formato antigo não tem o campo stream: vale o padrão configurado
+                    await connection_manager.submit(client_id, data_json["content"], response_format, stream=settings.stream_responses)
+                elif data_json.get("type") == "cancel" or data_json.get("cancel") is True:
+                    # Interrompe o turno em andamento sem fechar a conexão
+                    logger.info(f"Recebido: {data_json} (Cancelamento)")
+                    connection_manager.cancel(client_id)
                 elif "idle" in data_json:
                     logger.info(f"Recebido: {data_json} (Sinal de idle)")
+                    if data_json["idle"]:
+                        connection_manager.hibernate(client_id)
                 else:
                     logger.warning(f"Formato de mensagem desconhecido: {data_json}")
             except WebSocketDisconnect:
@@ -55,13 +70,21 @@ async def websocket_endpoint(websocket: WebSocket):
         if client_id in await connection_manager.active_connections():
             connection_manager.disconnect(client_id)
 
+@router.get("/api/agents/stats")
+async def agents_stats():
+    """Retorna os contadores do pool de sessões dos agentes, das conexões e do barramento (deste worker)."""
+    stats = agents_manager.stats()
+    stats["connections"] = connection_manager.stats()
+    stats["event_bus"] = event_bus.stats()
+    return stats
+
 def initialize_agents():
     """Inicializa os agentes necessários."""
     try:
         logger.info("Inicializando agentes...")
-        orchestrator = OrchestratorAgent()
-        task_agent = TaskAgent()
-        routine_agent = RoutineAgent()
+        orchestrator = build_agent_blueprints()
+        task_agent = get_task_agent()
+        routine_agent = get_routine_agent()
         logger.info("Agentes inicializados com sucesso!")
         return orchestrator, task_agent, routine_agent
     except Exception as e:
@@ -1,6 +1,6 @@
 import logging
 from fastapi import APIRouter, HTTPException
-from agents.specialized.routine_agent import RoutineAgent
+from agents.blueprints import get_routine_agent
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -8,8 +8,8 @@ logger = logging.getLogger(__name__)
 # Criar o router
 router = APIRouter(prefix="/api/routines", tags=["routines"])
 
-# Inicializar o agente de rotinas
-routine_agent = RoutineAgent(client_id=0)  # Using 0 as a default client_id for the API endpoints
+# Agente de rotinas compartilhado com as conexões WebSocket
+routine_agent = get_routine_agent()
 
 @router.get("/")
 async def get_routines():
@@ -1,6 +1,6 @@
 import logging
 from fastapi import APIRouter, HTTPException
-from agents.specialized.task_agent import TaskAgent
+from agents.blueprints import get_task_agent
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -8,8 +8,8 @@ logger = logging.getLogger(__name__)
 # Criar o router
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
-# Inicializar o agente de tarefas
-task_agent = TaskAgent(client_id=0)  # Using 0 as a default client_id for the API endpoints
+# Agente de tarefas compartilhado com as conexões WebSocket
+task_agent = get_task_agent()
 
 @router.get("/")
 async def get_tasks():
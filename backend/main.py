@@ -1,11 +1,22 @@
+import os
 import signal
 import sys
 import logging
+import tempfile
 import traceback
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from controllers import api_router
+from utils.agents_manager import agents_manager
+from utils.llm_transport import get_llm_transport
+from utils.http_client import close_http_pool
+from utils.event_bus import event_bus, start_event_hub
+from utils.websocket_utils import deliver_websocket_message
+from config.settings import get_settings
+
+# Obter configurações
+settings = get_settings()
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -26,6 +37,21 @@ app.add_middleware(
 # Incluir os routers dos controllers
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def startup():
+    """Constrói os agentes compartilhados antes de aceitar conexões."""
+    agents_manager.initialize()
+    await event_bus.start(deliver_websocket_message)
+    if settings.llm_prewarm:
+        await get_llm_transport().prewarm()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Fecha os pools de conexão com o provedor de LLM e com as APIs e a conexão com o hub de eventos."""
+    await event_bus.close()
+    await get_llm_transport().aclose()
+    await close_http_pool()
+
 # Variável para controlar o estado do servidor
 server_running = True
 
@@ -42,8 +68,24 @@ signal.signal(signal.SIGINT, signal_handler)
 def main():
     """Função principal."""
     try:
+        if settings.workers > 1:
+            # Os workers herdam o caminho do hub pelo ambiente e se registram nele ao iniciar
+            socket_path = settings.event_bus_socket or os.path.join(tempfile.gettempdir(), "monolito-events.sock")
+            os.environ["EVENT_BUS_SOCKET"] = socket_path
+            start_event_hub(socket_path)
+            logger.info(f"Iniciando {settings.workers} workers com o hub de eventos em {socket_path}")
+            # Com vários workers, o uvicorn precisa importar a aplicação em cada processo
+            uvicorn.run(
+                "main:app",
+                host="0.0.0.0",
+                port=8000,
+                workers=settings.workers,
+                ws_per_message_deflate=settings.ws_per_message_deflate
+            )
+            return
+        
         # Iniciar servidor
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+        uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=settings.ws_per_message_deflate)
         
     except Exception as e:
         logger.error(f"Erro na função principal: {str(e)}")
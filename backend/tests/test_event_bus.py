@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from utils.event_bus import EventHub, LocalEventBus, UnixSocketEventBus
+
+EVENT = {"message": "Tarefa criada com sucesso!", "type": "message", "format": "markdown"}
+
+
+class Inbox:
+    """Função de entrega de um worker: guarda os eventos recebidos por cliente."""
+    
+    def __init__(self):
+        self.events = []
+        self.received = asyncio.Event()
+    
+    async def __call__(self, client_id, event):
+        self.events.append((client_id, event))
+        self.received.set()
+        return True
+
+
+def test_local_bus_delivers_only_to_registered_clients():
+    async def scenario():
+        bus = LocalEventBus()
+        inbox = Inbox()
+        await bus.start(inbox)
+        bus.register(1)
+        delivered = await bus.publish(1, EVENT)
+        missing = await bus.publish(2, EVENT)
+        bus.unregister(1)
+        after_unregister = await bus.publish(1, EVENT)
+        return bus, inbox, (delivered, missing, after_unregister)
+    
+    bus, inbox, results = asyncio.run(scenario())
+    assert results == (True, False, False)
+    assert inbox.events == [(1, EVENT)]
+    assert (bus.published, bus.delivered, bus.undeliverable) == (3, 1, 2)
+
+
+def test_hub_routes_events_between_workers():
+    async def scenario(path):
+        hub = EventHub(path)
+        serving = asyncio.ensure_future(hub.serve())
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        # Dois workers conectados ao mesmo hub, cada um com as suas conexões
+        first, second = UnixSocketEventBus(path), UnixSocketEventBus(path)
+        first_inbox, second_inbox = Inbox(), Inbox()
+        try:
+            await first.start(first_inbox)
+            await second.start(second_inbox)
+            first.register(1)
+            second.register(2)
+            # O registro é assíncrono: espera o hub conhecer o cliente do segundo worker
+            while 2 not in hub.owners:
+                await asyncio.sleep(0.01)
+            
+            assert await first.publish(1, EVENT)
+            assert await first.publish(2, EVENT)
+            await asyncio.wait_for(second_inbox.received.wait(), timeout=5)
+            
+            # Cliente desconhecido: o hub recebe, mas não tem a quem entregar
+            assert await first.publish(3, EVENT)
+            while hub.undeliverable == 0:
+                await asyncio.sleep(0.01)
+            return hub, first, second, first_inbox, second_inbox
+        finally:
+            await first.close()
+            await second.close()
+            # O hub encerra as conexões dos workers antes de parar
+            while hub.owners:
+                await asyncio.sleep(0.01)
+            serving.cancel()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        hub, first, second, first_inbox, second_inbox = asyncio.run(scenario(os.path.join(directory, "hub.sock")))
+    
+    # O evento local não passa pelo hub; o do outro worker é entregue por ele
+    assert first_inbox.events == [(1, EVENT)]
+    assert second_inbox.events == [(2, EVENT)]
+    assert (first.forwarded, second.received, hub.routed, hub.undeliverable) == (2, 1, 1, 1)
+
+
+if __name__ == "__main__":
+    test_local_bus_delivers_only_to_registered_clients()
+    test_hub_routes_events_between_workers()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from agents.history import MAX_OVERFLOW_FACTOR, ConversationHistory, _message_tokens
+
+
+def turn(index):
+    """Mensagem de tamanho fixo, alternando usuário e assistente."""
+    cls = HumanMessage if index % 2 == 0 else AIMessage
+    return cls(content=f"mensagem {index:03d} " + "palavra " * 20)
+
+
+# Tokens de cada mensagem de turn(); o orçamento dos testes é dado em mensagens
+MESSAGE_TOKENS = _message_tokens(turn(0))
+
+
+def history(budget_messages, keep_recent=2):
+    return ConversationHistory(token_budget=budget_messages * MESSAGE_TOKENS, keep_recent=keep_recent)
+
+
+def contents(messages):
+    return [message.content for message in messages if not isinstance(message, SystemMessage)]
+
+
+class SlowSummaryLLM:
+    """LLM de resumo que só responde quando o teste libera."""
+    
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.prompts = []
+    
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        await self.release.wait()
+        return SimpleNamespace(content="resumo")
+
+
+def test_window_keeps_unsummarized_messages():
+    conversation = history(budget_messages=4)
+    messages = [turn(index) for index in range(4 * MAX_OVERFLOW_FACTOR)]
+    conversation.extend(messages)
+    
+    # Acima do orçamento, mas nada foi resumido: nenhuma mensagem sai da janela
+    assert contents(conversation.window()) == contents(messages)
+    assert conversation.needs_summary()
+
+
+def test_overflow_factor_forces_drop(caplog):
+    conversation = history(budget_messages=4)
+    messages = [turn(index) for index in range(4 * MAX_OVERFLOW_FACTOR + 3)]
+    with caplog.at_level(logging.WARNING, logger="agents.history"):
+        conversation.extend(messages)
+    
+    # A janela volta ao limite descartando as mais antigas, mesmo sem resumo
+    window = contents(conversation.window())
+    assert window == contents(messages[-len(window):])
+    assert len(window) == 4 * MAX_OVERFLOW_FACTOR
+    assert conversation._dropped_unsummarized == 3
+    # Um único aviso para o atraso inteiro
+    assert len([record for record in caplog.records if "Resumo atrasado" in record.message]) == 1
+
+
+def test_late_summary_keeps_window_consistent():
+    async def scenario():
+        conversation = history(budget_messages=5, keep_recent=2)
+        conversation.append(SystemMessage(content="prompt do sistema"))
+        messages = [turn(index) for index in range(6)]
+        conversation.extend(messages)
+        
+        llm = SlowSummaryLLM()
+        conversation.schedule_summary(llm)
+        await asyncio.sleep(0)
+        assert len(llm.prompts) == 1
+        
+        # Novas mensagens chegam enquanto o resumo está sendo gerado
+        late = [turn(index) for index in range(6, 9)]
+        conversation.extend(late)
+        assert contents(conversation.window()) == contents(messages + late)
+        
+        llm.release.set()
+        await conversation._summary_task
+        return conversation, messages, late
+    
+    conversation, messages, late = asyncio.run(scenario())
+    window = conversation.window()
+    
+    # Só entram no resumo as mensagens anteriores ao corte feito no agendamento
+    assert conversation._summarized_upto == 1 + len(messages) - 2
+    assert window[0].content.endswith("resumo")
+    # A janela é um sufixo contíguo do histórico e contém tudo que ainda não foi resumido
+    tail = contents(window)
+    assert tail == contents(messages + late)[-len(tail):]
+    unsummarized = contents(conversation[conversation._summarized_upto:])
+    assert tail[-len(unsummarized):] == unsummarized
+    assert sum(_message_tokens(message) for message in window[1:]) <= conversation.token_budget * MAX_OVERFLOW_FACTOR
+
+
+if __name__ == "__main__":
+    test_window_keeps_unsummarized_messages()
+    test_late_summary_keeps_window_consistent()
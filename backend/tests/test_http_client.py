@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from utils import http_client
+from utils.http_client import LatencyMetrics, request_with_retry
+
+URL = "https://api.example.com/tasks"
+
+
+class FakeAPI:
+    """API simulada: responde com os status (ou exceções) da lista, na ordem, e registra as chamadas."""
+    
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+    
+    def handler(self, request):
+        self.calls.append(request.method)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Troca o pool compartilhado por um cliente com MockTransport e registra as esperas entre tentativas."""
+    state = {"api": None, "delays": [], "ceilings": []}
+    
+    def use(*outcomes):
+        state["api"] = FakeAPI(*outcomes)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(state["api"].handler))
+        monkeypatch.setattr(http_client, "get_http_pool", lambda: client)
+        return state["api"]
+    
+    real_uniform = http_client.random.uniform
+    
+    def uniform(low, high):
+        state["ceilings"].append((low, high))
+        return real_uniform(low, high)
+    
+    async def sleep(delay):
+        state["delays"].append(delay)
+    
+    monkeypatch.setattr(http_client.random, "uniform", uniform)
+    monkeypatch.setattr(http_client.asyncio, "sleep", sleep)
+    monkeypatch.setattr(http_client.settings, "api_retry_backoff", 0.2)
+    state["use"] = use
+    return state
+
+
+@pytest.mark.parametrize("status", sorted(http_client.RETRY_STATUS_CODES))
+def test_get_retried_on_transient_status(api, status):
+    fake = api["use"](status, status, 200)
+    response = asyncio.run(request_with_retry("GET", URL, max_retries=2))
+    assert response.status_code == 200
+    assert fake.calls == ["GET"] * 3
+
+
+def test_get_gives_up_after_max_retries(api):
+    fake = api["use"](503)
+    metrics = LatencyMetrics()
+    response = asyncio.run(request_with_retry("GET", URL, metrics=metrics, endpoint="GET /tasks", max_retries=3))
+    
+    # A última resposta transitória é devolvida a quem chamou
+    assert response.status_code == 503
+    assert fake.calls == ["GET"] * 4
+    stats = metrics.stats()["GET /tasks"]
+    assert (stats["count"], stats["errors"], stats["retries"]) == (1, 1, 3)
+
+
+def test_post_is_never_retried(api):
+    fake = api["use"](503, 200)
+    response = asyncio.run(request_with_retry("POST", URL, max_retries=3, json={"description": "comprar pão"}))
+    assert response.status_code == 503
+    assert fake.calls == ["POST"]
+    assert api["delays"] == []
+
+
+def test_post_transport_error_is_raised_without_retry(api):
+    fake = api["use"](httpx.ConnectError("recusada"), 200)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(request_with_retry("POST", URL, max_retries=3))
+    assert fake.calls == ["POST"]
+
+
+def test_transport_errors_retried_then_raised(api):
+    fake = api["use"](httpx.ReadTimeout("timeout"), httpx.ConnectError("recusada"), 200)
+    assert asyncio.run(request_with_retry("DELETE", URL, max_retries=2)).status_code == 200
+    assert fake.calls == ["DELETE"] * 3
+    
+    fake = api["use"](httpx.ConnectError("recusada"))
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(request_with_retry("GET", URL, max_retries=2))
+    assert fake.calls == ["GET"] * 3
+
+
+def test_other_errors_not_retried(api):
+    fake = api["use"](500, 200)
+    assert asyncio.run(request_with_retry("GET", URL, max_retries=2)).status_code == 500
+    assert fake.calls == ["GET"]
+
+
+def test_full_jitter_bound(api):
+    api["use"](503)
+    asyncio.run(request_with_retry("GET", URL, max_retries=4))
+    
+    # Cada espera é sorteada entre 0 e backoff * 2^tentativa
+    assert api["ceilings"] == [(0, 0.2 * 2 ** attempt) for attempt in range(1, 5)]
+    assert all(0 <= delay <= high for delay, (_, high) in zip(api["delays"], api["ceilings"]))
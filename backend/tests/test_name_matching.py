@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from agents.fast_path import DATETIME_PATTERNS, ROUTINE_PATTERNS, TASK_PATTERNS, Command, CommandMatcher
+from agents.name_index import NameIndex
+
+ROUTINES = [
+    ("r1", "Exercícios matinais"),
+    ("r2", "Leitura noturna"),
+    ("r3", "Estudo de inglês"),
+    ("r4", "Estudo de espanhol"),
+    ("r5", "Meditação"),
+]
+
+# (consulta, IDs esperados no topo, na ordem; vazio quando nada deve ser encontrado)
+NAME_CASES = [
+    ("Exercícios matinais", ["r1"]),
+    ("exercicios matinais", ["r1"]),
+    ("MEDITACAO", ["r5"]),
+    ("exercisios matinas", ["r1"]),
+    ("leitura notruna", ["r2"]),
+    ("atualiza a rotina de exercícios", ["r1"]),
+    ("estudo", ["r3", "r4"]),
+    ("jardinagem", []),
+]
+
+
+@pytest.mark.parametrize("query, expected", NAME_CASES)
+def test_name_index_search(query, expected):
+    results = NameIndex(ROUTINES).search(query)
+    assert [entry_id for entry_id, _, _ in results][:len(expected)] == expected
+    if not expected:
+        assert results == []
+
+
+def test_name_index_exact_and_ambiguous_scores():
+    index = NameIndex(ROUTINES)
+    # Igualdade após normalização (acentos e caixa) vale 1.0
+    assert index.search("meditacao")[0][2] == 1.0
+    # Nomes ambíguos aparecem todos, com pontuações próximas, para o modelo perguntar ao usuário
+    first, second = index.search("estudo")[:2]
+    assert first[2] < 1.0 and abs(first[2] - second[2]) < 0.1
+
+
+# (mensagem, comando esperado ou None quando a mensagem deve seguir para o orquestrador)
+COMMAND_CASES = [
+    ("liste minhas tarefas", "list_tasks"),
+    ("Mostre todas as minhas tarefas!", "list_tasks"),
+    ("tarefas", "list_tasks"),
+    ("por favor, me mostre as tarefas", "list_tasks"),
+    ("show me all my tasks please", "list_tasks"),
+    ("list my to-dos", "list_tasks"),
+    ("quais são as minhas rotinas?", "list_routines"),
+    ("exiba rotinas", "list_routines"),
+    ("list all of my routines", "list_routines"),
+    ("Que horas são?", "datetime_info"),
+    ("qual é a data de hoje", "datetime_info"),
+    ("que dia é hoje", "datetime_info"),
+    ("what time is it", "datetime_info"),
+    ("what's today's date?", "datetime_info"),
+    ("what day is today", "datetime_info"),
+    # Pedidos com texto extra, compostos ou de escrita ficam com o orquestrador
+    ("liste minhas tarefas de trabalho", None),
+    ("crie uma tarefa para comprar pão", None),
+    ("liste minhas tarefas e rotinas", None),
+    ("apague todas as minhas rotinas", None),
+    ("show my tasks for tomorrow", None),
+    ("que horas são em Tóquio", None),
+    ("qual rotina devo fazer hoje", None),
+    ("", None),
+]
+
+
+async def answer(match):
+    return "ok"
+
+
+def default_commands():
+    # Os mesmos padrões do atalho padrão, sem acessar os caches e as APIs
+    return CommandMatcher([
+        Command("list_tasks", TASK_PATTERNS, answer),
+        Command("list_routines", ROUTINE_PATTERNS, answer),
+        Command("datetime_info", DATETIME_PATTERNS, answer),
+    ])
+
+
+@pytest.mark.parametrize("text, expected", COMMAND_CASES)
+def test_command_matcher_patterns(text, expected):
+    matched = default_commands().match(text)
+    assert (matched[0].name if matched else None) == expected
+
+
+def test_command_failures_fall_through():
+    async def failing(match):
+        raise RuntimeError("API fora do ar")
+    
+    async def empty(match):
+        return ""
+    
+    matcher = CommandMatcher([Command("list_tasks", TASK_PATTERNS, failing), Command("list_routines", ROUTINE_PATTERNS, empty)])
+    assert asyncio.run(matcher.dispatch("liste minhas tarefas")) is None
+    assert asyncio.run(matcher.dispatch("liste minhas rotinas")) is None
+    assert asyncio.run(matcher.dispatch("crie uma rotina")) is None
+    stats = matcher.stats()
+    assert (stats["messages"], stats["hits"], stats["errors"]) == (3, 0, 1)
+
+
+if __name__ == "__main__":
+    for query, expected in NAME_CASES:
+        test_name_index_search(query, expected)
+    test_name_index_exact_and_ambiguous_scores()
+    for text, expected in COMMAND_CASES:
+        test_command_matcher_patterns(text, expected)
+    test_command_failures_fall_through()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from utils.websocket_utils import OutboundWriter
+
+
+def progress(*kinds):
+    """Frame progress com um evento de cada tipo pedido."""
+    events = [
+        {"seq": seq, "kind": kind, "tool": "get_tasks", "message": kind, "elapsed_ms": 0.0}
+        for seq, kind in enumerate(kinds, start=1)
+    ]
+    return {"type": "progress", "content": "", "format": "text", "events": events}
+
+
+def message(content):
+    return {"type": "message", "content": content, "format": "markdown"}
+
+
+def queued(writer):
+    # A tarefa de envio não é iniciada: o conteúdo da fila é o que um cliente parado ainda não recebeu
+    return [frame for frame, _ in writer._queue]
+
+
+def test_merge_consecutive_progress():
+    writer = OutboundWriter(1, websocket=None, max_queue=4)
+    assert writer.put(progress("start"))
+    assert writer.put(progress("info", "info"))
+    assert writer.put(progress("end"))
+    
+    frames = queued(writer)
+    assert len(frames) == 1
+    assert [event["kind"] for event in frames[0]["events"]] == ["start", "info", "info", "end"]
+    assert writer.merged == 2
+
+
+def test_info_progress_dropped_before_final_message():
+    writer = OutboundWriter(1, websocket=None, max_queue=4)
+    writer.put(progress("info"))
+    writer.put(message("a"))
+    writer.put(progress("info"))
+    writer.put(message("b"))
+    
+    # Fila cheia: a resposta final entra no lugar do lote de progresso mais antigo
+    assert writer.put(message("final"))
+    frames = queued(writer)
+    assert frames[-1]["content"] == "final"
+    assert [frame["type"] for frame in frames] == ["message", "progress", "message", "message"]
+    assert writer.dropped == 1
+
+
+def test_essential_progress_never_dropped():
+    writer = OutboundWriter(1, websocket=None, max_queue=2)
+    writer.put(message("a"))
+    writer.put(message("b"))
+    
+    # Sem progresso descartável na fila, um lote só com info é recusado...
+    assert not writer.put(progress("info"))
+    # ...mas start/end passam, mesmo acima do limite
+    assert writer.put(progress("start", "info"))
+    assert queued(writer)[-1]["events"][0]["kind"] == "start"
+    assert writer.dropped == 1
+
+
+if __name__ == "__main__":
+    test_merge_consecutive_progress()
+    test_info_progress_dropped_before_final_message()
+    test_essential_progress_never_dropped()
@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.session import AgentSession
+from utils.session_pool import SessionPool
+
+
+def session(client_id):
+    """Sessão com um turno completo e um resumo, como após algumas mensagens."""
+    session = AgentSession(client_id, system_prompt="prompt do sistema")
+    session.conversation_history.append(HumanMessage(content=f"crie a tarefa {client_id}"))
+    session.conversation_history.append(AIMessage(content=f"Tarefa {client_id} criada com sucesso!"))
+    session.conversation_history.summary = f"resumo {client_id}"
+    session.last_text = f"última mensagem {client_id}"
+    return session
+
+
+def test_eviction_skips_pinned_and_rehydrates_from_disk(tmp_path):
+    pool = SessionPool(capacity=2, storage_dir=str(tmp_path))
+    original = session(1)
+    pool.add(original)
+    pool.pin(1)
+    pool.add(session(2))
+    pool.add(session(3))
+    
+    # A sessão 1 é a menos usada, mas tem um turno em andamento: a 2 é hibernada no lugar dela
+    assert list(pool._sessions) == [1, 3]
+    assert 2 in pool and os.path.exists(pool._path(2))
+    
+    pool.unpin(1)
+    pool.add(session(4))
+    assert list(pool._sessions) == [3, 4]
+    assert pool.stats()["hibernated"] == 2
+    assert pool.evictions == 2
+    
+    # A reidratação devolve histórico, resumo e last_text, e remove o arquivo
+    restored = pool.get(1)
+    assert restored is not original
+    assert [message.content for message in restored.conversation_history] == [message.content for message in original.conversation_history]
+    assert [type(message) for message in restored.conversation_history] == [type(message) for message in original.conversation_history]
+    assert restored.conversation_history.summary == "resumo 1"
+    assert restored.last_text == "última mensagem 1"
+    assert not os.path.exists(pool._path(1))
+    assert pool.rehydrations == 1
+    
+    # Reidratada, ela volta ao pool como a mais recente e despeja a menos usada
+    assert list(pool._sessions) == [4, 1]
+    assert pool.get(3).last_text == "última mensagem 3"
+
+
+def test_pinned_session_is_not_hibernated(tmp_path):
+    pool = SessionPool(capacity=1, storage_dir=str(tmp_path))
+    pool.add(session(1))
+    pool.pin(1)
+    assert not pool.hibernate(1)
+    assert pool.get(1) is not None and pool.hibernations == 0
+    
+    pool.unpin(1)
+    assert pool.hibernate(1)
+    assert len(pool) == 0 and 1 in pool
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        test_eviction_skips_pinned_and_rehydrates_from_disk(Path(directory) / "a")
+        test_pinned_session_is_not_hibernated(Path(directory) / "b")
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from utils.snapshot_cache import SnapshotCache
+
+
+class Loader:
+    """Loader controlado pelo teste: cada chamada aguarda `release` e devolve o número da busca."""
+    
+    def __init__(self, error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error = error
+    
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"valor {call}"
+
+
+def test_concurrent_gets_share_one_load():
+    async def scenario():
+        loader = Loader()
+        cache = SnapshotCache(loader, ttl=60)
+        waiters = [asyncio.ensure_future(cache.get()) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters)
+        
+        # Dentro do TTL, o valor vem do cache
+        assert await cache.get() == "valor 1"
+        return loader, cache, results
+    
+    loader, cache, results = asyncio.run(scenario())
+    assert results == ["valor 1"] * 5
+    assert loader.calls == 1
+    assert (cache.fetches, cache.coalesced, cache.hits) == (1, 4, 1)
+
+
+def test_expired_value_is_reloaded():
+    async def scenario():
+        loader = Loader()
+        loader.release.set()
+        cache = SnapshotCache(loader, ttl=0)
+        return await cache.get(), await cache.get(), loader
+    
+    first, second, loader = asyncio.run(scenario())
+    assert (first, second) == ("valor 1", "valor 2")
+    assert loader.calls == 2
+
+
+def test_invalidate_during_load_discards_stale_value():
+    async def scenario():
+        loader = Loader()
+        cache = SnapshotCache(loader, ttl=60)
+        stale = asyncio.ensure_future(cache.get())
+        await asyncio.sleep(0)
+        
+        # Uma escrita acontece enquanto a busca está em andamento
+        cache.invalidate()
+        loader.release.set()
+        # Quem já aguardava recebe o resultado da própria busca...
+        assert await stale == "valor 1"
+        # ...mas ele não fica no cache: a próxima leitura busca de novo
+        assert await cache.get() == "valor 2"
+        assert await cache.get() == "valor 2"
+        return loader
+    
+    loader = asyncio.run(scenario())
+    assert loader.calls == 2
+
+
+def test_loader_error_reaches_every_waiter():
+    async def scenario():
+        loader = Loader(error=RuntimeError("API fora do ar"))
+        cache = SnapshotCache(loader, ttl=60)
+        waiters = [asyncio.ensure_future(cache.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        
+        # O erro não fica em cache: a próxima leitura tenta de novo
+        loader.error = None
+        assert await cache.get() == "valor 2"
+        return loader, cache, results
+    
+    loader, cache, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) and str(result) == "API fora do ar" for result in results)
+    assert loader.calls == 2
+    assert cache.errors == 1
+
+
+if __name__ == "__main__":
+    test_concurrent_gets_share_one_load()
+    test_expired_value_is_reloaded()
+    test_invalidate_during_load_discards_stale_value()
+    test_loader_error_reaches_every_waiter()
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# As configurações exigem estas variáveis, mas os testes não acessam nenhuma API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test")
+
+from utils.ws_codec import FRAME_RAW, FRAME_ZLIB, JsonCodec, MsgpackCodec, msgpack, negotiate_codec
+
+needs_msgpack = pytest.mark.skipif(msgpack is None, reason="msgpack não instalado")
+
+SHORT = {"type": "message", "content": "Tarefa criada com sucesso!", "format": "markdown"}
+# Listagem grande e repetitiva, que a compressão reduz bem
+LONG = {"type": "message", "content": "- Rotina: exercícios matinais às 07:00\n" * 200, "format": "markdown"}
+
+
+def test_json_round_trip():
+    codec = JsonCodec()
+    for frame in (SHORT, LONG):
+        assert codec.decode(codec.encode(frame)) == frame
+
+
+@needs_msgpack
+def test_msgpack_round_trip_without_flag():
+    codec = MsgpackCodec()
+    payload = codec.encode(LONG)
+    # Sem compressão negociada, o frame é MessagePack puro
+    assert msgpack.unpackb(payload, raw=False) == LONG
+    assert codec.decode(payload) == LONG
+
+
+@needs_msgpack
+def test_msgpack_deflate_flags_each_frame():
+    codec = MsgpackCodec(compress_threshold=1024)
+    short, long = codec.encode(SHORT), codec.encode(LONG)
+    
+    # Abaixo do limite, sem compressão; acima, comprimido e bem menor que o MessagePack puro
+    assert short[0] == FRAME_RAW
+    assert long[0] == FRAME_ZLIB
+    assert len(long) < len(MsgpackCodec().encode(LONG)) // 4
+    assert codec.decode(short) == SHORT
+    assert codec.decode(long) == LONG
+
+
+@needs_msgpack
+def test_msgpack_deflate_unknown_flag_is_rejected():
+    codec = MsgpackCodec(compress_threshold=1024)
+    with pytest.raises(ValueError):
+        codec.decode(b"\x78" + MsgpackCodec().encode(SHORT))
+
+
+@needs_msgpack
+def test_text_frames_are_always_json():
+    # Um frame de texto que começa com "x" não é confundido com zlib
+    codec = MsgpackCodec(compress_threshold=1)
+    assert codec.decode('{"text": "x", "format": "text"}') == {"text": "x", "format": "text"}
+    assert codec.decode(b"\x00" + MsgpackCodec().encode({"text": "xyz"})) == {"text": "xyz"}
+
+
+def test_negotiation_follows_client_preference():
+    assert negotiate_codec([])[0] is None
+    assert negotiate_codec(["outro", "json"])[0] == "json"
+    if msgpack is not None:
+        subprotocol, codec = negotiate_codec(["msgpack.deflate", "json"], compress_threshold=512)
+        assert subprotocol == "msgpack.deflate" and codec.compress_threshold == 512
+        assert negotiate_codec(["msgpack", "msgpack.deflate"])[1].compress_threshold is None
+
+
+if __name__ == "__main__":
+    test_json_round_trip()
+    test_msgpack_round_trip_without_flag()
+    test_msgpack_deflate_flags_each_frame()
+    test_msgpack_deflate_unknown_flag_is_rejected()
+    test_text_frames_are_always_json()
+    test_negotiation_follows_client_preference()
@@ -1,52 +1,112 @@
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import WebSocket
+from langchain_core.messages import AIMessage, HumanMessage
 from agents.orchestrator_agent import OrchestratorAgent
+from agents.blueprints import get_orchestrator_agent, build_agent_blueprints
+from agents.session import AgentSession, current_session
+from agents.specialized.task_agent import task_api_client, task_context, task_snapshot
+from agents.executor import TOOL_VALIDATION_STATS
+from agents.fast_path import CommandMatcher, build_default_matcher
+from agents.intent_classifier import get_intent_router
+from agents.passthrough import PASSTHROUGH_STATS
+from agents.prefetch import PREFETCH_STATS
+from config.settings import get_settings
+from utils.response_formatter import format_response
+from utils.session_pool import SessionPool
 from utils.websocket_utils import send_websocket_message
 
+# Obter configurações
+settings = get_settings()
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 class AgentsManager:
     def __init__(self):
-        self.agents: Dict[int, OrchestratorAgent] = {}
-        self.last_texts: Dict[int, str] = {}
+        self.sessions = SessionPool(
+            capacity=settings.session_pool_capacity,
+            storage_dir=settings.session_storage_dir or None
+        )
+        # Comandos comuns atendidos localmente, sem passar pelo LLM
+        self.command_matcher: CommandMatcher = build_default_matcher()
+    
+    @property
+    def orchestrator(self) -> OrchestratorAgent:
+        """Agente orquestrador compartilhado por todas as sessões."""
+        return get_orchestrator_agent()
+    
+    def initialize(self) -> None:
+        """Constrói os agentes compartilhados antes da primeira conexão."""
+        build_agent_blueprints()
     
     def create_agent(self, client_id: int) -> None:
-        """Cria um novo agente para o cliente."""
-        self.agents[client_id] = OrchestratorAgent(client_id=client_id)
-        self.last_texts[client_id] = ""
+        """Cria a sessão do agente para o cliente."""
+        self.sessions.add(self.orchestrator.new_session(client_id))
         logger.info(f"Agente criado para o cliente: {client_id}")
     
     def remove_agent(self, client_id: int) -> None:
-        """Remove o agente do cliente."""
-        if client_id in self.agents:
-            del self.agents[client_id]
-        if client_id in self.last_texts:
-            del self.last_texts[client_id]
+        """Remove a sessão do agente do cliente."""
+        self.sessions.remove(client_id)
         logger.info(f"Agente removido para o cliente: {client_id}")
     
-    async def process_message(self, client_id: int, message: str, websocket: WebSocket, response_format: str = "markdown") -> None:
+    def hibernate_agent(self, client_id: int) -> None:
+        """Hiberna a sessão de um cliente ocioso, liberando a memória até a próxima mensagem."""
+        if self.sessions.hibernate(client_id):
+            logger.info(f"Agente hibernado para o cliente: {client_id}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do pool de sessões e dos caches compartilhados."""
+        stats = self.sessions.stats()
+        stats["task_cache"] = task_snapshot.stats()
+        stats["routine_replica"] = self.orchestrator.routine_agent.routine_replica.stats()
+        stats["routine_api"] = self.orchestrator.routine_agent.api_client.metrics.stats()
+        stats["task_api"] = task_api_client.metrics.stats()
+        stats["prefetch"] = dict(PREFETCH_STATS)
+        stats["context"] = {
+            "tasks": task_context.stats(),
+            "routines": self.orchestrator.routine_agent.context_selector.stats(),
+        }
+        stats["passthrough"] = dict(PASSTHROUGH_STATS)
+        stats["tool_validation"] = {**TOOL_VALIDATION_STATS, "by_tool": dict(TOOL_VALIDATION_STATS["by_tool"])}
+        stats["fast_path"] = self.command_matcher.stats()
+        if settings.intent_router_enabled:
+            stats["intent_router"] = get_intent_router().stats()
+        return stats
+    
+    async def process_message(self, client_id: int, message: str, websocket: WebSocket, response_format: str = "markdown", stream: bool = False) -> None:
         """Processa uma mensagem usando o agente do cliente."""
-        if client_id not in self.agents:
+        session = self.sessions.get(client_id)
+        if session is None:
             logger.error(f"Cliente {client_id} não tem um agente associado")
             return
         
         current_text = message
-        last_text = self.last_texts[client_id]
+        last_text = session.last_text
+        session.touch()
         
+        # Torna a sessão visível para o orquestrador, os agentes especializados e as ferramentas
+        token = current_session.set(session)
+        self.sessions.pin(client_id)
         try:
-            # Obter resposta do agente orquestrador com o formato especificado
-            response_text = await self.agents[client_id].process_message(
-                current_text, 
-                response_format,
-                websocket
-            )
+            # Comandos reconhecidos localmente dispensam o orquestrador; na dúvida, seguem para ele
+            response_text = await self._try_fast_path(session, current_text)
+            if response_text is None:
+                # Obter resposta do agente orquestrador com o formato especificado
+                response_text = await self.orchestrator.process_message(
+                    current_text, 
+                    response_format,
+                    websocket,
+                    stream=stream
+                )
             
             logger.info(f"Resposta: {response_text}")
             
-            # Enviar a resposta de volta para o frontend
+            # O histórico guarda o markdown gerado; o formato pedido pelo cliente é aplicado só na saída
+            response_text = format_response(response_text, response_format)
+            
+            # Enviar a resposta de volta para o frontend (no streaming, é o frame final do turno)
             await send_websocket_message(
                 response_text, 
                 client_id, 
@@ -55,7 +115,7 @@ class AgentsManager:
             )
             
             # Atualizar o último texto
-            self.last_texts[client_id] = current_text
+            session.last_text = current_text
         except Exception as e:
             logger.error(f"Erro ao processar com o agente: {e}")
             await send_websocket_message(
@@ -63,6 +123,22 @@ class AgentsManager:
                 client_id, 
                 "error"
             )
+        finally:
+            self.sessions.unpin(client_id)
+            current_session.reset(token)
+
+    async def _try_fast_path(self, session: AgentSession, message: str) -> Optional[str]:
+        """Responde pelo atalho de comandos, registrando a troca no histórico da sessão."""
+        if not settings.fast_path_enabled:
+            return None
+        response_text = await self.command_matcher.dispatch(message)
+        if response_text is None:
+            return None
+        
+        session.conversation_history.append(HumanMessage(content=message))
+        session.conversation_history.append(AIMessage(content=response_text))
+        await send_websocket_message("Finalizando processamento da mensagem", session.client_id, "agent_response_end")
+        return response_text
 
 # Instância global do gerenciador de agentes
 agents_manager = AgentsManager() 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.websocket_utils import send_websocket_message
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class ClientConnection:
+    """
+    Fila de entrada de uma conexão WebSocket.
+    
+    O loop de leitura do endpoint só enfileira as mensagens (submit) e continua lendo o socket;
+    uma tarefa de trabalho por conexão as processa uma a uma. Assim, sinais de idle e pedidos
+    de cancelamento são atendidos mesmo durante um turno do agente. A fila é limitada: quando
+    cheia, a mensagem é recusada e o cliente é avisado. cancel_turn() interrompe o turno em
+    andamento (e as chamadas HTTP e ao LLM que ele aguarda); close() cancela tudo ao desconectar.
+    """
+    
+    def __init__(self, client_id: int, handler: Callable[..., Awaitable[Any]], queue_size: int = 8):
+        self.client_id = client_id
+        self.handler = handler
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        
+        self._worker: Optional[asyncio.Task] = None
+        self._turn: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # Contadores expostos por stats()
+        self.received = 0
+        self.rejected = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.abandoned = 0
+    
+    def start(self) -> None:
+        """Inicia a tarefa que consome a fila de entrada."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+    
+    def submit(self, *args: Any) -> bool:
+        """Enfileira uma mensagem para o handler; False se a fila estiver cheia ou a conexão fechada."""
+        if self._closed:
+            return False
+        try:
+            self.queue.put_nowait(args)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"ClientConnection: Fila de entrada cheia para o cliente {self.client_id}, mensagem recusada")
+            return False
+        self.received += 1
+        return True
+    
+    def cancel_turn(self) -> bool:
+        """Cancela o turno em andamento, se houver; as mensagens já enfileiradas seguem normalmente."""
+        if self._turn is None or self._turn.done():
+            return False
+        self._turn.cancel()
+        return True
+    
+    def close(self) -> None:
+        """Cancela o turno em andamento e descarta as mensagens pendentes (ex.: o socket fechou)."""
+        if self._closed:
+            return
+        self._closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.abandoned += 1
+        if self.cancel_turn():
+            self.abandoned += 1
+        if self._worker is not None:
+            self._worker.cancel()
+    
+    @property
+    def busy(self) -> bool:
+        return self._turn is not None and not self._turn.done()
+    
+    async def _run(self) -> None:
+        while not self._closed:
+            args = await self.queue.get()
+            start_time = time.time()
+            self._turn = asyncio.create_task(self.handler(*args))
+            try:
+                await asyncio.shield(self._turn)
+                self.completed += 1
+            except asyncio.CancelledError:
+                if self._closed:
+                    raise
+                # Só o turno foi cancelado (pedido do cliente): a conexão continua
+                self.cancelled += 1
+                logger.info(f"ClientConnection: Turno do cliente {self.client_id} cancelado após {time.time() - start_time:.2f}s")
+                await send_websocket_message("Processamento cancelado", self.client_id, "agent_response_end")
+            except Exception as e:
+                logger.error(f"ClientConnection: Erro no turno do cliente {self.client_id}: {str(e)}")
+            finally:
+                self._turn = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna a profundidade da fila e os contadores da conexão."""
+        return {
+            "queued": self.queue.qsize(),
+            "busy": self.busy,
+            "received": self.received,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "abandoned": self.abandoned,
+        }
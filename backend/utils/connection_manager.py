@@ -2,41 +2,110 @@ import json
 import logging
 from typing import Dict, Any
 from fastapi import WebSocket
+from config.settings import get_settings
 from utils.agents_manager import agents_manager
-from utils.websocket_utils import register_websocket, unregister_websocket, get_websocket_connection, get_active_connections
+from utils.client_connection import ClientConnection
+from utils.event_bus import client_id_for
+from utils.ws_codec import negotiate_codec
+from utils.websocket_utils import register_websocket, unregister_websocket, get_websocket_connection, get_active_connections, get_outbound_stats, send_websocket_message
+
+# Obter configurações
+settings = get_settings()
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 # Gerenciador de conexões WebSocket
-class ConnectionManager:    
+class ConnectionManager:
+    def __init__(self):
+        # Fila de entrada e turno em andamento de cada conexão
+        self.connections: Dict[int, ClientConnection] = {}
+    
     async def connect(self, websocket: WebSocket):
-        """Aceita uma nova conexão WebSocket."""
-        await websocket.accept()
-        client_id = id(websocket)
+        """
+        Aceita uma nova conexão WebSocket, negociando a codificação dos frames.
+        
+        O cliente pode oferecer os subprotocolos "msgpack.deflate", "msgpack" ou "json"
+        (Sec-WebSocket-Protocol); sem oferta, os frames continuam em texto JSON.
         
-        register_websocket(client_id, websocket)
+        Returns:
+            O codec da conexão, usado também para decodificar os frames recebidos
+        """
+        subprotocol, codec = negotiate_codec(
+            websocket.scope.get("subprotocols", []),
+            compress_threshold=settings.ws_compress_threshold,
+            compress_level=settings.ws_compress_level
+        )
+        await websocket.accept(subprotocol=subprotocol)
+        client_id = client_id_for(websocket)
+        
+        register_websocket(
+            client_id,
+            websocket,
+            max_queue=settings.ws_outbound_queue_size,
+            progress_window=settings.ws_progress_window,
+            codec=codec
+        )
         agents_manager.create_agent(client_id)
-        logger.info(f"Cliente conectado: {client_id}")
+        connection = ClientConnection(client_id, self.process_message, queue_size=settings.ws_inbound_queue_size)
+        connection.start()
+        self.connections[client_id] = connection
+        logger.info(f"Cliente conectado: {client_id} (codificação: {codec.name})")
+        return codec
     
     async def active_connections(self):
         """Retorna todas as conexões ativas."""
         return get_active_connections()
     
     def disconnect(self, client_id: int):
-        """Remove uma conexão WebSocket."""
+        """Remove uma conexão WebSocket, cancelando o turno em andamento e as mensagens pendentes."""
+        connection = self.connections.pop(client_id, None)
+        if connection is not None:
+            connection.close()
         unregister_websocket(client_id)
         agents_manager.remove_agent(client_id)
         logger.info(f"Cliente desconectado: {client_id}")
     
-    async def process_message(self, client_id: int, message: str, response_format: str = "markdown"):
+    def hibernate(self, client_id: int):
+        """Hiberna a sessão de um cliente que sinalizou estar ocioso."""
+        agents_manager.hibernate_agent(client_id)
+    
+    async def submit(self, client_id: int, message: str, response_format: str = "markdown", stream: bool = False):
+        """Enfileira uma mensagem do cliente sem bloquear a leitura do socket."""
+        connection = self.connections.get(client_id)
+        if connection is None:
+            logger.error(f"Cliente {client_id} não está conectado")
+            return
+        if not connection.submit(client_id, message, response_format, stream):
+            await send_websocket_message(
+                "Há mensagens demais aguardando processamento. Aguarde a resposta atual.",
+                client_id,
+                "error"
+            )
+    
+    def cancel(self, client_id: int) -> bool:
+        """Cancela o turno em andamento do cliente (frame "cancel")."""
+        connection = self.connections.get(client_id)
+        if connection is None or not connection.cancel_turn():
+            return False
+        logger.info(f"Turno cancelado a pedido do cliente: {client_id}")
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna as filas de entrada e de saída de cada conexão."""
+        return {
+            str(client_id): {"inbound": connection.stats(), "outbound": get_outbound_stats(client_id)}
+            for client_id, connection in self.connections.items()
+        }
+    
+    async def process_message(self, client_id: int, message: str, response_format: str = "markdown", stream: bool = False):
         """Processa uma mensagem recebida do cliente."""
         websocket = get_websocket_connection(client_id)
         if not websocket:
             logger.error(f"Cliente {client_id} não está conectado")
             return
         
-        await agents_manager.process_message(client_id, message, websocket, response_format)
+        await agents_manager.process_message(client_id, message, websocket, response_format, stream)
 
 # Instância global do gerenciador de conexões
 connection_manager = ConnectionManager() 
\ No newline at end of file
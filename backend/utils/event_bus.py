@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket
+from config.settings import get_settings
+
+# Obter configurações
+settings = get_settings()
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo de uma linha do protocolo do hub (um evento com a resposta final completa)
+MAX_EVENT_SIZE = 16 * 1024 * 1024
+
+# Tentativas de conexão ao hub na inicialização de um worker (o hub pode subir logo depois)
+CONNECT_ATTEMPTS = 20
+CONNECT_BACKOFF = 0.25
+
+Deliver = Callable[[int, Dict[str, Any]], Awaitable[bool]]
+
+
+def client_id_for(websocket: WebSocket) -> int:
+    """
+    Identificador de uma conexão, único entre os workers.
+    
+    id(websocket) só é único dentro de um processo (workers iguais repetem os endereços),
+    então o PID do worker ocupa os bits altos.
+    """
+    return (os.getpid() << 48) | id(websocket)
+
+
+class LocalEventBus:
+    """
+    Registro de conexões e barramento de eventos de um único processo.
+    
+    Cada worker registra aqui as conexões cujo socket ele mantém; publish() entrega o evento
+    (os argumentos de um frame) a quem mantém o socket do cliente. Neste barramento só há as
+    conexões locais: um cliente desconhecido é contado como não entregue.
+    """
+    
+    name = "local"
+    
+    def __init__(self):
+        self.local: Set[int] = set()
+        self._deliver: Optional[Deliver] = None
+        
+        # Contadores expostos por stats()
+        self.published = 0
+        self.delivered = 0
+        self.undeliverable = 0
+    
+    async def start(self, deliver: Deliver) -> None:
+        """Define a função que entrega um evento a uma conexão local."""
+        self._deliver = deliver
+    
+    async def close(self) -> None:
+        self.local.clear()
+    
+    def register(self, client_id: int) -> None:
+        """Registra uma conexão mantida por este processo."""
+        self.local.add(client_id)
+    
+    def unregister(self, client_id: int) -> None:
+        self.local.discard(client_id)
+    
+    def owns(self, client_id: int) -> bool:
+        return client_id in self.local
+    
+    async def publish(self, client_id: int, event: Dict[str, Any]) -> bool:
+        """Entrega um evento ao cliente; False se nenhum processo conhecido mantém a conexão."""
+        self.published += 1
+        if client_id in self.local and self._deliver is not None:
+            return await self._deliver_local(client_id, event)
+        self.undeliverable += 1
+        logger.error(f"{type(self).__name__}: Cliente {client_id} não está conectado a nenhum worker")
+        return False
+    
+    async def _deliver_local(self, client_id: int, event: Dict[str, Any]) -> bool:
+        delivered = await self._deliver(client_id, event)
+        if delivered:
+            self.delivered += 1
+        return delivered
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o tipo do barramento, as conexões locais e os contadores de entrega."""
+        return {
+            "bus": self.name,
+            "worker": os.getpid(),
+            "local_connections": len(self.local),
+            "published": self.published,
+            "delivered": self.delivered,
+            "undeliverable": self.undeliverable,
+        }
+
+
+class UnixSocketEventBus(LocalEventBus):
+    """
+    Barramento entre workers, por meio de um hub em socket Unix (EventHub).
+    
+    O worker informa ao hub as conexões que mantém; eventos para um cliente de outro worker
+    são enviados ao hub, que os repassa ao dono do socket. Eventos para conexões locais não
+    passam pelo hub. O protocolo é uma linha JSON por mensagem. Se o hub cair, o worker tenta
+    reconectar e registra de novo as suas conexões.
+    """
+    
+    name = "unix"
+    
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # Contadores expostos por stats()
+        self.forwarded = 0
+        self.received = 0
+        self.dropped = 0
+        self.reconnects = 0
+    
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        await self._connect()
+    
+    async def close(self) -> None:
+        self._closed = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        await super().close()
+    
+    async def _connect(self) -> None:
+        for attempt in range(CONNECT_ATTEMPTS):
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_EVENT_SIZE)
+                break
+            except OSError as e:
+                if attempt == CONNECT_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"UnixSocketEventBus: Hub indisponível em {self.path} ({e}), nova tentativa")
+                await asyncio.sleep(CONNECT_BACKOFF)
+        self._writer = writer
+        self._send({"op": "hello", "worker": os.getpid()})
+        for client_id in self.local:
+            self._send({"op": "register", "client_id": client_id})
+        self._reader_task = asyncio.create_task(self._read(reader))
+        logger.info(f"UnixSocketEventBus: Worker {os.getpid()} conectado ao hub em {self.path}")
+    
+    def _send(self, message: Dict[str, Any]) -> bool:
+        if self._writer is None or self._writer.is_closing():
+            self.dropped += 1
+            return False
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        return True
+    
+    def register(self, client_id: int) -> None:
+        super().register(client_id)
+        self._send({"op": "register", "client_id": client_id})
+    
+    def unregister(self, client_id: int) -> None:
+        super().unregister(client_id)
+        self._send({"op": "unregister", "client_id": client_id})
+    
+    async def publish(self, client_id: int, event: Dict[str, Any]) -> bool:
+        """Entrega localmente ou envia ao hub; para outro worker, True significa apenas que o hub recebeu."""
+        self.published += 1
+        if client_id in self.local:
+            return await self._deliver_local(client_id, event)
+        if not self._send({"op": "publish", "client_id": client_id, "event": event}):
+            logger.error(f"UnixSocketEventBus: Sem conexão com o hub, evento para o cliente {client_id} descartado")
+            return False
+        self.forwarded += 1
+        await self._writer.drain()
+        return True
+    
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("op") != "deliver":
+                    continue
+                self.received += 1
+                client_id = message["client_id"]
+                # A conexão pode ter fechado depois que o hub roteou o evento: não republicar
+                if client_id not in self.local:
+                    self.undeliverable += 1
+                    continue
+                await self._deliver_local(client_id, message["event"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"UnixSocketEventBus: Erro ao ler do hub: {e}")
+        
+        if self._closed:
+            return
+        logger.warning("UnixSocketEventBus: Conexão com o hub perdida, reconectando")
+        self._writer = None
+        self.reconnects += 1
+        try:
+            await self._connect()
+        except OSError as e:
+            logger.error(f"UnixSocketEventBus: Não foi possível reconectar ao hub: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "hub": self.path,
+            "hub_connected": self._writer is not None and not self._writer.is_closing(),
+            "forwarded": self.forwarded,
+            "received": self.received,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        })
+        return stats
+
+
+class EventHub:
+    """
+    Hub dos workers: mantém o registro global (cliente -> worker) e roteia os eventos publicados.
+    
+    Roda em um processo próprio (start_event_hub), iniciado pelo main.py antes dos workers.
+    Quando um worker se desconecta, as conexões dele saem do registro.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.owners: Dict[int, asyncio.StreamWriter] = {}
+        
+        # Contadores do roteamento
+        self.routed = 0
+        self.undeliverable = 0
+    
+    async def serve(self) -> None:
+        if os.path.exists(self.path):
+            # Socket que sobrou de uma execução anterior
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_EVENT_SIZE)
+        logger.info(f"EventHub: Aguardando workers em {self.path}")
+        async with server:
+            await server.serve_forever()
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        worker = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                op = message.get("op")
+                if op == "hello":
+                    worker = message.get("worker")
+                    logger.info(f"EventHub: Worker {worker} conectado")
+                elif op == "register":
+                    self.owners[message["client_id"]] = writer
+                elif op == "unregister":
+                    if self.owners.get(message["client_id"]) is writer:
+                        del self.owners[message["client_id"]]
+                elif op == "publish":
+                    await self._route(message["client_id"], message["event"])
+        except Exception as e:
+            logger.error(f"EventHub: Erro na conexão com o worker {worker}: {e}")
+        finally:
+            for client_id in [client_id for client_id, owner in self.owners.items() if owner is writer]:
+                del self.owners[client_id]
+            writer.close()
+            logger.info(f"EventHub: Worker {worker} desconectado")
+    
+    async def _route(self, client_id: int, event: Dict[str, Any]) -> None:
+        owner = self.owners.get(client_id)
+        if owner is None or owner.is_closing():
+            self.undeliverable += 1
+            logger.warning(f"EventHub: Cliente {client_id} não está registrado em nenhum worker")
+            return
+        owner.write(json.dumps({"op": "deliver", "client_id": client_id, "event": event}).encode() + b"\n")
+        await owner.drain()
+        self.routed += 1
+
+
+def run_event_hub(path: str) -> None:
+    """Executa o hub até o processo ser encerrado (o Ctrl+C é tratado pelo processo principal)."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(EventHub(path).serve())
+
+
+def start_event_hub(path: str) -> multiprocessing.Process:
+    """Inicia o hub em um processo filho, encerrado junto com o processo principal."""
+    process = multiprocessing.Process(target=run_event_hub, args=(path,), name="event-hub", daemon=True)
+    process.start()
+    return process
+
+
+def create_event_bus(socket_path: str = ""):
+    """Barramento entre workers se houver um hub configurado; senão, apenas o processo atual."""
+    if socket_path:
+        return UnixSocketEventBus(socket_path)
+    return LocalEventBus()
+
+# Instância global do barramento de eventos deste worker
+event_bus = create_event_bus(settings.event_bus_socket)
+
+
+if __name__ == "__main__":
+    # Hub avulso, para workers iniciados fora do main.py (ex.: uvicorn --workers)
+    run_event_hub(sys.argv[1] if len(sys.argv) > 1 else os.environ["EVENT_BUS_SOCKET"])
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import httpx
+from config.settings import get_settings
+
+# Obter configurações
+settings = get_settings()
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Só estes métodos são repetidos automaticamente: repeti-los não duplica efeitos na API
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Respostas que indicam falha transitória do servidor
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+@lru_cache(maxsize=None)
+def get_http_pool() -> httpx.AsyncClient:
+    """Retorna o pool HTTP assíncrono (keep-alive) compartilhado pelos clientes das APIs de tarefas e rotinas."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.api_read_timeout, connect=settings.api_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.api_max_connections,
+            max_keepalive_connections=settings.api_max_keepalive_connections,
+        ),
+    )
+
+async def close_http_pool() -> None:
+    """Fecha o pool HTTP compartilhado, se tiver sido criado."""
+    if get_http_pool.cache_info().currsize:
+        await get_http_pool().aclose()
+        get_http_pool.cache_clear()
+
+class LatencyMetrics:
+    """Latência, erros e repetições por endpoint, para os clientes das APIs."""
+    
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool, retries: int) -> None:
+        entry = self._endpoints.get(endpoint)
+        if entry is None:
+            entry = self._endpoints[endpoint] = {
+                "count": 0,
+                "errors": 0,
+                "retries": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "samples": deque(maxlen=self.window),
+            }
+        entry["count"] += 1
+        entry["errors"] += 0 if ok else 1
+        entry["retries"] += retries
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["samples"].append(elapsed_ms)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna as métricas de cada endpoint (p50/p95 sobre as últimas chamadas)."""
+        result = {}
+        for endpoint, entry in self._endpoints.items():
+            samples = sorted(entry["samples"])
+            result[endpoint] = {
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "retries": entry["retries"],
+                "avg_ms": entry["total_ms"] / entry["count"],
+                "p50_ms": samples[len(samples) // 2],
+                "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                "max_ms": entry["max_ms"],
+            }
+        return result
+
+async def request_with_retry(
+    method: str,
+    url: str,
+    metrics: Optional[LatencyMetrics] = None,
+    endpoint: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    **kwargs
+) -> httpx.Response:
+    """
+    Faz uma requisição pelo pool compartilhado.
+    
+    Métodos idempotentes são repetidos em erros de rede/timeout e em respostas 429/502/503/504,
+    com espera exponencial e jitter. Erros de rede da última tentativa são propagados.
+    """
+    method = method.upper()
+    max_retries = settings.api_max_retries if max_retries is None else max_retries
+    attempts = 1 + (max_retries if method in IDEMPOTENT_METHODS else 0)
+    endpoint = endpoint or f"{method} {url}"
+    
+    start_time = time.perf_counter()
+    response = None
+    ok = False
+    attempt = 0
+    try:
+        for attempt in range(attempts):
+            if attempt:
+                # Full jitter: espera aleatória até o teto exponencial
+                await asyncio.sleep(random.uniform(0, settings.api_retry_backoff * (2 ** attempt)))
+                logger.warning(f"HTTP: Repetindo {endpoint} (tentativa {attempt + 1}/{attempts})")
+            try:
+                response = await get_http_pool().request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == attempts - 1:
+                    raise
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or attempt == attempts - 1:
+                break
+        ok = response is not None and response.status_code < 400
+        return response
+    finally:
+        if metrics is not None:
+            metrics.record(endpoint, (time.perf_counter() - start_time) * 1000, ok, attempt)
@@ -0,0 +1,117 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+from config.settings import get_settings
+
+# Obter configurações
+settings = get_settings()
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class LLMTransport:
+    """
+    Camada de transporte compartilhada com o provedor de LLM.
+    
+    Mantém um único pool de conexões keep-alive (síncrono e assíncrono) por processo,
+    em vez de um cliente HTTP e uma sessão TLS por instância de ChatOpenAI.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        request_timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        max_retries: int = 2,
+    ):
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.timeout = httpx.Timeout(request_timeout, connect=connect_timeout)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        
+        # Pools HTTP compartilhados por todos os modelos
+        self.http_client = httpx.Client(limits=limits, timeout=self.timeout)
+        self.async_http_client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        
+        # O timeout do cliente OpenAI vale para cada requisição individualmente
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            timeout=self.timeout,
+            max_retries=max_retries,
+            http_client=self.http_client,
+        )
+        self.async_client = openai.AsyncOpenAI(
+            api_key=api_key,
+            timeout=self.timeout,
+            max_retries=max_retries,
+            http_client=self.async_http_client,
+        )
+        
+        self._chat_models: Dict[Tuple, ChatOpenAI] = {}
+    
+    @classmethod
+    def from_settings(cls) -> "LLMTransport":
+        """Cria o transporte a partir das configurações da aplicação."""
+        return cls(
+            api_key=settings.openai_api_key,
+            request_timeout=settings.llm_request_timeout,
+            connect_timeout=settings.llm_connect_timeout,
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+            max_retries=settings.llm_max_retries,
+        )
+    
+    def chat_model(self, model_name: str = "gpt-4o-mini", temperature: float = 0.7, **kwargs) -> ChatOpenAI:
+        """
+        Retorna um ChatOpenAI que usa o pool compartilhado.
+        
+        Modelos com os mesmos parâmetros são reaproveitados entre agentes.
+        """
+        key = (model_name, temperature, tuple(sorted(kwargs.items())))
+        if key not in self._chat_models:
+            self._chat_models[key] = ChatOpenAI(
+                model_name=model_name,
+                temperature=temperature,
+                openai_api_key=self.api_key,
+                client=self.client.chat.completions,
+                async_client=self.async_client.chat.completions,
+                max_retries=self.max_retries,
+                **kwargs
+            )
+        return self._chat_models[key]
+    
+    async def prewarm(self) -> None:
+        """Abre antecipadamente a conexão (DNS, TCP e TLS) com o provedor."""
+        start_time = time.time()
+        try:
+            await self.async_client.models.list()
+            logger.info(f"LLMTransport: Conexão pré-aquecida em {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.warning(f"LLMTransport: Falha ao pré-aquecer a conexão: {str(e)}")
+    
+    async def aclose(self) -> None:
+        """Fecha os pools de conexão."""
+        await self.async_http_client.aclose()
+        self.http_client.close()
+
+@lru_cache(maxsize=None)
+def get_llm_transport() -> LLMTransport:
+    """Retorna o transporte de LLM do processo."""
+    return LLMTransport.from_settings()
+
+def get_chat_model(model_name: str = "gpt-4o-mini", temperature: float = 0.7, **kwargs) -> ChatOpenAI:
+    """Atalho para obter um ChatOpenAI ligado ao transporte compartilhado."""
+    return get_llm_transport().chat_model(model_name, temperature, **kwargs)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Ferramenta em execução na tarefa atual (nome e instante de início), definida pelo executor dos agentes
+current_tool: ContextVar[Optional[Tuple[str, float]]] = ContextVar("current_tool", default=None)
+
+# Tipos de frame antigos de progresso e o tipo de evento correspondente
+PROGRESS_KINDS = {
+    "function_call_start": "start",
+    "function_call_info": "info",
+    "function_call_end": "end",
+    "function_call_error": "error",
+}
+
+
+class ProgressChannel:
+    """
+    Canal de progresso da execução de ferramentas de uma conexão.
+    
+    Cada evento (start, info, end ou error) recebe um número de sequência, o nome da ferramenta em
+    execução e o tempo desde o início dela (elapsed_ms). Os eventos produzidos dentro de uma janela
+    curta são enviados juntos em um único frame `progress`, com a lista em `events`; no mesmo lote,
+    um `info` seguido de outro da mesma ferramenta é substituído pelo mais recente.
+    """
+    
+    def __init__(self, put: Callable[[Dict[str, Any]], bool], window: float = 0.05):
+        self.put = put
+        self.window = window
+        self._events: List[Dict[str, Any]] = []
+        self._seq = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        
+        # Contadores expostos por stats()
+        self.events = 0
+        self.frames = 0
+        self.collapsed = 0
+    
+    def emit(self, kind: str, message: str, tool: Optional[str] = None, elapsed_ms: Optional[float] = None) -> None:
+        """Registra um evento de progresso; o envio acontece ao fim da janela ou no próximo flush()."""
+        running = current_tool.get()
+        if tool is None and running is not None:
+            tool = running[0]
+        if elapsed_ms is None:
+            elapsed_ms = (time.monotonic() - running[1]) * 1000 if running is not None else 0.0
+        
+        self._seq += 1
+        self.events += 1
+        event = {"seq": self._seq, "kind": kind, "tool": tool, "message": message, "elapsed_ms": round(elapsed_ms, 1)}
+        if kind == "info":
+            # O info anterior da mesma ferramenta no lote fica obsoleto
+            previous = next((position for position in range(len(self._events) - 1, -1, -1) if self._events[position]["tool"] == tool), None)
+            if previous is not None and self._events[previous]["kind"] == "info":
+                del self._events[previous]
+                self.collapsed += 1
+        self._events.append(event)
+        
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+    
+    def flush(self) -> None:
+        """Envia os eventos pendentes em um único frame (chamado também antes de qualquer outro frame)."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._events:
+            return
+        events, self._events = self._events, []
+        self.frames += 1
+        self.put({"type": "progress", "content": "", "format": "text", "events": events})
+    
+    def close(self) -> None:
+        """Descarta os eventos pendentes e o envio agendado."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._events = []
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna quantos eventos foram registrados e em quantos frames foram enviados."""
+        return {
+            "events": self.events,
+            "frames": self.frames,
+            "collapsed": self.collapsed,
+        }
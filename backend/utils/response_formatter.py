@@ -0,0 +1,110 @@
+import logging
+import re
+from typing import List
+
+import markdown
+from bs4 import BeautifulSoup
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+RESPONSE_FORMATS = ("markdown", "text", "html")
+
+# Classes CSS adicionadas aos elementos do HTML gerado
+HTML_CLASSES = {
+    ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'): 'heading',
+    ('code',): 'code-block',
+    ('pre',): 'pre-block',
+}
+
+
+def strip_markdown_line(line: str) -> str:
+    """Remove a formatação markdown de uma linha (marcadores de lista viram "•")."""
+    line = re.sub(r'^\s*```\w*\s*$', '', line)  # Remove cercas de blocos de código
+    line = re.sub(r'^\s*[-*]\s+', '• ', line)  # Padroniza listas
+    line = re.sub(r'^\s*\d+\.\s+', '', line)  # Remove numeração
+    line = re.sub(r'#+\s+', '', line)  # Remove headers
+    line = re.sub(r'\*\*(.*?)\*\*', r'\1', line)  # Remove bold
+    line = re.sub(r'\*(.*?)\*', r'\1', line)  # Remove italic
+    line = re.sub(r'`(.*?)`', r'\1', line)  # Remove code
+    line = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', line)  # Remove links
+    return line
+
+
+def markdown_to_html(text: str) -> str:
+    """Converte markdown para HTML, com as classes CSS usadas pelo frontend."""
+    html = markdown.markdown(text, extensions=['fenced_code', 'tables'])
+    soup = BeautifulSoup(html, 'html.parser')
+    for tags, css_class in HTML_CLASSES.items():
+        for tag in soup.find_all(list(tags)):
+            tag['class'] = tag.get('class', []) + [css_class]
+    return str(soup)
+
+
+def format_response(text: str, format_type: str = "markdown") -> str:
+    """
+    Formata a resposta final de acordo com o formato pedido pelo cliente.
+    
+    Args:
+        text (str): Resposta em markdown, como gerada pelos agentes
+        format_type (str): Tipo de formatação ('markdown', 'text', 'html')
+    
+    Returns:
+        str: Texto formatado (markdown ou formato desconhecido: o texto original)
+    """
+    if format_type == "text":
+        return "\n".join(strip_markdown_line(line) for line in text.split("\n")).strip()
+    if format_type == "html":
+        return markdown_to_html(text)
+    return text
+
+
+class StreamFormatter:
+    """
+    Aplica o mesmo formato de format_response a uma resposta recebida em pedaços (streaming).
+    
+    Em markdown, os pedaços passam direto. Em texto, cada linha é emitida assim que termina,
+    já sem formatação. Em HTML, cada bloco (separado por linha em branco, fora de blocos de
+    código) é convertido assim que termina. flush() emite o que restou ao fim da geração.
+    """
+    
+    def __init__(self, format_type: str = "markdown"):
+        self.format_type = format_type if format_type in RESPONSE_FORMATS else "markdown"
+        self._buffer = ""
+    
+    def feed(self, chunk: str) -> str:
+        """Recebe um pedaço da resposta e retorna a parte já formatada que pode ser enviada."""
+        if self.format_type == "markdown":
+            return chunk
+        self._buffer += chunk
+        if self.format_type == "text":
+            lines = self._buffer.split("\n")
+            self._buffer = lines.pop()
+            return "".join(strip_markdown_line(line) + "\n" for line in lines)
+        return self._feed_html()
+    
+    def flush(self) -> str:
+        """Formata e retorna o restante do buffer."""
+        rest, self._buffer = self._buffer, ""
+        if not rest.strip() or self.format_type == "markdown":
+            return rest
+        if self.format_type == "text":
+            return strip_markdown_line(rest)
+        return markdown_to_html(rest)
+    
+    def _feed_html(self) -> str:
+        blocks: List[str] = []
+        lines = self._buffer.split("\n")
+        pending: List[str] = []
+        # O buffer sempre começa no início de um bloco; a última linha ainda pode estar incompleta
+        in_code = False
+        for line in lines[:-1]:
+            if line.lstrip().startswith("```"):
+                in_code = not in_code
+            if not line.strip() and not in_code and any(part.strip() for part in pending):
+                blocks.append(markdown_to_html("\n".join(pending)) + "\n")
+                pending = []
+            else:
+                pending.append(line)
+        self._buffer = "\n".join(pending + [lines[-1]])
+        return "".join(blocks)
@@ -0,0 +1,165 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from agents.session import AgentSession
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class SessionPool:
+    """
+    Pool de sessões com capacidade limitada.
+    
+    As sessões mais recentes ficam em memória (ordem LRU). Ao exceder a capacidade,
+    ou quando o cliente sinaliza que está ocioso, a sessão é serializada em disco
+    (histórico e metadados, JSON compactado) e removida da memória. Na próxima
+    mensagem do cliente ela é reidratada de forma transparente.
+    """
+    
+    def __init__(self, capacity: int = 500, storage_dir: Optional[str] = None):
+        self.capacity = max(1, capacity)
+        # Um diretório por processo, para que workers não apaguem as sessões uns dos outros
+        base_dir = storage_dir or os.path.join(tempfile.gettempdir(), "monolito-sessions")
+        self.storage_dir = os.path.join(base_dir, str(os.getpid()))
+        
+        self._sessions: "OrderedDict[int, AgentSession]" = OrderedDict()
+        self._hibernated: set = set()
+        # Sessões com um turno em andamento não podem ser hibernadas
+        self._pinned: set = set()
+        
+        # Contadores expostos por stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hibernations = 0
+        self.rehydrations = 0
+        self.rehydration_ms_total = 0.0
+        self.rehydration_ms_max = 0.0
+        
+        # Os IDs de cliente não sobrevivem a um reinício: descarta hibernações antigas
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+        os.makedirs(self.storage_dir, exist_ok=True)
+    
+    def __contains__(self, client_id: int) -> bool:
+        return client_id in self._sessions or client_id in self._hibernated
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def _path(self, client_id: int) -> str:
+        return os.path.join(self.storage_dir, f"{client_id}.json.gz")
+    
+    def add(self, session: AgentSession) -> None:
+        """Adiciona uma sessão ao pool, despejando a menos usada se necessário."""
+        self._sessions[session.client_id] = session
+        self._sessions.move_to_end(session.client_id)
+        self._evict_overflow()
+    
+    def get(self, client_id: int) -> Optional[AgentSession]:
+        """Obtém a sessão do cliente, reidratando-a do disco se estiver hibernada."""
+        session = self._sessions.get(client_id)
+        if session is not None:
+            self.hits += 1
+            self._sessions.move_to_end(client_id)
+            return session
+        
+        if client_id not in self._hibernated:
+            return None
+        
+        self.misses += 1
+        return self._rehydrate(client_id)
+    
+    def pin(self, client_id: int) -> None:
+        """Impede que a sessão seja hibernada enquanto um turno está em andamento."""
+        self._pinned.add(client_id)
+    
+    def unpin(self, client_id: int) -> None:
+        """Libera a sessão para hibernação."""
+        self._pinned.discard(client_id)
+    
+    def hibernate(self, client_id: int) -> bool:
+        """Serializa a sessão em disco e a remove da memória."""
+        if client_id in self._pinned:
+            return False
+        session = self._sessions.pop(client_id, None)
+        if session is None:
+            return False
+        
+        try:
+            with gzip.open(self._path(client_id), "wt", encoding="utf-8") as f:
+                json.dump(session.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        except Exception as e:
+            # Sem disco disponível a sessão continua em memória
+            logger.error(f"SessionPool: Erro ao hibernar sessão {client_id}: {str(e)}")
+            self._sessions[client_id] = session
+            return False
+        
+        self._hibernated.add(client_id)
+        self.hibernations += 1
+        logger.info(f"SessionPool: Sessão {client_id} hibernada")
+        return True
+    
+    def remove(self, client_id: int) -> None:
+        """Remove a sessão da memória e do disco."""
+        self._sessions.pop(client_id, None)
+        self._pinned.discard(client_id)
+        if client_id in self._hibernated:
+            self._hibernated.discard(client_id)
+            try:
+                os.remove(self._path(client_id))
+            except FileNotFoundError:
+                pass
+    
+    def _rehydrate(self, client_id: int) -> Optional[AgentSession]:
+        start_time = time.perf_counter()
+        try:
+            with gzip.open(self._path(client_id), "rt", encoding="utf-8") as f:
+                session = AgentSession.from_dict(json.load(f))
+            os.remove(self._path(client_id))
+        except Exception as e:
+            logger.error(f"SessionPool: Erro ao reidratar sessão {client_id}: {str(e)}")
+            self._hibernated.discard(client_id)
+            return None
+        
+        self._hibernated.discard(client_id)
+        self.add(session)
+        
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.rehydrations += 1
+        self.rehydration_ms_total += elapsed_ms
+        self.rehydration_ms_max = max(self.rehydration_ms_max, elapsed_ms)
+        logger.info(f"SessionPool: Sessão {client_id} reidratada em {elapsed_ms:.2f}ms")
+        return session
+    
+    def _evict_overflow(self) -> None:
+        # Despeja as menos usadas, pulando as que estão com turno em andamento
+        candidates = [client_id for client_id in self._sessions if client_id not in self._pinned]
+        for client_id in candidates:
+            if len(self._sessions) <= self.capacity:
+                break
+            if self.hibernate(client_id):
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do pool."""
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size": len(self._sessions),
+            "hibernated": len(self._hibernated),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "hibernations": self.hibernations,
+            "rehydrations": self.rehydrations,
+            "rehydration_ms_avg": self.rehydration_ms_total / self.rehydrations if self.rehydrations else 0.0,
+            "rehydration_ms_max": self.rehydration_ms_max,
+        }
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class SnapshotCache:
+    """
+    Cache de um único valor (ex.: a lista completa de tarefas) compartilhado por todas as sessões.
+    
+    - O valor expira após `ttl` segundos.
+    - Single-flight: se várias sessões pedem o valor ao mesmo tempo, apenas uma busca é feita
+      e todas aguardam o mesmo resultado.
+    - invalidate() descarta o valor após uma escrita; uma busca que já estava em andamento
+      não grava o resultado (possivelmente anterior à escrita) no cache.
+    """
+    
+    def __init__(self, loader: Callable[[], Awaitable[Any]], ttl: float = 30.0, name: str = "snapshot"):
+        self.loader = loader
+        self.ttl = ttl
+        self.name = name
+        
+        self._value: Any = None
+        self._has_value = False
+        self._expires_at = 0.0
+        self._loaded_at = 0.0
+        # Incrementada a cada invalidação, para descartar buscas iniciadas antes dela
+        self._generation = 0
+        self._inflight: Optional[asyncio.Future] = None
+        
+        # Contadores expostos por stats()
+        self.hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+    
+    async def get(self) -> Any:
+        """Retorna o valor em cache ou o busca (uma única vez para todos os que aguardam)."""
+        if self._has_value and time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._value
+        
+        if self._inflight is None:
+            self.fetches += 1
+            self._inflight = asyncio.ensure_future(self._load(self._generation))
+        else:
+            self.coalesced += 1
+        
+        # shield: o cancelamento de quem aguarda não cancela a busca dos demais
+        return await asyncio.shield(self._inflight)
+    
+    async def _load(self, generation: int) -> Any:
+        start_time = time.monotonic()
+        try:
+            value = await self.loader()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"SnapshotCache: Erro ao carregar {self.name}: {str(e)}")
+            raise
+        finally:
+            if generation == self._generation:
+                self._inflight = None
+        
+        if generation == self._generation:
+            self._value = value
+            self._has_value = True
+            self._loaded_at = time.monotonic()
+            self._expires_at = self._loaded_at + self.ttl
+        logger.info(f"SnapshotCache: {self.name} carregado em {time.monotonic() - start_time:.2f}s")
+        return value
+    
+    def invalidate(self) -> None:
+        """Descarta o valor em cache (chamado após criar, atualizar ou remover um item)."""
+        self._generation += 1
+        self._inflight = None
+        self._has_value = False
+        self._value = None
+        self.invalidations += 1
+        logger.info(f"SnapshotCache: {self.name} invalidado")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do cache."""
+        requests = self.hits + self.fetches + self.coalesced
+        return {
+            "ttl": self.ttl,
+            "cached": self._has_value and time.monotonic() < self._expires_at,
+            "age_s": time.monotonic() - self._loaded_at if self._has_value else None,
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / requests if requests else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
@@ -1,14 +1,166 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Tuple
 from fastapi import WebSocket
+from utils.event_bus import event_bus
+from utils.progress import PROGRESS_KINDS, ProgressChannel
+from utils.ws_codec import JsonCodec
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Progresso intermediário: pode ser substituído pelo mais recente ou descartado quando a fila enche
+LOW_PRIORITY_TYPES = {"function_call_info"}
+LOW_PRIORITY_EVENTS = {"tool_start", "tool_end"}
+
+class OutboundWriter:
+    """
+    Fila de saída de uma conexão WebSocket, esvaziada por uma tarefa dedicada.
+    
+    Quem envia (inclusive o código das ferramentas dos agentes) só enfileira o frame e segue;
+    um cliente lento atrasa apenas a sua própria fila. Deltas de tokens seguidos são mesclados
+    em um único frame e um `function_call_info` seguido de outro é substituído pelo mais recente;
+    frames `progress` seguidos viram um só, com os eventos concatenados. Com a fila cheia, o
+    progresso de baixa prioridade mais antigo (incluindo lotes `progress` só com eventos `info`)
+    é descartado para abrir espaço; os demais frames (respostas finais, erros, início e fim de
+    funções) nunca são descartados, mesmo que a fila passe do limite.
+    
+    Os frames são codificados no envio pelo codec negociado na conexão (JSON ou MessagePack).
+    """
+    
+    def __init__(self, client_id: int, websocket: WebSocket, max_queue: int = 64, codec=None):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.codec = codec or JsonCodec()
+        self._queue: Deque[Tuple[Dict[str, Any], float]] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # Contadores expostos por stats()
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.failed = 0
+        self.bytes = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_last = 0.0
+    
+    def start(self) -> None:
+        """Inicia a tarefa que envia os frames enfileirados."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    def close(self) -> None:
+        """Encerra a tarefa de envio, descartando o que ainda estiver na fila."""
+        self._closed = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+    
+    @staticmethod
+    def _is_token(frame: Dict[str, Any]) -> bool:
+        return frame["type"] == "message_delta" and frame.get("event") == "token"
+    
+    @staticmethod
+    def _is_low_priority(frame: Dict[str, Any]) -> bool:
+        if frame["type"] == "progress":
+            # Um lote só com info pode ser perdido; start, end e error não
+            return all(event.get("kind") == "info" for event in frame.get("events", []))
+        return frame["type"] in LOW_PRIORITY_TYPES or (
+            frame["type"] == "message_delta" and frame.get("event") in LOW_PRIORITY_EVENTS
+        )
+    
+    def put(self, frame: Dict[str, Any]) -> bool:
+        """Enfileira um frame; False se ele foi descartado (conexão fechada ou progresso com a fila cheia)."""
+        if self._closed:
+            return False
+        
+        if self._queue:
+            last, queued_at = self._queue[-1]
+            if self._is_token(frame) and self._is_token(last) and frame.get("format") == last.get("format"):
+                last["content"] += frame["content"]
+                self.merged += 1
+                return True
+            if frame["type"] in LOW_PRIORITY_TYPES and last["type"] == frame["type"]:
+                self._queue[-1] = (frame, queued_at)
+                self.merged += 1
+                return True
+            if frame["type"] == "progress" and last["type"] == "progress":
+                last["events"] = last.get("events", []) + frame.get("events", [])
+                self.merged += 1
+                return True
+        
+        if len(self._queue) >= self.max_queue:
+            # Abre espaço descartando o progresso mais antigo; sem progresso na fila, descarta o novo se for progresso
+            victim = next((position for position, (queued, _) in enumerate(self._queue) if self._is_low_priority(queued)), None)
+            if victim is not None:
+                del self._queue[victim]
+                self.dropped += 1
+            elif self._is_low_priority(frame):
+                self.dropped += 1
+                return False
+        
+        self._queue.append((frame, time.monotonic()))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+        return True
+    
+    async def _run(self) -> None:
+        while not self._closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            frame, queued_at = self._queue.popleft()
+            try:
+                payload = self.codec.encode(frame)
+                if self.codec.binary:
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"OutboundWriter: Erro ao enviar mensagem para o cliente {self.client_id}: {e}")
+                continue
+            lag = time.monotonic() - queued_at
+            self.sent += 1
+            self.bytes += len(payload)
+            self._lag_total += lag
+            self._lag_last = lag
+            self._lag_max = max(self._lag_max, lag)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna a profundidade da fila de saída, os descartes e o atraso de envio."""
+        return {
+            "encoding": self.codec.name,
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "lag_ms_last": round(self._lag_last * 1000, 2),
+            "lag_ms_avg": round(self._lag_total / self.sent * 1000, 2) if self.sent else 0.0,
+            "lag_ms_max": round(self._lag_max * 1000, 2),
+        }
+
 # Armazenamento global para conexões WebSocket
 websocket_connections: Dict[int, WebSocket] = {}
 
+# Fila de saída de cada conexão
+websocket_writers: Dict[int, OutboundWriter] = {}
+
+# Canal de progresso das ferramentas de cada conexão
+progress_channels: Dict[int, ProgressChannel] = {}
+
 def get_websocket_connection(client_id: int) -> Optional[WebSocket]:
     """Obtém a conexão WebSocket para um cliente específico."""
     return websocket_connections.get(client_id)
@@ -17,33 +169,74 @@ def get_active_connections() -> Dict[int, WebSocket]:
     """Obtém todas as conexões ativas."""
     return websocket_connections
 
-def register_websocket(client_id: int, websocket: WebSocket) -> None:
-    """Registra uma conexão WebSocket."""
+def get_outbound_stats(client_id: int) -> Optional[Dict[str, Any]]:
+    """Retorna os contadores da fila de saída de um cliente, ou None se não houver."""
+    writer = websocket_writers.get(client_id)
+    if writer is None:
+        return None
+    stats = writer.stats()
+    if client_id in progress_channels:
+        stats["progress"] = progress_channels[client_id].stats()
+    return stats
+
+def register_websocket(client_id: int, websocket: WebSocket, max_queue: int = 64, progress_window: float = 0.05, codec=None) -> None:
+    """Registra uma conexão WebSocket e inicia a sua fila de saída (com o codec negociado) e o seu canal de progresso."""
     websocket_connections[client_id] = websocket
+    writer = OutboundWriter(client_id, websocket, max_queue=max_queue, codec=codec)
+    writer.start()
+    websocket_writers[client_id] = writer
+    progress_channels[client_id] = ProgressChannel(writer.put, window=progress_window)
+    # Outros workers passam a encontrar este cliente pelo barramento de eventos
+    event_bus.register(client_id)
     logger.info(f"WebSocket registrado para o cliente: {client_id}")
 
 def unregister_websocket(client_id: int) -> None:
     """Remove o registro de uma conexão WebSocket."""
+    event_bus.unregister(client_id)
+    channel = progress_channels.pop(client_id, None)
+    if channel is not None:
+        channel.close()
+    writer = websocket_writers.pop(client_id, None)
+    if writer is not None:
+        writer.close()
     if client_id in websocket_connections:
         del websocket_connections[client_id]
         logger.info(f"WebSocket removido para o cliente: {client_id}")
 
-async def send_websocket_message(message: str, client_id: int, message_type: str = "message", format_type: str = "text") -> bool:
+async def send_websocket_message(message: str, client_id: int, message_type: str = "message", format_type: str = "text", extra: Optional[Dict[str, Any]] = None) -> bool:
     """
     Envia uma mensagem para um cliente via WebSocket.
     
+    Os tipos function_call_* viram eventos do canal de progresso da conexão e são enviados
+    em lote, no frame `progress`. Se o socket do cliente pertence a outro worker, a mensagem
+    segue pelo barramento de eventos até ele.
+    
     Args:
         message (str): A mensagem a ser enviada
         client_id (int): O ID do cliente
-        message_type (str): O tipo da mensagem (message, error, function_call_start, etc.)
+        message_type (str): O tipo da mensagem (message, message_delta, error, function_call_start, etc.)
         format_type (str): O formato da mensagem (text, markdown, etc.)
+        extra (dict): Campos adicionais do frame (ex.: event e tool em message_delta)
         
     Returns:
-        bool: True se a mensagem foi enviada com sucesso, False caso contrário
+        bool: True se a mensagem foi enfileirada para envio (ou entregue ao hub), False caso contrário
     """
     if client_id not in websocket_connections:
-        logger.error(f"Cliente {client_id} não está conectado")
-        return False
+        return await event_bus.publish(client_id, {
+            "message": message,
+            "message_type": message_type,
+            "format_type": format_type,
+            "extra": extra
+        })
+    
+    channel = progress_channels.get(client_id)
+    if channel is not None:
+        if message_type in PROGRESS_KINDS:
+            channel.emit(PROGRESS_KINDS[message_type], message)
+            logger.debug(f"Progresso registrado para o cliente {client_id}: {message_type}")
+            return True
+        # O progresso pendente sai antes deste frame, mantendo a ordem
+        channel.flush()
     
     try:
         message_data = {
@@ -51,9 +244,33 @@ async def send_websocket_message(message: str, client_id: int, message_type: str
             "content": message,
             "format": format_type
         }
-        await websocket_connections[client_id].send_text(json.dumps(message_data))
-        logger.info(f"Mensagem enviada para o cliente {json.dumps(message_data)}")
+        if extra:
+            message_data.update(extra)
+        # O envio fica com a tarefa de saída da conexão; sem ela, envia diretamente
+        writer = websocket_writers.get(client_id)
+        if writer is None:
+            await websocket_connections[client_id].send_text(json.dumps(message_data))
+        elif not writer.put(message_data):
+            logger.debug(f"Progresso descartado para o cliente {client_id} (fila de saída cheia)")
+            return False
+        # Deltas de streaming são muitos e pequenos: não poluir o log
+        if message_type == "message_delta":
+            logger.debug(f"Delta enfileirado para o cliente {client_id}")
+        else:
+            # Sem serializar o frame só para o log: a codificação fica com a tarefa de saída
+            logger.info(f"Mensagem enfileirada para o cliente {client_id}: {message_type} ({len(message)} caracteres)")
         return True
     except Exception as e:
         logger.error(f"Erro ao enviar mensagem para o cliente {client_id}: {e}")
-        return False 
\ No newline at end of file
+        return False 
+async def deliver_websocket_message(client_id: int, event: Dict[str, Any]) -> bool:
+    """Entrega a uma conexão deste worker uma mensagem recebida pelo barramento de eventos."""
+    if client_id not in websocket_connections:
+        return False
+    return await send_websocket_message(
+        event["message"],
+        client_id,
+        event.get("message_type", "message"),
+        event.get("format_type", "text"),
+        event.get("extra")
+    )
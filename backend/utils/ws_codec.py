@@ -0,0 +1,91 @@
+import json
+import logging
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # MessagePack é opcional: sem ele, apenas JSON é negociado
+    msgpack = None
+
+JSON_SUBPROTOCOL = "json"
+MSGPACK_SUBPROTOCOL = "msgpack"
+MSGPACK_DEFLATE_SUBPROTOCOL = "msgpack.deflate"
+
+# No msgpack.deflate, o primeiro byte de cada frame binário indica se o restante está comprimido
+FRAME_RAW = 0x00
+FRAME_ZLIB = 0x01
+
+
+class JsonCodec:
+    """Codificação padrão dos frames: texto JSON, compatível com os clientes atuais."""
+    
+    name = JSON_SUBPROTOCOL
+    binary = False
+    
+    def encode(self, frame: Dict[str, Any]) -> str:
+        return json.dumps(frame)
+    
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """
+    Frames binários em MessagePack.
+    
+    Com `compress_threshold` (subprotocolo msgpack.deflate), os frames maiores que o limite são
+    comprimidos com zlib (se isso de fato reduzir o tamanho), e todo frame binário começa com um
+    byte de flag: FRAME_RAW (MessagePack puro) ou FRAME_ZLIB (MessagePack comprimido). Sem o
+    limite, os frames são MessagePack puro, sem flag. Frames de texto recebidos continuam sendo
+    aceitos como JSON.
+    """
+    
+    binary = True
+    
+    def __init__(self, compress_threshold: Optional[int] = None, compress_level: int = 6):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.name = MSGPACK_DEFLATE_SUBPROTOCOL if compress_threshold is not None else MSGPACK_SUBPROTOCOL
+    
+    def encode(self, frame: Dict[str, Any]) -> bytes:
+        data = msgpack.packb(frame, use_bin_type=True)
+        if self.compress_threshold is None:
+            return data
+        if len(data) > self.compress_threshold:
+            compressed = zlib.compress(data, self.compress_level)
+            if len(compressed) < len(data):
+                return bytes([FRAME_ZLIB]) + compressed
+        return bytes([FRAME_RAW]) + data
+    
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        if isinstance(data, str):
+            return json.loads(data)
+        if self.compress_threshold is not None:
+            flag, data = data[:1], data[1:]
+            if flag == bytes([FRAME_ZLIB]):
+                data = zlib.decompress(data)
+            elif flag != bytes([FRAME_RAW]):
+                raise ValueError(f"Flag de frame desconhecida: {flag!r}")
+        return msgpack.unpackb(data, raw=False)
+
+
+def negotiate_codec(offered: Iterable[str], compress_threshold: int = 1024, compress_level: int = 6) -> Tuple[Optional[str], Any]:
+    """
+    Escolhe a codificação da conexão entre os subprotocolos oferecidos pelo cliente (Sec-WebSocket-Protocol).
+    
+    Segue a ordem de preferência do cliente; sem subprotocolo conhecido (ou sem a biblioteca
+    msgpack instalada), usa JSON. Retorna o subprotocolo a confirmar no aceite (None se nenhum)
+    e o codec.
+    """
+    for subprotocol in offered:
+        if subprotocol == MSGPACK_DEFLATE_SUBPROTOCOL and msgpack is not None:
+            return subprotocol, MsgpackCodec(compress_threshold, compress_level)
+        if subprotocol == MSGPACK_SUBPROTOCOL and msgpack is not None:
+            return subprotocol, MsgpackCodec()
+        if subprotocol == JSON_SUBPROTOCOL:
+            return subprotocol, JsonCodec()
+    return None, JsonCodec()
@@ -2,12 +2,13 @@
 
 import { useState, useEffect, useRef } from 'react';
 import MainLayout from '@/components/MainLayout';
-import { Message } from '@/types';
+import { MessageDeltaFrame, ProgressEvent } from '@/types';
 import { FunctionExecutionType } from '../components/MainLayout';
+import { progressEventToExecution } from '@/utils/progress';
+import { useStreamingMessages } from '@/hooks/useStreamingMessages';
 
 export default function Home() {
   // State declarations with explicit types
-  const [messages, setMessages] = useState<Message[]>([]);
   const [isConnected, setIsConnected] = useState<boolean>(false);
   const [isProcessing, setIsProcessing] = useState<boolean>(false);
   const [isListening, setIsListening] = useState<boolean>(false);
@@ -23,7 +24,17 @@ export default function Home() {
     type: FunctionExecutionType;
     content: string;
     format: string;
+    tool?: string;
+    elapsedMs?: number;
   }[]>([]);
+  // Mensagens do chat, incluindo a resposta que ainda chega em frames message_delta
+  const {
+    messages,
+    addUserMessage: pushUserMessage,
+    addAIMessage: pushAIMessage,
+    addErrorMessage: pushErrorMessage,
+    handleMessageDelta
+  } = useStreamingMessages({ onStatus: setStatus });
   
   // Ref declarations with explicit types
   const socketRef = useRef<WebSocket | null>(null);
@@ -67,7 +78,7 @@ export default function Home() {
 
   const addUserMessage = (text: string): void => {
     console.log("Enviando mensagem para o backend:", text);
-    setMessages(prev => [...prev, { text, isUser: true }]);
+    pushUserMessage(text);
     setIsTyping(true);
     setStatus('Processando...');
     
@@ -75,7 +86,8 @@ export default function Home() {
       const messageData = {
         text: text,
         format: responseFormat,
-        language: language
+        language: language,
+        stream: true
       };
       console.log("Enviando dados para o WebSocket:", messageData);
       socketRef.current.send(JSON.stringify(messageData));
@@ -87,23 +99,15 @@ export default function Home() {
   };
 
   const addAIMessage = (text: string): void => {
-    setMessages(prevMessages => [
-      ...prevMessages,
-      {
-        text,
-        isUser: false,
-        processingStartTime: new Date(),
-        processingEndTime: new Date()
-      }
-    ]);
-    
+    // A mensagem final substitui o texto recebido em streaming
+    pushAIMessage(text);
     setIsProcessing(false);
     setIsTyping(false);
     setStatus('Resposta recebida.');
   };
 
   const addErrorMessage = (text: string): void => {
-    setMessages(prev => [...prev, { text: `Erro: ${text}`, isUser: false }]);
+    pushErrorMessage(text);
     setIsProcessing(false);
     setIsTyping(false);
   };
@@ -112,6 +116,8 @@ export default function Home() {
     type: FunctionExecutionType;
     content: string;
     format: string;
+    tool?: string;
+    elapsedMs?: number;
   }): void => {
     console.log("Adicionando execução de função:", execution);
     setFunctionExecutions(prev => {
@@ -174,6 +180,16 @@ export default function Home() {
           if (data.type === 'message') {
             console.log("Adicionando mensagem ao chat:", data.content);
             addAIMessage(data.content);
+          } else if (data.type === 'message_delta') {
+            if (data.event === 'token') {
+              setIsTyping(false);
+            }
+            handleMessageDelta(data as MessageDeltaFrame);
+          } else if (data.type === 'progress') {
+            // Eventos de progresso das ferramentas chegam em lote, na ordem de seq
+            (data.events as ProgressEvent[]).forEach(event => {
+              addFunctionExecution(progressEventToExecution(event, data.format));
+            });
           } else if (data.type === 'error') {
             console.error("Erro recebido do servidor:", data.content);
             addErrorMessage(data.content);
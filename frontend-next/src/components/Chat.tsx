@@ -33,6 +33,9 @@ interface ChatProps {
   onRetryMessage?: (messageIndex: number) => void;
 }
 
+// Indica, no fim do texto, que a resposta ainda está chegando
+const STREAMING_CURSOR = '▍';
+
 const ChatContainer = styled.div`
   flex: 1;
   overflow-y: auto;
@@ -154,6 +157,8 @@ const Chat: React.FC<ChatProps> = ({
   const [showRoutineCalendar, setShowRoutineCalendar] = useState(false);
   const [isRoutineCalendarMinimized, setIsRoutineCalendarMinimized] = useState(false);
   const [isTaskListExpanded, setIsTaskListExpanded] = useState(false);
+  // Resposta ainda chegando em frames message_delta
+  const isStreaming = localMessages.some(message => message.isStreaming);
   
   // Efeito para sincronizar as mensagens locais com as props
   useEffect(() => {
@@ -263,7 +268,7 @@ const Chat: React.FC<ChatProps> = ({
                 },
               }}
             >
-              {message.text}
+              {message.isStreaming ? `${message.text}${STREAMING_CURSOR}` : message.text}
             </ReactMarkdown>
           </MessageContent>
         )}
@@ -279,7 +284,7 @@ const Chat: React.FC<ChatProps> = ({
             </IconButton>
           </Tooltip>
           
-          {!message.isUser && onRetryMessage && (
+          {!message.isUser && !message.isStreaming && onRetryMessage && (
             <Tooltip title="Tentar novamente">
               <IconButton 
                 size="small" 
@@ -314,7 +319,7 @@ const Chat: React.FC<ChatProps> = ({
             Nenhuma mensagem ainda. Clique no microfone para começar.
           </Typography>
         )}
-        {isTyping && (
+        {isTyping && !isStreaming && (
           <Box sx={{ 
             maxWidth: '70%', 
             margin: '8px', 
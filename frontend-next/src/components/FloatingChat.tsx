@@ -14,6 +14,9 @@ import FunctionExecutionStatus from './FunctionExecutionStatus';
 import FunctionExecutions from './FunctionExecutions';
 import { FunctionExecutionType } from './MainLayout';
 
+// Indica, no fim do texto, que a resposta ainda está chegando
+const STREAMING_CURSOR = '▍';
+
 const ChatContainer = styled(Paper, {
   shouldForwardProp: (prop) => prop !== 'isMinimized' && prop !== 'isMaximized'
 })<{ isMinimized: boolean; isMaximized: boolean }>(({ theme, isMinimized, isMaximized }) => ({
@@ -184,6 +187,8 @@ interface FloatingChatProps {
     type: FunctionExecutionType;
     content: string;
     format: string;
+    tool?: string;
+    elapsedMs?: number;
   }[];
   onClearFunctionExecutions?: () => void;
 }
@@ -210,9 +215,12 @@ const FloatingChat: React.FC<FloatingChatProps> = ({
   const [message, setMessage] = useState('');
   const recognitionRef = useRef<any>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // Resposta ainda chegando em frames message_delta
+  const isStreaming = messages.some(msg => msg.isStreaming);
 
   const scrollToBottom = () => {
-    messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
+    // Durante o streaming a rolagem acompanha cada trecho sem animação
+    messagesEndRef.current?.scrollIntoView({ behavior: isStreaming ? "auto" : "smooth" });
   };
 
   useEffect(() => {
@@ -324,7 +332,7 @@ const FloatingChat: React.FC<FloatingChatProps> = ({
                             },
                           }}
                         >
-                          {msg.text}
+                          {msg.isStreaming ? `${msg.text}${STREAMING_CURSOR}` : msg.text}
                         </ReactMarkdown>
                       </MessageContent>
                     </MessageBubble>
@@ -334,7 +342,7 @@ const FloatingChat: React.FC<FloatingChatProps> = ({
               </Box>
             ))}
 
-            {isTyping && (
+            {isTyping && !isStreaming && (
               <Box sx={{ alignSelf: 'flex-start' }}>
                 <Typography variant="body2" color="text.secondary">
                   Digitando...
@@ -30,9 +30,12 @@ const StatusIcon = styled(Box)(({ theme }) => ({
 interface FunctionExecutionStatusProps {
   type: FunctionExecutionType;
   content: string;
+  // Presentes nos eventos do canal de progresso
+  tool?: string;
+  elapsedMs?: number;
 }
 
-const FunctionExecutionStatus: React.FC<FunctionExecutionStatusProps> = ({ type, content }) => {
+const FunctionExecutionStatus: React.FC<FunctionExecutionStatusProps> = ({ type, content, tool, elapsedMs }) => {
   const getStatusColor = () => {
     switch (type) {
       case 'function_call_start':
@@ -93,9 +96,19 @@ const FunctionExecutionStatus: React.FC<FunctionExecutionStatusProps> = ({ type,
         size="small" 
         variant="outlined" 
       />
+      {tool && (
+        <Typography variant="caption" sx={{ fontWeight: 600 }}>
+          {tool}
+        </Typography>
+      )}
       <Typography variant="body2" color="text.secondary">
         {content}
       </Typography>
+      {elapsedMs !== undefined && (type === 'function_call_end' || type === 'function_call_error') && (
+        <Typography variant="caption" color="text.secondary">
+          {elapsedMs.toFixed(0)} ms
+        </Typography>
+      )}
     </StatusContainer>
   );
 };
@@ -6,6 +6,8 @@ interface FunctionExecution {
   type: FunctionExecutionType;
   content: string;
   format: string;
+  tool?: string;
+  elapsedMs?: number;
 }
 
 interface FunctionExecutionsProps {
@@ -26,6 +28,8 @@ const FunctionExecutions: React.FC<FunctionExecutionsProps> = ({ executions }) =
           <FunctionExecutionStatus
             type={execution.type}
             content={execution.content}
+            tool={execution.tool}
+            elapsedMs={execution.elapsedMs}
           />
         </Box>
       ))}
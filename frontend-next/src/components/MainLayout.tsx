@@ -182,6 +182,8 @@ interface MainLayoutProps {
     type: FunctionExecutionType;
     content: string;
     format: string;
+    tool?: string;
+    elapsedMs?: number;
   }[];
 }
 
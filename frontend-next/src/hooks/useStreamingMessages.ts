@@ -0,0 +1,69 @@
+import { useCallback, useState } from 'react';
+import { Message, MessageDeltaFrame } from '@/types';
+
+interface StreamingMessagesOptions {
+  // Chamado com o texto de status dos eventos de ferramenta (tool_start/tool_end/tool_error)
+  onStatus?: (status: string) => void;
+}
+
+// Mensagens do chat com suporte a respostas em streaming (frames message_delta),
+// compartilhado pelas superfícies de chat que recebem os frames do WebSocket
+export const useStreamingMessages = ({ onStatus }: StreamingMessagesOptions = {}) => {
+  const [messages, setMessages] = useState<Message[]>([]);
+
+  const addUserMessage = useCallback((text: string): void => {
+    setMessages(prev => [...prev, { text, isUser: true }]);
+  }, []);
+
+  const addAIMessage = useCallback((text: string): void => {
+    setMessages(prevMessages => {
+      const last = prevMessages[prevMessages.length - 1];
+      // A mensagem final substitui o texto recebido em streaming
+      if (last && !last.isUser && last.isStreaming) {
+        return [...prevMessages.slice(0, -1), { ...last, text, isStreaming: false }];
+      }
+      return [...prevMessages, { text, isUser: false }];
+    });
+  }, []);
+
+  const appendAIDelta = useCallback((token: string): void => {
+    setMessages(prevMessages => {
+      const last = prevMessages[prevMessages.length - 1];
+      if (last && !last.isUser && last.isStreaming) {
+        return [...prevMessages.slice(0, -1), { ...last, text: last.text + token }];
+      }
+      return [...prevMessages, { text: token, isUser: false, isStreaming: true }];
+    });
+  }, []);
+
+  const addErrorMessage = useCallback((text: string): void => {
+    // Um erro encerra a resposta em streaming que estiver em andamento
+    setMessages(prev => [
+      ...prev.map(message => (message.isStreaming ? { ...message, isStreaming: false } : message)),
+      { text: `Erro: ${text}`, isUser: false }
+    ]);
+  }, []);
+
+  const handleMessageDelta = useCallback((frame: MessageDeltaFrame): void => {
+    if (frame.event === 'token') {
+      appendAIDelta(frame.content);
+    } else if (frame.event === 'tool_start') {
+      onStatus?.(`Executando ${frame.tool}...`);
+    } else if (frame.event === 'tool_end' || frame.event === 'tool_error') {
+      onStatus?.('Processando...');
+    }
+  }, [appendAIDelta, onStatus]);
+
+  const isStreaming = messages.some(message => message.isStreaming);
+
+  return {
+    messages,
+    setMessages,
+    isStreaming,
+    addUserMessage,
+    addAIMessage,
+    appendAIDelta,
+    addErrorMessage,
+    handleMessageDelta,
+  };
+};
@@ -29,10 +29,30 @@ export interface ThinkingUpdate {
   };
 }
 
+// Evento do canal de progresso das ferramentas (frames 'progress', em lote)
+export interface ProgressEvent {
+  seq: number;
+  kind: 'start' | 'info' | 'end' | 'error';
+  tool: string | null;
+  message: string;
+  elapsed_ms: number;
+}
+
+// Frame 'message_delta': um trecho da resposta em streaming ou um evento de ferramenta do orquestrador
+export interface MessageDeltaFrame {
+  type: 'message_delta';
+  event: 'token' | 'tool_start' | 'tool_end' | 'tool_error';
+  content: string;
+  format: string;
+  tool?: string;
+}
+
 export interface Message {
   text: string;
   isUser: boolean;
   timestamp?: string;
+  // Resposta ainda chegando em frames message_delta
+  isStreaming?: boolean;
   functionExecution?: {
     type: 'function_call_start' | 'function_call_error' | 'function_call_end';
     content: string;
@@ -0,0 +1,11 @@
+import { ProgressEvent } from '@/types';
+import { FunctionExecutionType } from '@/components/MainLayout';
+
+// Converte um evento de progresso no formato exibido por FunctionExecutionStatus
+export const progressEventToExecution = (event: ProgressEvent, format: string = 'text') => ({
+  type: `function_call_${event.kind}` as FunctionExecutionType,
+  content: event.message,
+  format,
+  tool: event.tool ?? undefined,
+  elapsedMs: event.elapsed_ms,
+});